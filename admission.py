@@ -0,0 +1,206 @@
+"""
+HTTP 요청 수락 제어 (admission control)
+전체/카테고리별 동시 처리 한도를 넘는 요청은 크기가 정해진 대기열에서 기다리게 하고,
+대기열이 가득 차거나 대기 시간이 지나면 바로 거절해 부하가 몰릴 때 메모리가 계속 늘지 않게 한다.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import config
+from server_logging import get_logger
+
+logger = get_logger("admission")
+
+
+class AdmissionRejected(Exception):
+    """
+    수락 제어가 요청을 거절한 경우
+
+    Attributes:
+        status_code: 대기열이 가득 차면 429, 대기 시간이 지나면 503
+        retry_after: 클라이언트에게 알려줄 재시도 대기 시간 (초, Retry-After 헤더)
+    """
+
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(reason)
+
+
+class _Waiter:
+    """대기열의 요청 하나"""
+
+    __slots__ = ("category", "future")
+
+    def __init__(self, category: str, future: asyncio.Future):
+        self.category = category
+        self.future = future
+
+
+class AdmissionController:
+    """
+    전체/카테고리별 처리 중 요청 수 한도와 FIFO 대기열을 가진 수락 제어기
+
+    한도 안이면 바로 수락하고, 넘으면 max_queue개까지만 대기열에 넣는다. 슬롯이 반환되면
+    대기열 앞에서부터 수락 가능한 요청을 깨운다 (카테고리 한도에 걸린 요청은 건너뜀).
+    이벤트 루프 스레드에서만 사용한다.
+    """
+
+    def __init__(self, max_in_flight: int, category_limits: Dict[str, int],
+                 default_category_limit: Optional[int], max_queue: int,
+                 queue_timeout: Optional[float], retry_after: int):
+        self.max_in_flight = max_in_flight
+        self.category_limits = dict(category_limits)
+        self.default_category_limit = default_category_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._in_flight = 0
+        self._queue: Deque[_Waiter] = deque()
+        self._category_in_flight: Dict[str, int] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def get_limit(self, category: str) -> Optional[int]:
+        """카테고리의 처리 중 요청 수 한도 반환 (None이면 전체 한도만 적용)"""
+        return self.category_limits.get(category, self.default_category_limit)
+
+    def _category_stats(self, category: str) -> Dict[str, float]:
+        stats = self._stats.get(category)
+        if stats is None:
+            stats = {
+                "admitted": 0,
+                "queued": 0,
+                "rejected_queue_full": 0,
+                "rejected_timeout": 0,
+                "total_wait": 0.0,
+                "max_wait": 0.0,
+            }
+            self._stats[category] = stats
+        return stats
+
+    def _has_capacity(self, category: str) -> bool:
+        if self.max_in_flight and self._in_flight >= self.max_in_flight:
+            return False
+        limit = self.get_limit(category)
+        return not limit or self._category_in_flight.get(category, 0) < limit
+
+    def _take_slot(self, category: str) -> None:
+        self._in_flight += 1
+        self._category_in_flight[category] = self._category_in_flight.get(category, 0) + 1
+
+    def _record_admitted(self, category: str, wait: float) -> None:
+        stats = self._category_stats(category)
+        stats["admitted"] += 1
+        stats["total_wait"] += wait
+        stats["max_wait"] = max(stats["max_wait"], wait)
+
+    async def acquire(self, category: str) -> None:
+        """
+        슬롯 하나를 얻을 때까지 대기 (끝나면 반드시 release() 호출)
+
+        Raises:
+            AdmissionRejected: 대기열이 가득 찼거나(429) 대기 시간이 지난 경우(503)
+        """
+        # 대기열에 남은 요청은 모두 한도에 걸린 요청이므로, 같은 카테고리 요청이 기다리고 있지 않으면 바로 수락
+        if self._has_capacity(category) and not any(w.category == category for w in self._queue):
+            self._take_slot(category)
+            self._record_admitted(category, 0.0)
+            return
+
+        stats = self._category_stats(category)
+        if len(self._queue) >= self.max_queue:
+            stats["rejected_queue_full"] += 1
+            raise AdmissionRejected(429, "Server is busy: admission queue is full", self.retry_after)
+
+        # 슬롯은 깨우는 쪽(_wake_waiters)에서 미리 잡아 두므로 새로 온 요청이 가로챌 수 없다
+        waiter = _Waiter(category, asyncio.get_running_loop().create_future())
+        self._queue.append(waiter)
+        stats["queued"] += 1
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not waiter.future.done():
+                stats["rejected_timeout"] += 1
+                raise AdmissionRejected(
+                    503, f"Server is busy: no slot within {self.queue_timeout:g} seconds", self.retry_after
+                )
+            # 시간이 끝나는 순간 슬롯을 받은 경우는 그대로 수락
+        except BaseException:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # 슬롯을 받은 직후 요청이 취소되면 다음 요청에 넘김
+                self.release(category)
+            raise
+        finally:
+            stats["queued"] -= 1
+            if not waiter.future.done():
+                waiter.future.cancel()
+                self._queue.remove(waiter)
+        self._record_admitted(category, time.perf_counter() - start)
+
+    def release(self, category: str) -> None:
+        """acquire()로 얻은 슬롯 반환"""
+        self._in_flight -= 1
+        self._category_in_flight[category] -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        """반환된 슬롯만큼 대기열 앞쪽의 수락 가능한 요청에 슬롯을 넘기고 깨움"""
+        for waiter in list(self._queue):
+            if self.max_in_flight and self._in_flight >= self.max_in_flight:
+                break
+            if not self._has_capacity(waiter.category):
+                # 카테고리 한도에 걸린 요청은 건너뛰고 뒤의 다른 카테고리 요청을 먼저 수락
+                continue
+            self._queue.remove(waiter)
+            self._take_slot(waiter.category)
+            waiter.future.set_result(None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """처리 중/대기 중 요청 수와 거절 통계 반환"""
+        categories = {}
+        for category, stats in sorted(self._stats.items()):
+            admitted = stats["admitted"]
+            categories[category] = {
+                "limit": self.get_limit(category),
+                "in_flight": self._category_in_flight.get(category, 0),
+                "queued": stats["queued"],
+                "admitted": admitted,
+                "rejected_queue_full": stats["rejected_queue_full"],
+                "rejected_timeout": stats["rejected_timeout"],
+                "avg_wait_ms": round(stats["total_wait"] / admitted * 1000, 3) if admitted else 0.0,
+                "max_wait_ms": round(stats["max_wait"] * 1000, 3),
+            }
+
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "max_queue": self.max_queue,
+            "queue_depth": len(self._queue),
+            "rejected": sum(c["rejected_queue_full"] + c["rejected_timeout"] for c in categories.values()),
+            "categories": categories,
+        }
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """프로세스 공용 수락 제어기 반환 (첫 호출 시 config 값으로 생성)"""
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController(
+            max_in_flight=config.HTTP_MAX_IN_FLIGHT,
+            category_limits=config.HTTP_CATEGORY_MAX_IN_FLIGHT,
+            default_category_limit=config.HTTP_CATEGORY_DEFAULT_MAX_IN_FLIGHT,
+            max_queue=config.HTTP_ADMISSION_QUEUE_SIZE,
+            queue_timeout=config.HTTP_ADMISSION_QUEUE_TIMEOUT or None,
+            retry_after=config.HTTP_RETRY_AFTER,
+        )
+        logger.debug(f"Admission controller created (max_in_flight={_controller.max_in_flight}, "
+                     f"max_queue={_controller.max_queue})")
+    return _controller
@@ -0,0 +1,144 @@
+"""
+실제 도구 호출 기록 (record-and-replay의 기록 쪽)
+디스패처를 거치는 호출마다 도구 이름, 인자, 시작 시각, 소요 시간을 JSON Lines 파일에 한 줄씩 남긴다.
+파일 내용, 커밋 메시지처럼 민감할 수 있는 인자와 긴 문자열은 길이만 기록하며,
+기록 파일이 config.CALL_RECORDING_MAX_BYTES를 넘으면 기록을 멈춘다. 재생은 call_replay.py가 담당한다.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import config
+from server_logging import get_logger
+
+logger = get_logger("call_recorder")
+
+# 길이만 남긴 인자 표시 (재생할 때 같은 길이의 채움 문자열로 바꿈)
+REDACTED_KEY = "$redacted"
+
+
+def redact_value(value: Any, key: Optional[str] = None) -> Any:
+    """
+    기록용 인자 값 변환 - 가릴 키(config.CALL_RECORDING_REDACT_KEYS)와 긴 문자열은 {"$redacted": 길이}로 바꿈
+
+    리스트/딕셔너리는 안쪽까지 같은 규칙을 적용한다 (edit_operations의 항목별 내용 등).
+    """
+    if isinstance(value, str):
+        if key in config.CALL_RECORDING_REDACT_KEYS or len(value) > config.CALL_RECORDING_MAX_STRING_CHARS:
+            return {REDACTED_KEY: len(value)}
+        return value
+    if isinstance(value, dict):
+        return {k: redact_value(v, k) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact_value(item, key) for item in value]
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return str(value)
+
+
+class CallRecorder:
+    """
+    도구 호출을 JSON Lines 파일에 추가하는 기록기 (이벤트 루프 스레드에서 호출)
+
+    첫 줄은 허용 디렉토리와 서버 버전을 담은 header 레코드이고, 이후 호출마다 call 레코드가 붙는다.
+    --workers 모드에서는 워커마다 자기 header와 함께 같은 파일에 이어 쓴다.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.recorded = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._bytes_written = 0
+        self._stopped = False
+
+    def _open(self) -> None:
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._bytes_written = os.path.getsize(self.path)
+        self._write({
+            "type": "header",
+            "server_name": config.SERVER_NAME,
+            "server_version": config.SERVER_VERSION,
+            "pid": os.getpid(),
+            "started_at": time.time(),
+            "allowed_directories": list(config.ALLOWED_DIRECTORIES),
+        })
+        logger.info(f"Recording tool calls to {self.path}")
+
+    def _write(self, record: Dict[str, Any]) -> bool:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        size = len(line.encode("utf-8"))
+        if self._bytes_written + size > self.max_bytes:
+            if not self._stopped:
+                self._stopped = True
+                logger.warning(f"Call recording stopped: {self.path} reached {self.max_bytes} bytes")
+            return False
+        self._file.write(line)
+        self._file.flush()
+        self._bytes_written += size
+        return True
+
+    def record(self, tool_name: str, arguments: Dict[str, Any], started_at: float, duration: float,
+               ok: bool, coalesced: bool = False, error: Optional[BaseException] = None) -> None:
+        """
+        호출 하나 기록
+
+        Args:
+            started_at: 호출 시작 시각 (time.time())
+            duration: 디스패처 기준 소요 시간 (초, 대기 시간 포함 - 재생도 같은 구간을 잰다)
+            ok: 오류 결과/예외 없이 끝났는지 여부
+        """
+        record = {
+            "type": "call",
+            "tool": tool_name,
+            "arguments": redact_value(arguments),
+            "started_at": round(started_at, 6),
+            "duration_ms": round(duration * 1000, 3),
+            "ok": ok,
+        }
+        if coalesced:
+            record["coalesced"] = True
+        if error is not None:
+            record["error"] = type(error).__name__
+        with self._lock:
+            try:
+                if self._file is None:
+                    self._open()
+                if self._write(record):
+                    self.recorded += 1
+                else:
+                    self.dropped += 1
+            except OSError as e:
+                self.dropped += 1
+                logger.warning(f"Failed to record call to {self.path}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "bytes": self._bytes_written,
+            "stopped": self._stopped,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_recorder: Optional[CallRecorder] = None
+
+
+def get_call_recorder() -> Optional[CallRecorder]:
+    """전역 호출 기록기 반환 (config.CALL_RECORDING_ENABLED가 False면 None)"""
+    global _recorder
+    if _recorder is None and config.CALL_RECORDING_ENABLED and config.CALL_RECORDING_FILE:
+        _recorder = CallRecorder(config.CALL_RECORDING_FILE, config.CALL_RECORDING_MAX_BYTES)
+    return _recorder
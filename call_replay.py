@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+기록한 도구 호출 재생
+main.py --record-calls 로 남긴 JSON Lines 기록을 스냅샷 디렉토리에 대해 디스패처로 다시 실행하고
+도구별 p50/p95 지연 시간을 기록 당시와 비교한다. 합성 프로젝트 벤치마크(tool_benchmark.py)와 달리
+에이전트가 실제로 만든 호출 순서, 간격, 동시성을 그대로 재현한다.
+
+사용 예:
+    python call_replay.py nexus-calls.jsonl --snapshot /tmp/project-snapshot
+    python call_replay.py nexus-calls.jsonl --map /home/me/project=/tmp/snap --speed 4 --output replay.json
+    python call_replay.py nexus-calls.jsonl --snapshot /tmp/snap --speed 0 --concurrency 8 --fail-on-regression 20
+
+--speed 1은 기록된 간격 그대로, 4는 4배 빠르게, 0은 간격 없이 (동시 실행 수 --concurrency) 호출한다.
+파일을 바꾸는 도구는 스냅샷을 보존하기 위해 --include-writes 를 주지 않으면 건너뛴다.
+길이만 기록된 인자(파일 내용, 긴 문자열 등)는 같은 길이의 채움 문자열로 바꿔 실행한다.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import config
+from call_recorder import REDACTED_KEY
+from tool_benchmark import percentile
+
+
+def load_recording(path: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """기록 파일을 읽어 (header 레코드들, 시작 시각 순으로 정렬한 call 레코드들) 반환"""
+    headers, calls = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # 기록 중 프로세스가 종료되어 마지막 줄이 잘린 경우 등
+                print(f"[REPLAY] Skipping malformed line {line_number}", file=sys.stderr)
+                continue
+            if record.get("type") == "header":
+                headers.append(record)
+            elif record.get("type") == "call":
+                calls.append(record)
+    calls.sort(key=lambda call: call["started_at"])
+    return headers, calls
+
+
+def build_path_map(headers: List[Dict[str, Any]], snapshot: Optional[str],
+                   mappings: List[str]) -> List[Tuple[str, str]]:
+    """
+    기록된 경로 → 재생할 경로 접두사 목록 (긴 접두사부터)
+
+    --snapshot은 기록 당시의 허용 디렉토리가 하나일 때 그 디렉토리를 스냅샷으로 옮긴다.
+    허용 디렉토리가 여러 개면 --map OLD=NEW 로 직접 지정해야 한다.
+    """
+    path_map = []
+    for mapping in mappings:
+        old, sep, new = mapping.partition("=")
+        if not sep or not old or not new:
+            raise ValueError(f"Invalid --map value (expected OLD=NEW): {mapping}")
+        path_map.append((os.path.normpath(old), os.path.realpath(new)))
+
+    if snapshot:
+        recorded = sorted({d for header in headers for d in header.get("allowed_directories", [])})
+        if len(recorded) != 1:
+            raise ValueError(f"--snapshot needs exactly one recorded allowed directory, found {len(recorded)} "
+                             f"({', '.join(recorded) or 'none'}); use --map OLD=NEW instead")
+        path_map.append((os.path.normpath(recorded[0]), os.path.realpath(snapshot)))
+
+    path_map.sort(key=lambda item: len(item[0]), reverse=True)
+    return path_map
+
+
+def restore_arguments(value: Any, path_map: List[Tuple[str, str]]) -> Any:
+    """재생용 인자 복원 - 기록된 경로를 스냅샷 경로로 바꾸고 길이만 남은 값은 채움 문자열로 대체"""
+    if isinstance(value, str):
+        for old, new in path_map:
+            if value == old or value.startswith(old + os.sep):
+                return new + value[len(old):]
+        return value
+    if isinstance(value, dict):
+        if len(value) == 1 and REDACTED_KEY in value:
+            return "x" * int(value[REDACTED_KEY])
+        return {k: restore_arguments(v, path_map) for k, v in value.items()}
+    if isinstance(value, list):
+        return [restore_arguments(item, path_map) for item in value]
+    return value
+
+
+async def replay_calls(calls: List[Dict[str, Any]], path_map: List[Tuple[str, str]], speed: float,
+                       concurrency: int) -> List[Dict[str, Any]]:
+    """
+    호출들을 디스패처로 재실행하고 호출별 결과 반환
+
+    speed > 0이면 기록된 시작 간격을 speed로 나눈 시각에 호출을 시작하고 (앞선 호출이 끝나기를 기다리지 않음),
+    0이면 concurrency개씩 바로바로 실행한다.
+    """
+    from tool_dispatcher import dispatch_tool
+    from tool_metrics import is_error_result
+
+    first_started = calls[0]["started_at"] if calls else 0.0
+    semaphore = asyncio.Semaphore(concurrency) if speed <= 0 else None
+    loop_start = time.perf_counter()
+
+    async def run_one(call: Dict[str, Any]) -> Dict[str, Any]:
+        lag = 0.0
+        if speed > 0:
+            due = (call["started_at"] - first_started) / speed
+            delay = due - (time.perf_counter() - loop_start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            lag = max(0.0, time.perf_counter() - loop_start - due)
+        else:
+            await semaphore.acquire()
+        arguments = restore_arguments(call.get("arguments") or {}, path_map)
+        start = time.perf_counter()
+        try:
+            result = await dispatch_tool(call["tool"], arguments)
+            ok = not is_error_result(result)
+            error = result.get("error") if ok is False and isinstance(result, dict) else None
+        except Exception as e:
+            ok = False
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+        return {
+            "tool": call["tool"],
+            "recorded_ms": call["duration_ms"],
+            "replay_ms": round((time.perf_counter() - start) * 1000, 3),
+            "recorded_ok": call.get("ok", True),
+            "ok": ok,
+            "error": str(error)[:200] if error else None,
+            "schedule_lag_ms": round(lag * 1000, 3),
+        }
+
+    return list(await asyncio.gather(*(run_one(call) for call in calls)))
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """도구별 기록/재생 지연 시간 백분위수와 성공 여부가 달라진 호출 수"""
+    by_tool: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in results:
+        by_tool.setdefault(entry["tool"], []).append(entry)
+    by_tool["(all)"] = results
+
+    summary = {}
+    for tool_name, entries in by_tool.items():
+        recorded = sorted(entry["recorded_ms"] for entry in entries)
+        replayed = sorted(entry["replay_ms"] for entry in entries)
+        summary[tool_name] = {
+            "calls": len(entries),
+            "recorded_p50_ms": round(percentile(recorded, 50), 3),
+            "recorded_p95_ms": round(percentile(recorded, 95), 3),
+            "replay_p50_ms": round(percentile(replayed, 50), 3),
+            "replay_p95_ms": round(percentile(replayed, 95), 3),
+            "replay_errors": sum(1 for entry in entries if not entry["ok"]),
+            # 기록 당시 성공했는데 재생에서 실패한 호출 (스냅샷이 기록 시점과 다르면 늘어남)
+            "ok_mismatches": sum(1 for entry in entries if entry["recorded_ok"] and not entry["ok"]),
+        }
+    return summary
+
+
+def print_comparison(summary: Dict[str, Dict[str, Any]], threshold: float) -> List[str]:
+    """기록 대비 재생 p50/p95 비교표를 출력하고 threshold(%)보다 느려진 도구 목록 반환 (p50/p95 모두)"""
+    regressions = []
+    print(f"\n{'tool':<26} {'calls':>6} {'p50 rec':>10} {'p50 new':>10} {'Δp50':>8} "
+          f"{'p95 rec':>10} {'p95 new':>10} {'Δp95':>8} {'errors':>7}")
+    for tool_name, entry in sorted(summary.items(), key=lambda item: (item[0] == "(all)", item[0])):
+        deltas = []
+        for key in ("p50", "p95"):
+            base, new = entry[f"recorded_{key}_ms"], entry[f"replay_{key}_ms"]
+            deltas.append((new - base) / base * 100 if base else 0.0)
+        marker = ""
+        if tool_name != "(all)" and all(delta > threshold for delta in deltas):
+            regressions.append(tool_name)
+            marker = "  <-- regression"
+        print(f"{tool_name:<26} {entry['calls']:>6} {entry['recorded_p50_ms']:>10.3f} {entry['replay_p50_ms']:>10.3f} "
+              f"{deltas[0]:>+7.1f}% {entry['recorded_p95_ms']:>10.3f} {entry['replay_p95_ms']:>10.3f} "
+              f"{deltas[1]:>+7.1f}% {entry['replay_errors']:>7}{marker}")
+    return regressions
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay recorded tool calls and compare latency with the recording")
+    parser.add_argument("recording", help="JSON Lines file written by main.py --record-calls")
+    parser.add_argument("--snapshot", help="directory to replay against in place of the recorded allowed directory")
+    parser.add_argument("--map", action="append", default=[], metavar="OLD=NEW",
+                        help="rewrite recorded path prefix OLD to NEW (repeatable)")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="pace multiplier: 1 keeps recorded gaps, 4 is four times faster, 0 ignores gaps")
+    parser.add_argument("--concurrency", type=int, default=4, help="calls in flight when --speed is 0")
+    parser.add_argument("--tools", help="comma separated tool names to replay (default: all recorded)")
+    parser.add_argument("--include-writes", action="store_true",
+                        help="also replay tools that modify files or repositories (changes the snapshot)")
+    parser.add_argument("--output", help="write per-call results and the summary as JSON to this path")
+    parser.add_argument("--fail-on-regression", type=float, metavar="PERCENT",
+                        help="exit with status 1 if p50 and p95 of any tool are this much slower than recorded")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    headers, calls = load_recording(args.recording)
+    try:
+        path_map = build_path_map(headers, args.snapshot, args.map)
+    except ValueError as e:
+        print(f"[REPLAY] {e}", file=sys.stderr)
+        return 2
+
+    from tools_registry import is_read_only_tool
+    from tool_dispatcher import get_tool_executor, is_tool_available
+
+    selected = set(name.strip() for name in args.tools.split(",")) if args.tools else None
+    skipped: Dict[str, int] = {}
+    replayable = []
+    for call in calls:
+        reason = None
+        if selected is not None and call["tool"] not in selected:
+            continue
+        if not is_tool_available(call["tool"]):
+            reason = "unavailable"
+        elif not args.include_writes and not is_read_only_tool(call["tool"]):
+            reason = "writes"
+        if reason:
+            skipped[f"{call['tool']} ({reason})"] = skipped.get(f"{call['tool']} ({reason})", 0) + 1
+        else:
+            replayable.append(call)
+    for name, count in sorted(skipped.items()):
+        print(f"[REPLAY] Skipping {count} call(s) to {name}", file=sys.stderr)
+    if not replayable:
+        print("[REPLAY] Nothing to replay", file=sys.stderr)
+        return 2
+
+    # 재생 경로(스냅샷)와 기록 당시 허용 디렉토리를 경로 검사에 통과시킴 (tools.utils와 같은 리스트 객체)
+    mapped_from = {old for old, _ in path_map}
+    for directory in [new for _, new in path_map] + [
+        d for header in headers for d in header.get("allowed_directories", []) if d not in mapped_from
+    ]:
+        if directory not in config.ALLOWED_DIRECTORIES:
+            config.ALLOWED_DIRECTORIES.append(directory)
+
+    recorded_span = (replayable[-1]["started_at"] - replayable[0]["started_at"])
+    print(f"[REPLAY] Replaying {len(replayable)} calls recorded over {recorded_span:.1f}s "
+          f"(speed {args.speed:g}{', concurrency ' + str(args.concurrency) if args.speed <= 0 else ''})",
+          file=sys.stderr)
+    start = time.perf_counter()
+    try:
+        results = asyncio.run(replay_calls(replayable, path_map, args.speed, max(1, args.concurrency)))
+    finally:
+        get_tool_executor().shutdown()
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(results)
+    threshold = args.fail_on_regression if args.fail_on_regression is not None else 10.0
+    regressions = print_comparison(summary, threshold)
+    lags = sorted(entry["schedule_lag_ms"] for entry in results)
+    print(f"\n[REPLAY] Finished in {elapsed:.1f}s, schedule lag p95 {percentile(lags, 95):.1f} ms", file=sys.stderr)
+
+    if args.output:
+        report = {
+            "server_name": config.SERVER_NAME,
+            "server_version": config.SERVER_VERSION,
+            "python_version": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "recording": os.path.abspath(args.recording),
+            "recorded_versions": sorted({header.get("server_version", "") for header in headers}),
+            "speed": args.speed,
+            "elapsed_seconds": round(elapsed, 3),
+            "skipped": skipped,
+            "summary": summary,
+            "calls": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"[REPLAY] Results written to {args.output}", file=sys.stderr)
+
+    if regressions and args.fail_on_regression is not None:
+        print(f"[REPLAY] Regressions over {threshold:g}%: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+도구 호출 타임아웃/취소
+디스패처가 호출마다 CancelToken을 만들어 워커 스레드에 연결하고, 오래 걸리는 루프는
+check_cancelled()를 주기적으로 호출해 취소(타임아웃, MCP 취소 알림) 시 스스로 멈춘다.
+"""
+
+import threading
+from typing import Optional
+
+import config
+
+# 워커 스레드별 현재 호출의 취소 토큰
+_thread_state = threading.local()
+
+
+class OperationCancelled(BaseException):
+    """
+    워커 스레드 안에서 check_cancelled()가 던지는 예외
+
+    asyncio.CancelledError와 같이 BaseException을 상속하므로 핸들러의
+    `except Exception` 오류 처리에 잡히지 않고 디스패처까지 전달된다.
+    """
+
+
+class ToolTimeoutError(Exception):
+    """도구 호출이 제한 시간을 넘긴 경우"""
+
+    def __init__(self, tool_name: str, timeout: float):
+        self.tool_name = tool_name
+        self.timeout = timeout
+        super().__init__(f"Tool '{tool_name}' timed out after {timeout:g} seconds")
+
+
+class CancelToken:
+    """호출 하나의 취소 상태 (이벤트 루프에서 cancel, 워커 스레드에서 확인)"""
+
+    __slots__ = ("cancelled", "reason")
+
+    def __init__(self):
+        self.cancelled = False
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        if not self.cancelled:
+            self.reason = reason
+            self.cancelled = True
+
+
+def set_current_token(token: Optional[CancelToken]) -> None:
+    """현재 워커 스레드에 취소 토큰 연결 (None이면 해제)"""
+    _thread_state.token = token
+
+
+def check_cancelled() -> None:
+    """현재 호출이 취소되었으면 OperationCancelled 발생 (디스패처 밖에서 호출되면 아무것도 하지 않음)"""
+    token = getattr(_thread_state, "token", None)
+    if token is not None and token.cancelled:
+        raise OperationCancelled(token.reason)
+
+
+def resolve_timeout(tool_name: str, requested: Optional[float] = None) -> Optional[float]:
+    """
+    호출에 적용할 타임아웃(초) 결정
+
+    호출 인자의 timeout_seconds가 있으면 그 값을 (config.TOOL_MAX_TIMEOUT 이하로),
+    없으면 도구별 기본값 또는 config.TOOL_DEFAULT_TIMEOUT을 사용한다. 0 이하/None은 제한 없음.
+    """
+    if requested is None:
+        timeout = config.TOOL_TIMEOUTS.get(tool_name, config.TOOL_DEFAULT_TIMEOUT)
+    else:
+        if isinstance(requested, bool) or not isinstance(requested, (int, float)):
+            raise ValueError("timeout_seconds must be a number")
+        timeout = requested
+        if config.TOOL_MAX_TIMEOUT:
+            timeout = min(timeout, config.TOOL_MAX_TIMEOUT)
+
+    if not timeout or timeout <= 0:
+        return None
+    return float(timeout)
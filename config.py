@@ -15,8 +15,179 @@ def normalize_path(path):
     return str(pathlib.Path(os.path.expanduser(path)).resolve())
 
 
+# 환경 변수로 추가하는 허용 디렉토리 (os.pathsep 구분) - 부하 테스트처럼 서버를 띄우는 도구가 사용하며
+# --workers 모드의 워커 프로세스에도 그대로 전달된다
+ALLOWED_DIRECTORIES_ENV = "NEXUS_ALLOWED_DIRECTORIES"
+RAW_ALLOWED_DIRECTORIES += [p for p in os.environ.get(ALLOWED_DIRECTORIES_ENV, "").split(os.pathsep) if p]
+
 ALLOWED_DIRECTORIES = [normalize_path(p) for p in RAW_ALLOWED_DIRECTORIES]
 
 # 서버 설정
 SERVER_VERSION = "20250703.2"
 SERVER_NAME = "nexus-fs"
+
+# 로드할 도구 카테고리 허용 목록 (None이면 전체, 예: ["file_io", "metadata", "search"])
+# 목록에 없는 카테고리의 모듈(GitPython, tree-sitter 등)은 import 되지 않는다
+ENABLED_TOOL_CATEGORIES = None
+
+# 도구 실행기 설정 - 블로킹 핸들러를 이벤트 루프 대신 스레드 풀에서 실행
+TOOL_EXECUTOR_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+# 카테고리별 동시 실행 한도 (tools_registry.TOOL_CATEGORIES 기준)
+TOOL_CATEGORY_CONCURRENCY = {
+    "git": 2,
+    "directory": 4,
+    "search": 4,
+    "function_analysis": 4,
+}
+
+# 위 목록에 없는 카테고리의 기본 동시 실행 한도
+TOOL_CATEGORY_DEFAULT_CONCURRENCY = 8
+
+# CPU 위주 도구를 별도 프로세스에서 실행해 GIL 경합을 피함 (0이면 모두 스레드 풀에서 실행)
+# 서버 전체의 예산 - --workers N 모드에서는 main.py가 N으로 나눈 값을 환경 변수로 각 워커에 넘긴다
+# (워커마다 자기 풀을 띄우므로 나누지 않으면 N배의 인터프리터가 생김, 몫이 0이면 풀을 쓰지 않음)
+PROCESS_POOL_WORKERS_ENV = "NEXUS_PROCESS_POOL_WORKERS"
+PROCESS_POOL_WORKERS = (int(os.environ[PROCESS_POOL_WORKERS_ENV]) if os.environ.get(PROCESS_POOL_WORKERS_ENV)
+                        else min(8, max(0, (os.cpu_count() or 1) - 1)))
+PROCESS_POOL_TOOLS = [
+    "regex_search", "search_in_file",
+    "find_function", "list_functions", "extract_function", "get_function_info",
+]
+
+# 메트릭에 결과 크기(바이트)를 기록할지 여부
+# 응답 직렬화와 별도로 결과를 한 번 더 직렬화하므로 기본은 끔 (켜면 이벤트 루프가 아닌 실행기 스레드에서 계산)
+METRICS_RECORD_RESULT_SIZE = False
+
+# 도구 호출 타임아웃 (초, None/0이면 제한 없음) - 호출마다 timeout_seconds 인자로 지정 가능
+TOOL_DEFAULT_TIMEOUT = 300
+TOOL_MAX_TIMEOUT = 3600            # timeout_seconds 인자로 지정할 수 있는 최대값
+TOOL_TIMEOUTS = {
+    "regex_search": 30,
+    "search_in_file": 30,
+    "search_in_directory": 60,
+    "count_files": 60,
+    "get_directory_size": 60,
+    "get_recent_files": 60,
+    "analyze_project": 60,
+    "git_clone": 900,
+    "git_pull": 600,
+    "git_push": 600,
+}
+
+# MCP 진행 상황 알림(progressToken) 최소 전송 간격 (초)
+PROGRESS_MIN_INTERVAL = 0.5
+
+# 동시에 들어온 같은 읽기 전용 도구 호출(도구 이름 + 인자)을 한 번만 실행하고 결과 공유
+COALESCE_READ_ONLY_CALLS = True
+
+# batch 도구 한 번에 허용하는 최대 호출 수
+BATCH_MAX_CALLS = 100
+
+# 도구 결과 출력 형식 (MCP 텍스트 응답 기본값, FastAPI는 ?format= 으로 지정)
+#   formatted: 검색 결과는 formatted_results 텍스트만, 그 외 dict는 압축 JSON
+#   compact:   결과 전체를 압축 JSON으로
+#   raw:       formatted_results를 뺀 구조화 데이터만 압축 JSON으로
+#   pretty:    formatted 와 같지만 JSON을 들여쓰기 (이전 출력과 동일)
+RESULT_OUTPUT_FORMAT = "formatted"
+
+# JSON 직렬화 백엔드: "auto"(orjson이 설치되어 있으면 사용) / "orjson" / "json"
+JSON_BACKEND = "auto"
+
+# 파일 기반 결과 캐시 (인코딩 감지, 줄 위치 색인, tree-sitter 분석 결과)
+CACHE_MEMORY_ENTRIES = 1024        # 프로세스별 메모리 캐시 항목 수
+SHARED_CACHE_PATH = None           # --workers 모드의 공유 SQLite 캐시 경로 (None이면 실행마다 만드는 비공개 임시 디렉토리)
+SHARED_CACHE_MAX_ENTRIES = 50000   # 공유 캐시 최대 항목 수
+LINE_INDEX_STRIDE = 1000           # get_file_section 줄 위치 색인 간격 (줄 수)
+PATH_CACHE_ENTRIES = 4096          # normalize_path가 기억하는 정규화된 경로 수 (0이면 매번 resolve)
+
+# FastAPI 모드 요청 수락 제어 (워커 프로세스별로 적용)
+HTTP_ADMISSION_ENABLED = True
+HTTP_MAX_IN_FLIGHT = 64               # 동시에 처리하는 도구 요청 수 (0이면 제한 없음)
+HTTP_CATEGORY_MAX_IN_FLIGHT = {       # 카테고리별 처리 중 요청 수 (tools_registry.TOOL_CATEGORIES 기준)
+    "git": 8,
+    "directory": 16,
+    "search": 16,
+    "function_analysis": 16,
+    "batch": 8,
+}
+HTTP_CATEGORY_DEFAULT_MAX_IN_FLIGHT = None   # 위 목록에 없는 카테고리 (None이면 전체 한도만 적용)
+HTTP_ADMISSION_QUEUE_SIZE = 256       # 한도를 넘은 요청의 대기열 크기 - 가득 차면 429
+HTTP_ADMISSION_QUEUE_TIMEOUT = 10     # 대기열 최대 대기 시간 (초) - 넘으면 503
+HTTP_RETRY_AFTER = 1                  # 거절 응답의 Retry-After 헤더 (초)
+
+# FastAPI 모드 워커 프로세스 수 (main.py --workers 로 덮어쓸 수 있음)
+FASTAPI_WORKERS = 1
+
+# FastAPI 모드 주소 (main.py --host, --port 로 덮어쓸 수 있음)
+FASTAPI_HOST = "0.0.0.0"
+FASTAPI_PORT = 8000
+
+# FastAPI 모드 Unix 도메인 소켓 (main.py --uds 로 지정, None이면 TCP 사용)
+FASTAPI_UDS = None
+FASTAPI_UDS_MODE = 0o600          # 소켓 파일 권한 - 접속하려면 쓰기 권한이 필요 (0o660이면 그룹까지 허용)
+FASTAPI_UDS_GROUP = None          # 소켓 파일 그룹 (None이면 변경하지 않음)
+
+# HTTP 연결 설정
+FASTAPI_KEEPALIVE_TIMEOUT = 30    # keep-alive 연결 유휴 유지 시간 (초, uvicorn 기본값은 5)
+FASTAPI_BACKLOG = 2048            # 대기 연결 큐 크기
+
+# FastAPI 앱에 함께 마운트하는 MCP streamable HTTP 엔드포인트 (REST 호출과 캐시/파서/스레드 풀을 공유)
+MCP_HTTP_ENABLED = True
+MCP_HTTP_PATH = "/mcp"
+MCP_HTTP_JSON_RESPONSE = False        # True면 SSE 대신 단일 JSON 응답 (진행 상황 알림을 보낼 수 없음)
+MCP_HTTP_SESSION_IDLE_TIMEOUT = 1800  # 요청이 없는 세션을 정리하기까지의 시간 (초)
+# 상태 없는 모드 - 세션을 만들지 않고 요청마다 독립 처리. --workers 2 이상이면 세션 요청이 다른 워커로
+# 갈 수 있으므로 main.py가 환경 변수로 켠다
+MCP_HTTP_STATELESS_ENV = "NEXUS_MCP_HTTP_STATELESS"
+MCP_HTTP_STATELESS = os.environ.get(MCP_HTTP_STATELESS_ENV) == "1"
+
+# 커서 페이지네이션 (limit / cursor 인자) 페이지 크기
+PAGINATION_DEFAULT_LIMIT = 100   # cursor만 지정하고 limit을 생략했을 때
+PAGINATION_MAX_LIMIT = 1000
+
+# NDJSON 스트리밍 응답 (?stream=true) 설정
+STREAM_READ_CHUNK_CHARS = 64 * 1024   # read_file 스트리밍 시 청크 하나의 문자 수
+
+# 로깅 설정 (main.py의 --log-level, --log-json, --log-file 옵션으로 덮어쓸 수 있음)
+LOG_LEVEL = "INFO"          # DEBUG / INFO / WARNING / ERROR
+LOG_JSON = False            # True면 JSON Lines 형식으로 출력
+LOG_FILE = None             # None이면 stderr (stdout은 MCP stdio가 사용)
+LOG_MAX_ARG_LENGTH = 200    # 로그에 남길 도구 인자 문자열 최대 길이
+LOG_MAX_LIST_ITEMS = 20     # 로그에 남길 리스트 인자 최대 항목 수
+
+# 실행 경로 추적 (main.py의 --trace 옵션으로 켜고 --trace-file 로 경로 지정)
+# 호출마다 단계별 span을 기록해 OTLP JSON Lines 파일로 내보내고, 응답 메타데이터로 trace ID를 돌려준다
+TRACING_ENABLED = False
+TRACING_FILE = "nexus-traces.jsonl"   # None이면 파일로 내보내지 않음 (trace ID만 반환)
+TRACING_MAX_SPANS = 2000              # trace 하나에 남길 최대 span 수 (넘으면 버린 개수만 기록)
+TRACING_QUEUE_SIZE = 10000            # 파일 쓰기 스레드가 아직 쓰지 못한 trace 최대 수 (넘으면 버림)
+
+# 실제 도구 호출 기록 (main.py의 --record-calls 옵션으로 켜고 --record-file 로 경로 지정, call_replay.py로 재생)
+CALL_RECORDING_ENABLED = False
+CALL_RECORDING_FILE = "nexus-calls.jsonl"
+CALL_RECORDING_MAX_BYTES = 100 * 1024 * 1024   # 기록 파일 최대 크기 - 넘으면 기록 중단
+CALL_RECORDING_MAX_STRING_CHARS = 4096         # 이보다 긴 문자열 인자는 길이만 기록
+# 값 대신 길이만 기록할 인자 이름 (파일 내용, 치환 문자열, 커밋 메시지, 인증 정보가 들어갈 수 있는 URL)
+CALL_RECORDING_REDACT_KEYS = {"content", "replacement", "message", "url"}
+
+# 시작 후 백그라운드 예열 (main.py의 --no-warmup 옵션으로 끔)
+# 서버가 요청을 받을 준비가 된 뒤 별도 스레드에서 도구 모듈 import, tree-sitter 파서/쿼리 생성, 프로세스 풀 시작,
+# 허용 디렉토리 순회(파일 메타데이터), 최근 수정한 파일의 인코딩 감지, Git 저장소 열기를 미리 해 둔다
+WARMUP_ENABLED = True
+WARMUP_DELAY = 0.5                # 서버 시작 후 예열 시작까지 대기 (초) - MCP handshake와 겹치지 않도록
+WARMUP_MAX_SECONDS = 30.0         # 디렉토리 순회/인코딩 감지에 쓸 최대 시간 (초)
+WARMUP_MAX_FILES = 20000          # 순회할 최대 파일 수 (허용 디렉토리 전체 합계)
+WARMUP_ENCODING_FILES = 256       # 인코딩을 미리 감지할 최근 수정 파일 수 (CACHE_MEMORY_ENTRIES보다 작게)
+WARMUP_ENCODING_MAX_BYTES = 1024 * 1024   # 이보다 큰 파일은 인코딩 예열에서 제외
+WARMUP_MAX_REPOS = 16             # 미리 열어 둘 Git 저장소 수 (GIT_REPO_CACHE_SIZE까지만 유지됨)
+
+# Git 도구가 열어 둔 채 재사용할 git.Repo 수 (0이면 호출마다 새로 열고 닫음)
+# 저장소 객체와 git cat-file 프로세스를 호출 간에 재사용하며, 예열이 연 저장소도 여기에 들어간다
+GIT_REPO_CACHE_SIZE = 16
+WARMUP_SKIP_DIRS = {".git", "node_modules", "__pycache__", ".venv", "venv", ".tox", ".mypy_cache", "dist", "build"}
+WARMUP_TEXT_EXTENSIONS = {
+    ".py", ".js", ".mjs", ".cjs", ".jsx", ".ts", ".tsx", ".java", ".c", ".h", ".cpp", ".cc", ".hpp", ".cs",
+    ".rs", ".go", ".kt", ".rb", ".php", ".css", ".scss", ".html", ".htm", ".json", ".md", ".txt", ".yaml",
+    ".yml", ".toml", ".ini", ".cfg", ".sh", ".sql", ".xml",
+}
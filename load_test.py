@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+종단 간 부하 테스트
+합성 프로젝트를 만들고 main.py 서버(FastAPI의 POST /{도구} 라우트, 또는 stdio MCP 서버)를 띄운 뒤
+읽기/검색/편집/git 호출을 지정한 비율로 섞어 동시성을 단계별로 높여 가며 처리량과 꼬리 지연 시간을 측정한다.
+
+사용 예:
+    python load_test.py --mode fastapi --concurrency 1,4,16,64 --duration 10
+    python load_test.py --mode mcp --mix read=60,search=30,edit=10 --output mcp_load.json
+    python load_test.py --mode fastapi --server-args "--workers 4" --size medium
+    python load_test.py --mode fastapi --url http://localhost:8000 --project-dir C:\\Project\\bench
+    python load_test.py --mode fastapi --uds          # TCP 대신 Unix 도메인 소켓으로 서버 실행/접속
+
+각 단계는 동시 사용자 수만큼의 스레드가 --duration 초 동안 응답을 받자마자 다음 요청을 보낸다.
+처리량 증가가 --saturation-gain(%) 밑으로 떨어진 첫 단계를 포화 지점으로 보고한다.
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import shlex
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import config
+from tool_benchmark import BENCHMARK_CASES, SIZE_PRESETS, LANGUAGE_TEMPLATES, SyntheticProject, percentile
+
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+# 호출 종류별 도구 (인자는 tool_benchmark.BENCHMARK_CASES로 생성)
+# git은 인덱스 잠금 경합을 피하기 위해 읽기 전용 도구만 사용한다
+TRAFFIC_CLASSES = {
+    "read": ["read_file", "get_file_section", "file_info", "list_directory"],
+    "search": ["search_in_file", "search_in_directory", "regex_search", "count_occurrences"],
+    "edit": ["replace_line_range", "patch_apply", "append_to_file", "regex_replace"],
+    "git": ["git_status", "git_log", "git_branch"],
+}
+
+DEFAULT_MIX = "read=50,search=30,edit=15,git=5"
+
+MCP_PROTOCOL_VERSION = "2024-11-05"
+
+
+def parse_mix(value: str) -> List[Tuple[str, float]]:
+    """"read=50,search=30" 형식의 호출 비율 파싱"""
+    mix = []
+    for part in value.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in TRAFFIC_CLASSES:
+            raise ValueError(f"Unknown traffic class: {name} (choose from {', '.join(TRAFFIC_CLASSES)})")
+        mix.append((name, float(weight or 1)))
+    if not mix or sum(weight for _, weight in mix) <= 0:
+        raise ValueError("Traffic mix must have at least one class with a positive weight")
+    return mix
+
+
+class TrafficGenerator:
+    """호출 비율에 따라 (호출 종류, 도구 이름, 인자)를 만드는 생성기 (스레드마다 하나씩)"""
+
+    def __init__(self, project: SyntheticProject, mix: List[Tuple[str, float]], seed: int):
+        self.project = project
+        self.classes = [name for name, _ in mix]
+        self.weights = [weight for _, weight in mix]
+        self.rng = random.Random(seed)
+
+    def next_call(self) -> Tuple[str, str, Dict[str, Any]]:
+        traffic_class = self.rng.choices(self.classes, self.weights)[0]
+        tool_name = self.rng.choice(TRAFFIC_CLASSES[traffic_class])
+        return traffic_class, tool_name, BENCHMARK_CASES[tool_name](self.project)
+
+
+class CallResult:
+    """호출 하나의 결과 분류"""
+    OK = "ok"
+    ERROR = "error"
+    REJECTED = "rejected"   # 수락 제어의 429/503
+
+
+# ==================== FastAPI 클라이언트 ====================
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """Unix 도메인 소켓으로 접속하는 HTTPConnection"""
+
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.path)
+        self.sock = sock
+
+
+def _open_connection(base_url: str, timeout: float) -> Tuple[http.client.HTTPConnection, str]:
+    """base_url(http://host:port/prefix 또는 unix:/path/to.sock)로 연결과 경로 접두사 반환"""
+    if base_url.startswith("unix:"):
+        return UnixHTTPConnection(base_url[len("unix:"):], timeout), ""
+    parsed = urllib.parse.urlsplit(base_url)
+    conn = http.client.HTTPConnection(parsed.hostname or "localhost", parsed.port or 80, timeout=timeout)
+    return conn, parsed.path.rstrip("/")
+
+
+class HttpClient:
+    """POST /{도구} 호출용 keep-alive HTTP 연결 (스레드마다 하나씩)"""
+
+    def __init__(self, base_url: str, timeout: float):
+        self.base_url = base_url
+        self.timeout = timeout
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._prefix = ""
+
+    def call(self, tool_name: str, arguments: Dict[str, Any]) -> str:
+        body = json.dumps(arguments).encode("utf-8")
+        for attempt in range(2):
+            if self._conn is None:
+                self._conn, self._prefix = _open_connection(self.base_url, self.timeout)
+            try:
+                self._conn.request("POST", f"{self._prefix}/{tool_name}", body=body,
+                                   headers={"Content-Type": "application/json"})
+                response = self._conn.getresponse()
+                response.read()
+                break
+            except (ConnectionError, http.client.HTTPException):
+                # 서버가 keep-alive 연결을 닫은 경우 한 번 다시 연결
+                self.close()
+                if attempt:
+                    raise
+        if response.status in (429, 503):
+            return CallResult.REJECTED
+        return CallResult.OK if response.status == 200 else CallResult.ERROR
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def wait_for_http(base_url: str, process: Optional[subprocess.Popen], timeout: float = 60.0) -> None:
+    """GET /health가 응답할 때까지 대기"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        conn, prefix = _open_connection(base_url, 2)
+        try:
+            conn.request("GET", f"{prefix}/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        finally:
+            conn.close()
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become healthy within {timeout:g}s")
+
+
+# ==================== MCP stdio 클라이언트 ====================
+
+class McpStdioClient:
+    """
+    stdio MCP 서버 하나에 여러 스레드가 동시에 tools/call을 보내는 JSON-RPC 클라이언트
+
+    요청은 쓰기 잠금으로 한 줄씩 보내고, 읽기 스레드가 응답 id로 기다리는 호출을 깨운다.
+    """
+
+    def __init__(self, process: subprocess.Popen, timeout: float):
+        self.process = process
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+        self._write_lock = threading.Lock()
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._pending_lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_loop, name="mcp-reader", daemon=True)
+        self._reader.start()
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        data = (json.dumps(message) + "\n").encode("utf-8")
+        with self._write_lock:
+            self.process.stdin.write(data)
+            self.process.stdin.flush()
+
+    def _read_loop(self) -> None:
+        for line in self.process.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            waiter = None
+            if "id" in message and ("result" in message or "error" in message):
+                with self._pending_lock:
+                    waiter = self._pending.pop(message["id"], None)
+            if waiter is not None:
+                waiter["response"] = message
+                waiter["event"].set()
+        # 서버가 종료되면 기다리는 호출을 모두 깨움
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for waiter in pending.values():
+            waiter["event"].set()
+
+    def request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        request_id = next(self._ids)
+        waiter = {"event": threading.Event(), "response": None}
+        with self._pending_lock:
+            self._pending[request_id] = waiter
+        self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+        if not waiter["event"].wait(self.timeout):
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+            raise TimeoutError(f"No response to {method} within {self.timeout:g}s")
+        if waiter["response"] is None:
+            raise ConnectionError("MCP server closed the connection")
+        return waiter["response"]
+
+    def initialize(self) -> None:
+        response = self.request("initialize", {
+            "protocolVersion": MCP_PROTOCOL_VERSION,
+            "capabilities": {},
+            "clientInfo": {"name": "nexus-load-test", "version": config.SERVER_VERSION},
+        })
+        if "error" in response:
+            raise RuntimeError(f"MCP initialize failed: {response['error']}")
+        self._send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+
+    def call(self, tool_name: str, arguments: Dict[str, Any]) -> str:
+        response = self.request("tools/call", {"name": tool_name, "arguments": arguments})
+        result = response.get("result")
+        if result is None or result.get("isError"):
+            return CallResult.ERROR
+        content = result.get("content") or [{}]
+        # 핸들러 예외는 "Error executing ..." 텍스트 응답으로 돌아온다
+        if str(content[0].get("text", "")).startswith("Error executing"):
+            return CallResult.ERROR
+        return CallResult.OK
+
+
+# ==================== 측정 ====================
+
+def run_step(concurrency: int, duration: float, make_client: Callable[[], Any],
+             make_traffic: Callable[[int], TrafficGenerator]) -> Dict[str, Any]:
+    """동시 사용자 concurrency명으로 duration초 동안 호출하고 단계 통계 반환"""
+    latencies: List[float] = []
+    by_class: Dict[str, List[float]] = {}
+    counts = {CallResult.OK: 0, CallResult.ERROR: 0, CallResult.REJECTED: 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def user(index: int) -> None:
+        client = make_client()
+        traffic = make_traffic(index)
+        local: List[Tuple[str, float, str]] = []
+        try:
+            while time.perf_counter() < deadline:
+                traffic_class, tool_name, arguments = traffic.next_call()
+                start = time.perf_counter()
+                try:
+                    outcome = client.call(tool_name, arguments)
+                except Exception:
+                    outcome = CallResult.ERROR
+                local.append((traffic_class, time.perf_counter() - start, outcome))
+        finally:
+            if hasattr(client, "close"):
+                client.close()
+        with lock:
+            for traffic_class, seconds, outcome in local:
+                counts[outcome] += 1
+                if outcome == CallResult.OK:
+                    latencies.append(seconds)
+                    by_class.setdefault(traffic_class, []).append(seconds)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=user, args=(i,), name=f"load-user-{i}") for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    total = sum(counts.values())
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "ok": counts[CallResult.OK],
+        "errors": counts[CallResult.ERROR],
+        "rejected": counts[CallResult.REJECTED],
+        "throughput_rps": round(counts[CallResult.OK] / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        "classes": {
+            name: {
+                "ok": len(values),
+                "p50_ms": round(percentile(sorted(values), 50) * 1000, 3),
+                "p95_ms": round(percentile(sorted(values), 95) * 1000, 3),
+            }
+            for name, values in sorted(by_class.items())
+        },
+    }
+
+
+def find_saturation(steps: List[Dict[str, Any]], min_gain: float) -> Optional[int]:
+    """처리량 증가율이 min_gain(%) 미만이 된 첫 단계의 동시성 (끝까지 늘어나면 None)"""
+    for previous, current in zip(steps, steps[1:]):
+        if previous["throughput_rps"] <= 0:
+            continue
+        gain = (current["throughput_rps"] - previous["throughput_rps"]) / previous["throughput_rps"] * 100
+        if gain < min_gain:
+            return previous["concurrency"]
+    return None
+
+
+def run_load(mode: str, levels: List[int], duration: float, warmup: float, make_client: Callable[[], Any],
+             make_traffic: Callable[[int], TrafficGenerator], min_gain: float) -> Dict[str, Any]:
+    """warmup 후 동시성 단계별로 측정하고 포화 지점과 함께 반환"""
+    if warmup > 0:
+        run_step(max(levels[0], 1), warmup, make_client, make_traffic)
+
+    steps = []
+    for concurrency in levels:
+        step = run_step(concurrency, duration, make_client, make_traffic)
+        steps.append(step)
+        print(f"[LOAD] {mode:<7} c={concurrency:<4} {step['throughput_rps']:>9.1f} req/s  "
+              f"p50 {step['p50_ms']:>9.2f} ms  p95 {step['p95_ms']:>9.2f} ms  p99 {step['p99_ms']:>9.2f} ms  "
+              f"errors {step['errors']}  rejected {step['rejected']}", file=sys.stderr)
+
+    peak = max(steps, key=lambda s: s["throughput_rps"])
+    return {
+        "steps": steps,
+        "peak_throughput_rps": peak["throughput_rps"],
+        "peak_concurrency": peak["concurrency"],
+        "saturation_concurrency": find_saturation(steps, min_gain),
+    }
+
+
+# ==================== 서버 실행 ====================
+
+def start_server(mode: str, root: str, port: int, server_args: List[str], log_path: str,
+                 uds_path: Optional[str] = None) -> subprocess.Popen:
+    """main.py를 하위 프로세스로 실행 (합성 프로젝트 디렉토리를 허용 목록에 추가)"""
+    env = dict(os.environ)
+    env[config.ALLOWED_DIRECTORIES_ENV] = os.pathsep.join(
+        p for p in (env.get(config.ALLOWED_DIRECTORIES_ENV), root) if p
+    )
+    command = [sys.executable, MAIN_SCRIPT]
+    if mode == "fastapi":
+        command += ["--fastapi"]
+        command += ["--uds", uds_path] if uds_path else ["--host", "127.0.0.1", "--port", str(port)]
+    command += ["--log-level", "WARNING", "--log-file", log_path] + server_args
+
+    return subprocess.Popen(
+        command, env=env, cwd=os.path.dirname(MAIN_SCRIPT),
+        stdin=subprocess.PIPE if mode == "mcp" else subprocess.DEVNULL,
+        stdout=subprocess.PIPE if mode == "mcp" else subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    """서버 프로세스 종료 (MCP는 stdin을 닫으면 스스로 종료)"""
+    if process.stdin:
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+    if process.poll() is None:
+        process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test main.py in FastAPI and/or MCP stdio mode")
+    parser.add_argument("--mode", choices=["fastapi", "mcp", "both"], default="both", help="server mode to test")
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32", help="comma separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds before the first level")
+    parser.add_argument("--mix", default=DEFAULT_MIX,
+                        help=f"traffic mix as class=weight ({', '.join(TRAFFIC_CLASSES)}; default: {DEFAULT_MIX})")
+    parser.add_argument("--size", choices=sorted(SIZE_PRESETS), default="small", help="synthetic project size preset")
+    parser.add_argument("--commits", type=int, help="git history depth (default from --size)")
+    parser.add_argument("--languages", default=",".join(LANGUAGE_TEMPLATES), help="comma separated languages")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the project and the traffic")
+    parser.add_argument("--port", type=int, default=8765, help="port for the spawned FastAPI server")
+    parser.add_argument("--uds", action="store_true", help="serve and connect over a Unix domain socket instead of TCP")
+    parser.add_argument("--server-args", default="", help="extra main.py arguments, e.g. \"--workers 4\"")
+    parser.add_argument("--url", help="use an already running FastAPI server (http://host:port or unix:/path/to.sock)")
+    parser.add_argument("--project-dir", help="where to generate the project (must be allowed by the --url server)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-call timeout in seconds")
+    parser.add_argument("--saturation-gain", type=float, default=10.0,
+                        help="throughput gain (%%) below which a level counts as saturated")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    try:
+        mix = parse_mix(args.mix)
+        levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    if not levels or min(levels) < 1:
+        print("Concurrency levels must be positive integers", file=sys.stderr)
+        return 2
+    if args.url and (args.mode != "fastapi" or not args.project_dir):
+        print("--url needs --mode fastapi and a --project-dir the server is allowed to access", file=sys.stderr)
+        return 2
+
+    sizes = dict(SIZE_PRESETS[args.size])
+    if args.commits is not None:
+        sizes["commits"] = args.commits
+    languages = [name.strip() for name in args.languages.split(",") if name.strip()]
+
+    root = os.path.realpath(args.project_dir or tempfile.mkdtemp(prefix="nexus-load-"))
+    os.makedirs(root, exist_ok=True)
+    server_args = shlex.split(args.server_args)
+    modes = ["fastapi", "mcp"] if args.mode == "both" else [args.mode]
+    report: Dict[str, Any] = {
+        "server_name": config.SERVER_NAME,
+        "server_version": config.SERVER_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "mix": dict(mix),
+        "duration": args.duration,
+        "server_args": server_args,
+        "transport": "uds" if args.uds or (args.url or "").startswith("unix:") else "tcp",
+        "modes": {},
+    }
+
+    try:
+        project = SyntheticProject(root, sizes["files"], sizes["lines"], sizes["large_file_lines"],
+                                   languages, sizes["commits"], seed=args.seed)
+        project.generate()
+        report["project"] = project.describe()
+        if not project.git_ready and any(name == "git" for name, _ in mix):
+            mix = [(name, weight) for name, weight in mix if name != "git"]
+            print("[LOAD] git history not available - git calls removed from the mix", file=sys.stderr)
+
+        def make_traffic(index: int) -> TrafficGenerator:
+            return TrafficGenerator(project, mix, seed=args.seed * 1000 + index)
+
+        for mode in modes:
+            log_path = os.path.join(root, f"server-{mode}.log")
+            uds_path = os.path.join(root, "server.sock") if args.uds else None
+            process = None
+            if not args.url:
+                process = start_server(mode, root, args.port, server_args, log_path, uds_path)
+            try:
+                if mode == "fastapi":
+                    base_url = args.url or (f"unix:{uds_path}" if uds_path else f"http://127.0.0.1:{args.port}")
+                    wait_for_http(base_url, process)
+                    result = run_load(mode, levels, args.duration, args.warmup,
+                                      lambda: HttpClient(base_url, args.timeout), make_traffic,
+                                      args.saturation_gain)
+                else:
+                    mcp_client = McpStdioClient(process, args.timeout)
+                    mcp_client.initialize()
+                    # stdio 연결은 하나뿐이므로 모든 사용자가 같은 클라이언트로 요청을 겹쳐 보낸다
+                    result = run_load(mode, levels, args.duration, args.warmup,
+                                      lambda: mcp_client, make_traffic, args.saturation_gain)
+            finally:
+                if process is not None:
+                    stop_server(process)
+            report["modes"][mode] = result
+            saturation = result["saturation_concurrency"]
+            print(f"[LOAD] {mode}: peak {result['peak_throughput_rps']:.1f} req/s at c={result['peak_concurrency']}, "
+                  f"saturation at c={saturation if saturation is not None else 'not reached'}", file=sys.stderr)
+    finally:
+        if not args.project_dir:
+            shutil.rmtree(root, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"[LOAD] Results written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,60 +2,261 @@
 """
 완전한 하이브리드 서버: FastAPI (HTTP REST) + MCP (JSON-RPC over stdio)
 모듈화된 구조로 리팩토링된 버전
+
+실행 옵션:
+    --fastapi                  FastAPI 모드로 실행 (기본은 MCP 모드, config.MCP_HTTP_PATH에 MCP streamable HTTP도 함께 제공)
+    --workers <N|auto>         FastAPI 워커 프로세스 수 (2 이상이면 캐시를 SQLite 파일로 공유하고,
+                               프로세스 풀 예산 config.PROCESS_POOL_WORKERS를 N으로 나눠 워커마다 몫만큼만 띄움 -
+                               몫이 0이면 워커는 프로세스 풀 없이 스레드 풀에서 모든 도구를 실행)
+    --host <addr>              FastAPI 바인드 주소 (기본은 config.FASTAPI_HOST)
+    --port <N>                 FastAPI 포트 (기본은 config.FASTAPI_PORT)
+    --uds <path>               TCP 대신 Unix 도메인 소켓으로 서비스 (기본은 config.FASTAPI_UDS)
+    --profile-startup          시작 단계별 소요 시간을 측정해 보고서를 출력하고 종료
+    --profile-output <path>    --profile-startup 결과를 JSON 파일로도 저장
+    --log-level <level>        로그 레벨 (DEBUG/INFO/WARNING/ERROR, 기본은 config.LOG_LEVEL)
+    --log-json                 로그를 JSON Lines 형식으로 출력
+    --log-file <path>          로그를 stderr 대신 파일로 출력
+    --trace                    도구 호출 단계별 span 기록 (OTLP JSON Lines, 기본 파일은 config.TRACING_FILE)
+    --trace-file <path>        span을 내보낼 파일 (지정하면 --trace 없이도 추적을 켬)
+    --record-calls             도구 호출을 JSON Lines로 기록 (기본 파일은 config.CALL_RECORDING_FILE, call_replay.py로 재생)
+    --record-file <path>       호출을 기록할 파일 (지정하면 --record-calls 없이도 기록을 켬)
+    --no-warmup                시작 후 백그라운드 예열(파서, 쿼리, 디렉토리 메타데이터, 인코딩 캐시, Git 저장소) 끄기
 """
 
 import asyncio
 import os
+import shutil
+import socket
+import stat
 import sys
 
+from startup_profiler import startup_profiler
+
+
+def _get_option_value(name: str):
+    """'--name value' 형식 옵션 값 반환 (없으면 None)"""
+    args = sys.argv[1:]
+    if name in args:
+        index = args.index(name)
+        if index + 1 < len(args):
+            return args[index + 1]
+    return None
+
+
+PROFILE_STARTUP = "--profile-startup" in sys.argv[1:]
+if PROFILE_STARTUP:
+    startup_profiler.enable()
+
+# 로깅 설정 (다른 모듈 import 전에 적용해야 import 시점 로그도 같은 설정을 따름)
+with startup_profiler.phase("logging setup"):
+    from server_logging import setup_logging, get_logger
+
+    setup_logging(
+        level=_get_option_value("--log-level"),
+        json_lines=True if "--log-json" in sys.argv[1:] else None,
+        log_file=_get_option_value("--log-file"),
+    )
+    logger = get_logger("main")
+
+# 실행 경로 추적 (워커 프로세스도 명령행을 다시 읽으므로 같은 설정이 적용됨)
+if "--trace" in sys.argv[1:] or _get_option_value("--trace-file"):
+    import config
+
+    config.TRACING_ENABLED = True
+    config.TRACING_FILE = _get_option_value("--trace-file") or config.TRACING_FILE
+
+# 실제 도구 호출 기록 (call_replay.py로 재생)
+if "--record-calls" in sys.argv[1:] or _get_option_value("--record-file"):
+    import config
+
+    config.CALL_RECORDING_ENABLED = True
+    config.CALL_RECORDING_FILE = _get_option_value("--record-file") or config.CALL_RECORDING_FILE
+
+# 시작 후 백그라운드 예열 끄기
+if "--no-warmup" in sys.argv[1:]:
+    import config
+
+    config.WARMUP_ENABLED = False
+
 # uvloop 적용 (Linux/macOS에서만)
-try:
-    import uvloop
+with startup_profiler.phase("uvloop setup"):
+    try:
+        import uvloop
 
-    if sys.platform != "win32":
-        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
-        print("[DEBUG] uvloop enabled for better performance", file=sys.stderr)
-    else:
-        print("[DEBUG] uvloop not available on Windows, using default asyncio", file=sys.stderr)
-except ImportError:
-    print("[DEBUG] uvloop not installed, using default asyncio", file=sys.stderr)
+        if sys.platform != "win32":
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            logger.debug("uvloop enabled for better performance")
+        else:
+            logger.debug("uvloop not available on Windows, using default asyncio")
+    except ImportError:
+        logger.debug("uvloop not installed, using default asyncio")
 
-print(f"[DEBUG] Starting server with Python {sys.version}", file=sys.stderr)
-print(f"[DEBUG] Working directory: {os.getcwd()}", file=sys.stderr)
+logger.debug(f"Starting server with Python {sys.version}")
+logger.debug(f"Working directory: {os.getcwd()}")
 
 # MCP 가용성 확인
-try:
-    from mcp.server import Server
+with startup_profiler.phase("import mcp"):
+    try:
+        from mcp.server import Server
 
-    MCP_AVAILABLE = True
-    print("[DEBUG] MCP imports successful", file=sys.stderr)
-except ImportError as e:
-    MCP_AVAILABLE = False
-    print(f"[DEBUG] MCP import failed: {e}", file=sys.stderr)
+        MCP_AVAILABLE = True
+        logger.debug("MCP imports successful")
+    except ImportError as e:
+        MCP_AVAILABLE = False
+        logger.debug(f"MCP import failed: {e}")
 
 # 모듈 import
-from tools.fastapi_routes import create_fastapi_app
-from mcp_server import run_mcp_server
+with startup_profiler.phase("import tools_registry"):
+    import config
+    import tools_registry
+    from shared_cache import SHARED_CACHE_ENV, create_private_cache_path
+
+with startup_profiler.phase("import tools.fastapi_routes (FastAPI, pydantic)"):
+    from tools.fastapi_routes import create_fastapi_app
+
+with startup_profiler.phase("import mcp_server"):
+    from mcp_server import run_mcp_server
+
+
+def _get_worker_count() -> int:
+    """--workers 옵션 값 (auto면 CPU 코어 수, 없으면 config.FASTAPI_WORKERS)"""
+    value = _get_option_value("--workers")
+    if value is None:
+        return max(1, config.FASTAPI_WORKERS)
+    if value == "auto":
+        return os.cpu_count() or 1
+    try:
+        return max(1, int(value))
+    except ValueError:
+        logger.error(f"Invalid --workers value: {value}")
+        sys.exit(2)
+
+
+def _get_bind_address():
+    """--host, --port 옵션 값 (없으면 config.FASTAPI_HOST, config.FASTAPI_PORT)"""
+    host = _get_option_value("--host") or config.FASTAPI_HOST
+    port = _get_option_value("--port")
+    if port is None:
+        return host, config.FASTAPI_PORT
+    try:
+        return host, int(port)
+    except ValueError:
+        logger.error(f"Invalid --port value: {port}")
+        sys.exit(2)
+
+
+def _bind_unix_socket(path: str) -> socket.socket:
+    """
+    Unix 도메인 소켓 생성 - 파일 권한(config.FASTAPI_UDS_MODE, FASTAPI_UDS_GROUP)으로 접근 제어
+
+    uvicorn의 uds 옵션은 소켓을 0o666으로 바꾸므로 직접 bind한 소켓을 fd로 넘긴다.
+    umask로 생성 순간부터 권한을 좁혀 chmod 전에 다른 사용자가 접속하는 틈이 없게 한다.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        logger.error("Unix domain sockets are not supported on this platform")
+        sys.exit(2)
+
+    path = os.path.abspath(path)
+    if os.path.lexists(path):
+        if not stat.S_ISSOCK(os.lstat(path).st_mode):
+            logger.error(f"--uds path exists and is not a socket: {path}")
+            sys.exit(2)
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except OSError:
+            # 이전 실행이 남긴 소켓 파일
+            os.remove(path)
+        else:
+            logger.error(f"Another server is already listening on {path}")
+            sys.exit(2)
+        finally:
+            probe.close()
+
+    mode = config.FASTAPI_UDS_MODE
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o777 & ~mode)
+    try:
+        sock.bind(path)
+    finally:
+        os.umask(old_umask)
+    os.chmod(path, mode)
+    if config.FASTAPI_UDS_GROUP:
+        shutil.chown(path, group=config.FASTAPI_UDS_GROUP)
+    sock.listen(config.FASTAPI_BACKLOG)
+    return sock
 
 
 def run_fastapi_server():
     """FastAPI 서버 실행"""
     import uvicorn
 
-    app = create_fastapi_app()
-    print("[INFO] Starting FastAPI server on http://localhost:8000", file=sys.stderr)
-
     # uvloop이 사용 가능한 경우 uvicorn에서도 활용
     loop_config = {}
     try:
         import uvloop
         if sys.platform != "win32":
             loop_config["loop"] = "uvloop"
-            print("[INFO] Using uvloop for uvicorn", file=sys.stderr)
+            logger.info("Using uvloop for uvicorn")
     except ImportError:
         pass
 
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info", **loop_config)
+    # 연결 재사용 설정 - 같은 호스트의 에이전트가 요청마다 다시 연결하지 않도록 keep-alive를 길게 유지
+    server_config = dict(
+        log_level="info",
+        timeout_keep_alive=config.FASTAPI_KEEPALIVE_TIMEOUT,
+        backlog=config.FASTAPI_BACKLOG,
+        **loop_config
+    )
+
+    uds_path = _get_option_value("--uds") or config.FASTAPI_UDS
+    uds_sock = None
+    if uds_path:
+        uds_sock = _bind_unix_socket(uds_path)
+        server_config["fd"] = uds_sock.fileno()
+        address = f"unix:{os.path.abspath(uds_path)} (mode {config.FASTAPI_UDS_MODE:o})"
+    else:
+        host, port = _get_bind_address()
+        server_config.update(host=host, port=port)
+        address = f"http://{host}:{port}"
+
+    workers = _get_worker_count()
+    try:
+        if workers > 1:
+            # 워커 프로세스들이 인코딩 감지/줄 색인/분석 결과를 SQLite 파일 하나로 공유
+            # (경로를 지정하지 않으면 서버 실행 사용자만 접근할 수 있는 임시 디렉토리를 새로 만들어 사용)
+            cache_path = config.SHARED_CACHE_PATH or create_private_cache_path()
+            os.environ[SHARED_CACHE_ENV] = cache_path
+            if config.MCP_HTTP_ENABLED:
+                # 같은 MCP 세션의 요청이 다른 워커로 갈 수 있으므로 세션 없이 요청마다 독립 처리
+                os.environ[config.MCP_HTTP_STATELESS_ENV] = "1"
+            # 워커마다 자기 프로세스 풀을 띄우므로 서버 전체 예산을 워커 수로 나눠 전달
+            pool_workers = config.PROCESS_POOL_WORKERS // workers
+            os.environ[config.PROCESS_POOL_WORKERS_ENV] = str(pool_workers)
+            logger.info(f"Starting FastAPI server on {address} with {workers} workers "
+                        f"(shared cache: {cache_path}, process pool: {pool_workers} per worker)")
+
+            # 워커는 별도 프로세스에서 앱 팩토리를 import 해서 생성 (명령행 로깅 옵션은 워커에서도 다시 적용됨)
+            try:
+                uvicorn.run("tools.fastapi_routes:create_fastapi_app", factory=True, workers=workers,
+                            **server_config)
+            finally:
+                if not config.SHARED_CACHE_PATH:
+                    # 임시 캐시 디렉토리 정리 (WAL 보조 파일 포함)
+                    shutil.rmtree(os.path.dirname(cache_path), ignore_errors=True)
+            return
+
+        app = create_fastapi_app()
+        logger.info(f"Starting FastAPI server on {address}")
+
+        uvicorn.run(app, **server_config)
+    finally:
+        if uds_sock is not None:
+            uds_sock.close()
+            try:
+                os.remove(os.path.abspath(uds_path))
+            except OSError:
+                pass
 
 
 async def main():
@@ -63,16 +264,78 @@ async def main():
     if MCP_AVAILABLE:
         await run_mcp_server()
     else:
-        print("[ERROR] MCP not available, cannot run MCP server", file=sys.stderr)
+        logger.error("MCP not available, cannot run MCP server")
         sys.exit(1)
 
 
+def profile_startup(fastapi_mode: bool):
+    """
+    서버를 띄우지 않고 초기화 단계를 모두 실행하며 시간 측정 후 보고서 출력
+
+    지연 로드되는 도구 모듈과 tree-sitter 파서도 강제로 초기화하여
+    첫 호출에서 지불하게 될 비용까지 함께 보여준다.
+    """
+    import importlib
+
+    # 도구 모듈 import (첫 호출 시 지연 로드되는 비용)
+    module_names = sorted({
+        tools_registry.TOOL_HANDLERS.get_module_name(name) for name in tools_registry.TOOL_HANDLERS
+    })
+    for module_name in module_names:
+        with startup_profiler.phase(f"import {module_name}"):
+            importlib.import_module(module_name)
+
+    # tree-sitter 파서 생성
+    if "tools.tree_sitter_analyzer" in module_names:
+        from tools.tree_sitter_analyzer import get_analyzer
+
+        with startup_profiler.phase("TreeSitterAnalyzer._init_languages"):
+            analyzer, error = get_analyzer()
+        if analyzer is not None:
+            for lang_name, seconds in analyzer.init_times.items():
+                startup_profiler.record(f"tree-sitter parser: {lang_name}", seconds, depth=1)
+        else:
+            logger.warning(f"tree-sitter analyzer unavailable: {error}")
+
+    if fastapi_mode:
+        with startup_profiler.phase("FastAPI app + route registration"):
+            create_fastapi_app()
+    elif MCP_AVAILABLE:
+        from mcp_server import create_mcp_server, get_tool_definitions
+
+        with startup_profiler.phase("MCP server creation"):
+            create_mcp_server()
+        with startup_profiler.phase("MCP tool definitions"):
+            get_tool_definitions()
+
+    mode = "fastapi" if fastapi_mode else "mcp"
+    startup_profiler.print_report(
+        f"Startup profile - {config.SERVER_NAME} {config.SERVER_VERSION} ({mode} mode, Python {sys.version.split()[0]})"
+    )
+
+    output_path = _get_option_value("--profile-output")
+    if output_path:
+        startup_profiler.write_json(
+            output_path,
+            server_name=config.SERVER_NAME,
+            server_version=config.SERVER_VERSION,
+            mode=mode,
+            python_version=sys.version.split()[0],
+        )
+        print(f"[PROFILE] Report written to {output_path}", file=sys.stderr)
+
+
 if __name__ == "__main__":
     # 실행 모드 결정
-    if len(sys.argv) > 1 and sys.argv[1] == "--fastapi":
+    fastapi_mode = "--fastapi" in sys.argv[1:]
+
+    if PROFILE_STARTUP:
+        # 시작 프로파일링 모드 - 보고서 출력 후 종료
+        profile_startup(fastapi_mode)
+    elif fastapi_mode:
         # FastAPI 모드
         run_fastapi_server()
     else:
         # MCP 모드 (기본)
-        print("[DEBUG] Starting MCP mode", file=sys.stderr)
+        logger.debug("Starting MCP mode")
         asyncio.run(main())
@@ -2,15 +2,16 @@
 MCP 서버 설정과 도구 정의
 """
 
-import sys
 import traceback
-import json
 import os
-from typing import List, Dict, Any, Sequence
+from typing import List, Dict, Any, Optional, Sequence
 import config
+from server_logging import get_logger, log_tool_call
 
 # 공통 유틸리티 함수 import 추가
-from tools.utils import load_tools_json
+from tools.utils import tool_definitions
+
+logger = get_logger("mcp_server")
 
 try:
     from mcp.server import Server
@@ -19,12 +20,17 @@ try:
     import mcp.types as types
 
     MCP_AVAILABLE = True
-    print("[DEBUG] MCP imports successful", file=sys.stderr)
+    logger.debug("MCP imports successful")
 except ImportError as e:
     MCP_AVAILABLE = False
-    print(f"[DEBUG] MCP import failed: {e}", file=sys.stderr)
+    logger.debug(f"MCP import failed: {e}")
 
-from tools_registry import TOOL_HANDLERS
+from progress import ProgressSink
+from result_serializer import format_tool_result
+from tool_dispatcher import dispatch_tool, is_tool_available
+from tools_registry import is_read_only_tool
+from tracing import span, start_trace
+from warmup import start_warmup, stop_warmup
 
 
 def create_mcp_server():
@@ -32,92 +38,166 @@ def create_mcp_server():
     if not MCP_AVAILABLE:
         return None
 
-    print("[DEBUG] Creating MCP server", file=sys.stderr)
+    logger.debug("Creating MCP server")
     server = Server(config.SERVER_NAME)
 
     @server.list_tools()
     async def handle_list_tools() -> List[types.Tool]:
         """MCP 도구 목록 반환"""
-        print("[DEBUG] MCP list_tools called", file=sys.stderr)
+        logger.debug("MCP list_tools called")
         return get_tool_definitions()
 
     @server.call_tool()
     async def handle_call_tool(
             name: str, arguments: Dict[str, Any]
-    ) -> Sequence[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+    ) -> Sequence[types.TextContent | types.ImageContent | types.EmbeddedResource] | types.CallToolResult:
         """MCP 도구 호출 처리"""
-        print(f"[DEBUG] MCP tool called: {name} with args: {arguments}", file=sys.stderr)
+        log_tool_call(logger, "MCP", name, arguments)
 
-        try:
-            if name in TOOL_HANDLERS:
-                result = await TOOL_HANDLERS[name](arguments)
-                # result가 dict인 경우 적절한 텍스트로 변환
-                if isinstance(result, dict):
-                    if 'formatted_results' in result:
-                        # 검색 결과의 경우 formatted_results 사용
-                        text_result = result['formatted_results']
-                    else:
-                        # 기타 경우 JSON으로 변환
-                        text_result = json.dumps(result, ensure_ascii=False, indent=2)
-                else:
-                    text_result = str(result)
-
-                return [types.TextContent(type="text", text=text_result)]
-            else:
-                raise ValueError(f"Unknown tool: {name}")
-
-        except Exception as e:
-            error_msg = f"Error executing {name}: {str(e)}"
-            print(f"[ERROR] {error_msg}", file=sys.stderr)
-            return [types.TextContent(type="text", text=error_msg)]
+        with start_trace("mcp.call_tool", tool=name) as root_span:
+            try:
+                # 스레드 풀에서 실행 (알 수 없는 도구는 ValueError)
+                result = await dispatch_tool(name, arguments, _progress_sink(server))
+                # 출력 형식(config.RESULT_OUTPUT_FORMAT)에 맞춰 텍스트로 변환
+                with span("format_result"):
+                    text_result = format_tool_result(result)
+
+                content = [types.TextContent(type="text", text=text_result)]
+
+            except Exception as e:
+                error_msg = f"Error executing {name}: {str(e)}"
+                logger.error(f"{error_msg}")
+                root_span.set_error(error_msg)
+                content = [types.TextContent(type="text", text=error_msg)]
+
+        if root_span.trace_id is None:
+            return content
+        # 추적 중이면 응답 메타데이터(_meta.traceId)로 trace ID 반환
+        return types.CallToolResult(content=content, _meta={"traceId": root_span.trace_id})
 
     return server
 
 
+def _progress_sink(server) -> Optional[ProgressSink]:
+    """요청에 progressToken이 있으면 그 토큰으로 notifications/progress를 보내는 sink 반환"""
+    try:
+        ctx = server.request_context
+    except LookupError:
+        return None
+    meta = getattr(ctx, "meta", None)
+    token = getattr(meta, "progressToken", None) if meta is not None else None
+    if token is None:
+        return None
+    session = ctx.session
+
+    async def send(progress: float, total: Optional[float], message: Optional[str]) -> None:
+        try:
+            await session.send_progress_notification(token, progress, total, message=message)
+        except TypeError:
+            # message 인자를 지원하지 않는 구버전 mcp
+            await session.send_progress_notification(token, progress, total)
+
+    return send
+
+
+def _build_mcp_tools(tools_data: List[Dict[str, Any]]) -> List[types.Tool]:
+    """도구 정의 딕셔너리 리스트를 types.Tool 객체로 변환 (비활성 카테고리 도구 제외)"""
+    tools = []
+    for tool_data in tools_data:
+        if not is_tool_available(tool_data['name']):
+            continue
+        extra = {}
+        if is_read_only_tool(tool_data['name']) and hasattr(types, "ToolAnnotations"):
+            # 클라이언트가 읽기 전용 도구를 자유롭게 병렬 호출할 수 있도록 힌트 제공 (구버전 mcp는 생략)
+            extra["annotations"] = types.ToolAnnotations(readOnlyHint=True)
+        tool = types.Tool(
+            name=tool_data['name'],
+            description=tool_data['description'],
+            inputSchema=tool_data['inputSchema'],
+            **extra
+        )
+        tools.append(tool)
+
+    logger.debug(f"Built {len(tools)} MCP tool definitions")
+    return tools
+
+
 def get_tool_definitions() -> List[types.Tool]:
-    """JSON 파일에서 도구 정의를 로드하여 types.Tool 객체로 변환"""
+    """JSON 파일에서 도구 정의를 로드하여 types.Tool 객체로 변환 (tools.json이 바뀔 때만 다시 생성)"""
     try:
-        # 공통 유틸리티 함수를 사용하여 tools.json 로드
-        tools_data = load_tools_json()
-
-        if not tools_data:
-            print("[WARNING] No tools loaded from tools.json", file=sys.stderr)
-            return []
-
-        # JSON 데이터를 types.Tool 객체로 변환
-        tools = []
-        for tool_data in tools_data:
-            tool = types.Tool(
-                name=tool_data['name'],
-                description=tool_data['description'],
-                inputSchema=tool_data['inputSchema']
-            )
-            tools.append(tool)
+        tools = tool_definitions.get_derived("mcp_tools", _build_mcp_tools)
+
+        if not tools:
+            logger.warning("No tools loaded from tools.json")
 
-        print(f"[DEBUG] Loaded {len(tools)} tools from tools.json", file=sys.stderr)
         return tools
 
     except Exception as e:
-        print(f"[ERROR] Error converting tools to MCP format: {e}", file=sys.stderr)
+        logger.error(f"Error converting tools to MCP format: {e}")
         return []
 
 
+class _StreamableHTTPEndpoint:
+    """세션 관리자에 요청을 넘기는 ASGI 엔드포인트 (Starlette Route에 함수가 아닌 ASGI 앱으로 등록)"""
+
+    def __init__(self, session_manager):
+        self.session_manager = session_manager
+
+    async def __call__(self, scope, receive, send):
+        await self.session_manager.handle_request(scope, receive, send)
+
+
+def create_streamable_http_app():
+    """
+    FastAPI 앱에 마운트할 MCP streamable HTTP 엔드포인트 생성
+
+    같은 프로세스의 REST 라우트와 디스패처, 결과 캐시, tree-sitter 파서를 공유하므로
+    stdio처럼 세션마다 새 프로세스를 띄워 캐시를 다시 채우지 않는다.
+
+    Returns:
+        (ASGI 엔드포인트, 세션 관리자) - 세션 관리자의 run()은 앱 lifespan 동안 실행해야 한다.
+        mcp 패키지가 없거나 streamable HTTP를 지원하지 않는 구버전이면 None
+    """
+    if not MCP_AVAILABLE:
+        return None
+    try:
+        from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+    except ImportError as e:
+        logger.warning(f"MCP streamable HTTP transport not available: {e}")
+        return None
+
+    server = create_mcp_server()
+    options = dict(json_response=config.MCP_HTTP_JSON_RESPONSE, stateless=config.MCP_HTTP_STATELESS)
+    try:
+        session_manager = StreamableHTTPSessionManager(
+            app=server, session_idle_timeout=config.MCP_HTTP_SESSION_IDLE_TIMEOUT or None, **options
+        )
+    except TypeError:
+        # 유휴 세션 정리를 지원하지 않는 구버전 mcp
+        session_manager = StreamableHTTPSessionManager(app=server, **options)
+    logger.debug(f"MCP streamable HTTP endpoint created (stateless={config.MCP_HTTP_STATELESS})")
+    return _StreamableHTTPEndpoint(session_manager), session_manager
+
+
 async def run_mcp_server():
     """MCP 서버 실행"""
     if not MCP_AVAILABLE:
-        print("[ERROR] MCP not available, cannot run MCP server", file=sys.stderr)
+        logger.error("MCP not available, cannot run MCP server")
         return
 
     server = create_mcp_server()
     if not server:
-        print("[ERROR] Failed to create MCP server", file=sys.stderr)
+        logger.error("Failed to create MCP server")
         return
 
-    print("[DEBUG] Starting MCP server", file=sys.stderr)
+    logger.debug("Starting MCP server")
 
     try:
         async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-            print("[DEBUG] MCP server running", file=sys.stderr)
+            logger.debug("MCP server running")
+            # 파서/캐시 예열은 handshake를 기다리게 하지 않도록 별도 스레드에서 진행
+            # (클라이언트 세션마다 서버가 하나씩 뜨므로 프로세스 풀은 첫 CPU 위주 호출 때 시작)
+            start_warmup(start_process_pool=False)
 
             # MCP 라이브러리 버전 호환성을 위한 capabilities 처리
             try:
@@ -130,9 +210,9 @@ async def run_mcp_server():
 
                 notification_options = SimpleNotificationOptions()
                 capabilities = server.get_capabilities(notification_options, {})
-                print("[DEBUG] Capabilities created with custom notification options", file=sys.stderr)
+                logger.debug("Capabilities created with custom notification options")
             except Exception as e:
-                print(f"[DEBUG] Failed to create capabilities: {e}", file=sys.stderr)
+                logger.debug(f"Failed to create capabilities: {e}")
                 # 가장 기본적인 capabilities 수동 생성
                 capabilities = {
                     "tools": {},
@@ -150,6 +230,8 @@ async def run_mcp_server():
                 ),
             )
     except Exception as e:
-        print(f"[ERROR] MCP server error: {e}", file=sys.stderr)
-        print(f"[ERROR] Traceback: {traceback.format_exc()}", file=sys.stderr)
+        logger.error(f"MCP server error: {e}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
         raise
+    finally:
+        stop_warmup()
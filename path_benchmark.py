@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+경로 정규화 마이크로벤치마크
+임시 디렉토리에 깊이/파일 수를 지정한 트리를 만들고 normalize_path의 경로당 비용을 잰다.
+
+측정 항목:
+    legacy        이전 구현 (Path.resolve + ALLOWED_DIRECTORIES를 하나씩 lower/startswith)
+    uncached      미리 컴파일한 허용 디렉토리 매처 + 매번 resolve (config.PATH_CACHE_ENTRIES = 0)
+    cached        매처 + 정규화 결과 캐시 (디렉토리 mtime 확인만)
+    symlinked     심볼릭 링크를 거치는 경로 (캐시하지 않으므로 항상 resolve, legacy_symlinked와 비교)
+    files_exist   files_exist 핸들러에 경로 전체를 한 번에 넘긴 배치 호출 (호출마다 경로당으로 환산한 분포)
+
+사용 예:
+    python path_benchmark.py
+    python path_benchmark.py --files 2000 --depth 10 --allowed 32 --output path_bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import pathlib
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import config
+from tool_benchmark import percentile
+
+
+def build_tree(root: str, files: int, depth: int) -> List[str]:
+    """root 아래 depth 단계 디렉토리에 파일들을 나눠 만들고 경로 목록 반환"""
+    paths = []
+    for i in range(files):
+        directory = os.path.join(root, *[f"d{level}_{i % (level + 2)}" for level in range(depth)])
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"file_{i}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("x\n")
+        paths.append(path)
+    return paths
+
+
+def legacy_normalize_path(requested_path: str) -> pathlib.Path:
+    """비교용 이전 구현"""
+    requested = pathlib.Path(os.path.expanduser(requested_path)).resolve()
+    for allowed in config.ALLOWED_DIRECTORIES:
+        if str(requested).lower().startswith(allowed.lower()):
+            return requested
+    raise PermissionError(f"Access denied: {requested} not in allowed directories")
+
+
+def measure(func: Callable[[str], Any], paths: List[str], repeat: int) -> Dict[str, float]:
+    """경로당 지연 시간 (마이크로초) - 한 번 돌려 캐시를 채운 뒤 repeat번 반복 측정"""
+    for path in paths:
+        func(path)
+    samples = []
+    for _ in range(repeat):
+        for path in paths:
+            start = time.perf_counter()
+            func(path)
+            samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return {
+        "mean_us": round(sum(samples) / len(samples), 3),
+        "p50_us": round(percentile(samples, 50), 3),
+        "p95_us": round(percentile(samples, 95), 3),
+    }
+
+
+def measure_batch(handler: Callable[[Dict[str, Any]], Any], paths: List[str], iterations: int) -> Dict[str, float]:
+    """배치 호출 한 번을 경로 수로 나눈 경로당 지연 시간 (마이크로초) - iterations번 호출의 분포"""
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(handler({"paths": paths}))
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            loop.run_until_complete(handler({"paths": paths}))
+            samples.append((time.perf_counter() - start) / len(paths) * 1e6)
+    finally:
+        loop.close()
+    samples.sort()
+    return {
+        "mean_us": round(sum(samples) / len(samples), 3),
+        "p50_us": round(percentile(samples, 50), 3),
+        "p95_us": round(percentile(samples, 95), 3),
+    }
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure the per-path cost of normalize_path")
+    parser.add_argument("--files", type=int, default=1000, help="number of files in the synthetic tree")
+    parser.add_argument("--depth", type=int, default=6, help="directory depth below the allowed directory")
+    parser.add_argument("--allowed", type=int, default=8,
+                        help="number of extra allowed directories checked before the project (matcher scaling)")
+    parser.add_argument("--repeat", type=int, default=5, help="measured passes over all paths")
+    parser.add_argument("--batch-iterations", type=int, default=50,
+                        help="measured files_exist batch calls (each call checks every path)")
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="nexus-path-bench-")
+    try:
+        project = os.path.join(os.path.realpath(workdir), "project")
+        paths = build_tree(project, args.files, args.depth)
+        link = os.path.join(os.path.realpath(workdir), "project-link")
+        os.symlink(project, link)
+        linked_paths = [link + path[len(project):] for path in paths]
+
+        # 이전 구현은 목록 순서대로 비교하므로 프로젝트를 맨 뒤에 둬야 허용 디렉토리 수의 영향이 드러남
+        config.ALLOWED_DIRECTORIES[:] = [
+            os.path.join(os.path.realpath(workdir), f"other-{i}") for i in range(args.allowed)
+        ] + [project]
+
+        from tools import utils
+        from tools.file_metadata import handle_files_exist
+
+        results: Dict[str, Dict[str, float]] = {}
+        results["legacy"] = measure(legacy_normalize_path, paths, args.repeat)
+        results["legacy_symlinked"] = measure(legacy_normalize_path, linked_paths, args.repeat)
+        utils.PATH_CACHE_ENTRIES = 0
+        results["uncached"] = measure(utils.normalize_path, paths, args.repeat)
+        utils.PATH_CACHE_ENTRIES = config.PATH_CACHE_ENTRIES
+        utils._resolved_paths.max_entries = max(config.PATH_CACHE_ENTRIES, len(paths))
+        results["cached"] = measure(utils.normalize_path, paths, args.repeat)
+        results["symlinked"] = measure(utils.normalize_path, linked_paths, args.repeat)
+
+        results["files_exist"] = measure_batch(handle_files_exist, paths, args.batch_iterations)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n{'mode':<17} {'mean µs':>10} {'p50 µs':>10} {'p95 µs':>10} {'vs legacy':>10}")
+    for mode, entry in results.items():
+        baseline = results["legacy_symlinked" if mode.endswith("symlinked") else "legacy"]["mean_us"]
+        print(f"{mode:<17} {entry['mean_us']:>10.2f} {entry['p50_us']:>10.2f} "
+              f"{entry['p95_us']:>10.2f} {baseline / entry['mean_us']:>9.1f}x")
+    print(f"\n[PATH] {args.files} paths, depth {args.depth}, {args.allowed + 1} allowed directories", file=sys.stderr)
+
+    if args.output:
+        report = {
+            "server_name": config.SERVER_NAME,
+            "server_version": config.SERVER_VERSION,
+            "python_version": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "files": args.files,
+            "depth": args.depth,
+            "batch_iterations": args.batch_iterations,
+            "allowed_directories": args.allowed + 1,
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"[PATH] Results written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
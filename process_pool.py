@@ -0,0 +1,283 @@
+"""
+CPU 위주 도구용 프로세스 풀
+정규식 검색, 검색 결과 컨텍스트 조립, tree-sitter 쿼리처럼 GIL을 잡고 도는 도구를 별도 프로세스에서 실행한다.
+디스패처의 워커 스레드가 호출을 프로세스로 넘기고 결과를 기다리므로 카테고리 한도, 타임아웃,
+호출 병합은 스레드 실행과 똑같이 적용된다. 워커 프로세스는 도구 모듈, tree-sitter 파서,
+파일 캐시를 한 번 만든 뒤 계속 재사용한다.
+"""
+
+import multiprocessing
+import pickle
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import config
+from cancellation import CancelToken, set_current_token
+from server_logging import get_logger, get_logging_settings
+from tracing import export_context, import_spans, run_with_remote_parent, span
+
+logger = get_logger("process_pool")
+
+# 워커가 취소 여부를 확인하는 주기 (초)
+_CANCEL_POLL_INTERVAL = 0.05
+
+# ==================== 워커 프로세스 쪽 ====================
+
+# 워커 프로세스의 공유 취소 플래그 배열 (풀 생성 시 initializer로 전달)
+_worker_cancel_flags = None
+
+
+class _SharedCancelToken:
+    """부모 프로세스가 공유 메모리 플래그로 취소하는 워커 쪽 취소 토큰 (check_cancelled()와 호환)"""
+
+    __slots__ = ("slot",)
+
+    def __init__(self, slot: int):
+        self.slot = slot
+
+    @property
+    def cancelled(self) -> bool:
+        return bool(_worker_cancel_flags[self.slot])
+
+    @property
+    def reason(self) -> str:
+        return "timeout or client cancellation"
+
+
+def _init_worker(cancel_flags, allowed_directories: List[str], tool_names: List[str],
+                 logging_settings: Dict[str, Any]) -> None:
+    """워커 프로세스 초기화 - 부모와 같은 허용 디렉토리/로깅 설정을 적용하고 도구 모듈과 파서를 미리 로드"""
+    global _worker_cancel_flags
+    _worker_cancel_flags = cancel_flags
+    # Ctrl+C는 부모 프로세스가 처리 (워커마다 KeyboardInterrupt 트레이스백이 찍히지 않도록)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    from server_logging import setup_logging
+    setup_logging(**logging_settings)
+    # tools.utils가 같은 리스트 객체를 참조하므로 내용만 교체
+    config.ALLOWED_DIRECTORIES[:] = allowed_directories
+
+    from tools_registry import TOOL_HANDLERS, get_tool_category
+    for tool_name in tool_names:
+        if tool_name in TOOL_HANDLERS:
+            TOOL_HANDLERS[tool_name]
+    if any(get_tool_category(name) == "function_analysis" for name in tool_names):
+        from tools.tree_sitter_analyzer import get_analyzer
+        get_analyzer()
+
+
+def _run_in_process(tool_name: str, arguments: Dict[str, Any], slot: int,
+                    trace_context: Optional[Tuple[str, str]]) -> Tuple[bytes, float, float, List[Dict[str, Any]]]:
+    """
+    워커 프로세스에서 핸들러 실행
+
+    Returns:
+        (pickle된 결과, 핸들러 실행 시간, 결과 직렬화 시간, 워커에서 기록한 span 목록)
+        - 직렬화를 직접 해서 IPC 비용을 나눠 측정한다
+    """
+    from tool_dispatcher import run_handler_sync
+    from tools_registry import TOOL_HANDLERS
+
+    set_current_token(_SharedCancelToken(slot))
+    try:
+        start = time.perf_counter()
+        result, spans = run_with_remote_parent(trace_context, run_handler_sync, TOOL_HANDLERS[tool_name], arguments)
+        handler_seconds = time.perf_counter() - start
+    finally:
+        set_current_token(None)
+
+    start = time.perf_counter()
+    payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+    return payload, handler_seconds, time.perf_counter() - start, spans
+
+
+def _warm_up() -> None:
+    """워커 프로세스를 띄우기 위한 빈 작업"""
+
+
+# ==================== 부모 프로세스 쪽 ====================
+
+class ToolProcessPool:
+    """
+    CPU 위주 도구를 실행하는 프로세스 풀 (디스패처 워커 스레드에서 run() 호출)
+
+    동시에 넘기는 호출은 워커 수로 제한하므로 풀 내부 대기열이 생기지 않고, 측정한 IPC 시간에
+    대기 시간이 섞이지 않는다. 호출마다 공유 취소 플래그 슬롯 하나를 빌려 준다.
+    """
+
+    def __init__(self, max_workers: int, tool_names: Iterable[str]):
+        self.max_workers = max_workers
+        self.tool_names = frozenset(tool_names)
+        self._context = multiprocessing.get_context("spawn")
+        self._cancel_flags = self._context.RawArray("b", max_workers)
+        self._free_slots: "queue.Queue[int]" = queue.Queue()
+        for slot in range(max_workers):
+            self._free_slots.put(slot)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self.restarts = 0
+
+    def handles(self, tool_name: str) -> bool:
+        """프로세스 풀로 보낼 도구인지 확인"""
+        return tool_name in self.tool_names
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=self._context,
+                    initializer=_init_worker,
+                    initargs=(self._cancel_flags, list(config.ALLOWED_DIRECTORIES),
+                              sorted(self.tool_names), get_logging_settings()),
+                )
+                # 워커를 미리 모두 띄워 프로세스 시작/초기화 시간이 첫 호출의 IPC 통계에 섞이지 않게 함
+                wait([self._pool.submit(_warm_up) for _ in range(self.max_workers)])
+                logger.debug(f"Process pool started with {self.max_workers} workers")
+            return self._pool
+
+    def start(self) -> None:
+        """워커 프로세스를 미리 띄움 (시작 예열용, 이미 떠 있으면 아무것도 하지 않음)"""
+        self._get_pool()
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        """워커가 비정상 종료된 풀 폐기 (다음 호출에서 새로 생성)"""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+                self.restarts += 1
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, tool_name: str, arguments: Dict[str, Any], token: CancelToken) -> Any:
+        """
+        워커 프로세스에서 도구를 실행하고 결과 반환 (블로킹, 디스패처 워커 스레드에서 호출)
+
+        호출이 취소되면 공유 플래그를 세워 워커의 check_cancelled()가 멈추게 하고,
+        스레드 실행과 같이 워커가 실제로 끝날 때까지 기다린다.
+        """
+        with span("process_pool", tool=tool_name) as pool_span:
+            result, ipc_seconds = self._run(tool_name, arguments, token)
+            pool_span.set_attribute("ipc_ms", round(ipc_seconds * 1000, 3))
+        return result
+
+    def _run(self, tool_name: str, arguments: Dict[str, Any], token: CancelToken) -> Tuple[Any, float]:
+        slot = self._free_slots.get()
+        try:
+            self._cancel_flags[slot] = 0
+            pool = self._get_pool()
+            start = time.perf_counter()
+            try:
+                try:
+                    future = pool.submit(_run_in_process, tool_name, arguments, slot, export_context())
+                except BrokenProcessPool:
+                    # 쉬는 동안 워커가 죽은 풀 - 호출은 아직 시작되지 않았으므로 새 풀에 한 번 더 제출
+                    self._discard_pool(pool)
+                    pool = self._get_pool()
+                    start = time.perf_counter()
+                    future = pool.submit(_run_in_process, tool_name, arguments, slot, export_context())
+                while not wait([future], timeout=_CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)[0]:
+                    if token.cancelled:
+                        self._cancel_flags[slot] = 1
+                payload, handler_seconds, serialize_seconds, spans = future.result()
+            except BrokenProcessPool:
+                self._discard_pool(pool)
+                self._record(tool_name, error=True)
+                raise RuntimeError(f"Process pool worker died while running {tool_name}")
+            except BaseException:
+                # 핸들러 예외와 OperationCancelled는 그대로 전달
+                self._record(tool_name, error=True)
+                raise
+            roundtrip = time.perf_counter() - start
+
+            start = time.perf_counter()
+            result = pickle.loads(payload)
+            deserialize_seconds = time.perf_counter() - start
+        finally:
+            self._cancel_flags[slot] = 0
+            self._free_slots.put(slot)
+
+        import_spans(spans)
+        self._record(tool_name, roundtrip=roundtrip + deserialize_seconds, handler=handler_seconds,
+                     serialize=serialize_seconds + deserialize_seconds, result_bytes=len(payload))
+        return result, max(0.0, roundtrip + deserialize_seconds - handler_seconds)
+
+    def _record(self, tool_name: str, roundtrip: float = 0.0, handler: float = 0.0, serialize: float = 0.0,
+                result_bytes: int = 0, error: bool = False) -> None:
+        with self._lock:
+            stats = self._stats.get(tool_name)
+            if stats is None:
+                stats = {"calls": 0, "errors": 0, "roundtrip": 0.0, "handler": 0.0, "serialize": 0.0,
+                         "max_ipc": 0.0, "result_bytes": 0}
+                self._stats[tool_name] = stats
+            if error:
+                stats["errors"] += 1
+                return
+            ipc = max(0.0, roundtrip - handler)
+            stats["calls"] += 1
+            stats["roundtrip"] += roundtrip
+            stats["handler"] += handler
+            stats["serialize"] += serialize
+            stats["max_ipc"] = max(stats["max_ipc"], ipc)
+            stats["result_bytes"] += result_bytes
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        도구별 IPC 비용 통계
+
+        ipc = 왕복 시간 - 워커의 핸들러 실행 시간 (인자/결과 pickle, 프로세스 간 전송, 결과 복원 포함)
+        """
+        with self._lock:
+            tools = {}
+            for tool_name, stats in sorted(self._stats.items()):
+                calls = stats["calls"]
+                tools[tool_name] = {
+                    "calls": calls,
+                    "errors": stats["errors"],
+                    "avg_roundtrip_ms": round(stats["roundtrip"] / calls * 1000, 3) if calls else 0.0,
+                    "avg_handler_ms": round(stats["handler"] / calls * 1000, 3) if calls else 0.0,
+                    "avg_ipc_ms": round((stats["roundtrip"] - stats["handler"]) / calls * 1000, 3) if calls else 0.0,
+                    "max_ipc_ms": round(stats["max_ipc"] * 1000, 3),
+                    "avg_serialize_ms": round(stats["serialize"] / calls * 1000, 3) if calls else 0.0,
+                    "avg_result_bytes": stats["result_bytes"] // calls if calls else 0,
+                }
+            running = self._pool is not None
+
+        return {
+            "max_workers": self.max_workers,
+            "running": running,
+            "busy": self.max_workers - self._free_slots.qsize(),
+            "restarts": self.restarts,
+            "tools": tools,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """워커 프로세스 종료"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_process_pool: Optional[ToolProcessPool] = None
+_process_pool_created = False
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> Optional[ToolProcessPool]:
+    """전역 프로세스 풀 반환 (config.PROCESS_POOL_WORKERS가 0이거나 대상 도구가 없으면 None)"""
+    global _process_pool, _process_pool_created
+    if not _process_pool_created:
+        with _process_pool_lock:
+            if not _process_pool_created:
+                if config.PROCESS_POOL_WORKERS > 0 and config.PROCESS_POOL_TOOLS:
+                    _process_pool = ToolProcessPool(config.PROCESS_POOL_WORKERS, config.PROCESS_POOL_TOOLS)
+                    logger.debug(f"CPU-bound tools routed to process pool: "
+                                 f"{', '.join(sorted(config.PROCESS_POOL_TOOLS))}")
+                _process_pool_created = True
+    return _process_pool
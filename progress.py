@@ -0,0 +1,121 @@
+"""
+도구 진행 상황 알림
+MCP 클라이언트가 progressToken을 보낸 호출에 대해, 워커 스레드의 긴 루프가 report_progress()로
+알린 진행 상황(탐색한 파일 수, 처리한 바이트, 찾은 매치 수 등)을 일정 간격으로 이벤트 루프에 전달한다.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Set
+
+import config
+from server_logging import get_logger
+
+logger = get_logger("progress")
+
+# (progress, total, message)를 받아 알림을 보내는 코루틴 함수 (이벤트 루프에서 실행)
+ProgressSink = Callable[[float, Optional[float], Optional[str]], Awaitable[None]]
+
+# 워커 스레드별 현재 호출의 진행 상황 보고기
+_thread_state = threading.local()
+
+
+def format_progress_message(counters: dict) -> str:
+    """카운터들을 "files: 120, bytes: 52311, matches: 4" 형태의 메시지로 변환"""
+    return ", ".join(f"{name}: {value}" for name, value in counters.items())
+
+
+class ProgressReporter:
+    """
+    워커 스레드에서 보고한 진행 상황을 config.PROGRESS_MIN_INTERVAL 간격으로 sink들에 전달
+
+    sink가 없으면 report()는 바로 반환하므로 진행 알림을 요청하지 않은 호출에는 비용이 거의 없다.
+    병합된 호출(CallCoalescer)은 하나의 보고기에 호출마다 sink를 추가해 같은 진행 상황을 받는다.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, interval: Optional[float] = None):
+        self._loop = loop
+        self._sinks: List[ProgressSink] = []
+        self._pending: Set[asyncio.Future] = set()
+        self._lock = threading.Lock()
+        self.interval = config.PROGRESS_MIN_INTERVAL if interval is None else interval
+        self._next_time = 0.0
+        self._last_progress: Optional[float] = None
+
+    @property
+    def active(self) -> bool:
+        """알림을 받을 sink가 있는지 여부"""
+        return bool(self._sinks)
+
+    def add_sink(self, sink: ProgressSink) -> None:
+        """알림 대상 추가 (이벤트 루프 스레드에서 호출)"""
+        self._sinks = self._sinks + [sink]
+
+    def remove_sink(self, sink: ProgressSink) -> None:
+        """알림 대상 제거 (호출이 끝나거나 취소된 경우)"""
+        self._sinks = [s for s in self._sinks if s is not sink]
+
+    def report(self, progress: float, total: Optional[float] = None, **counters: Any) -> None:
+        """
+        진행 상황 보고 (워커 스레드에서 호출, 간격 제한에 걸리면 버림)
+
+        Args:
+            progress: 증가하는 진행 값 (MCP 규격상 이전 알림보다 커야 하므로 줄어든 값은 보내지 않음)
+            total: 전체 작업량 (알 수 없으면 None)
+            counters: 메시지로 전달할 카운터들
+        """
+        if not self._sinks:
+            return
+        now = time.monotonic()
+        if now < self._next_time:
+            return
+
+        with self._lock:
+            if now < self._next_time:
+                return
+            if self._last_progress is not None and progress <= self._last_progress:
+                return
+            self._next_time = now + self.interval
+            self._last_progress = progress
+
+        message = format_progress_message(counters) if counters else None
+        try:
+            self._loop.call_soon_threadsafe(self._emit, progress, total, message)
+        except RuntimeError:
+            # 이벤트 루프가 이미 닫힘 (서버 종료 중)
+            pass
+
+    def _emit(self, progress: float, total: Optional[float], message: Optional[str]) -> None:
+        """이벤트 루프에서 각 sink로 알림 전송 (전송 실패는 도구 실행에 영향을 주지 않음)"""
+        for sink in self._sinks:
+            task = asyncio.ensure_future(sink(progress, total, message))
+            self._pending.add(task)
+            task.add_done_callback(self._sent)
+
+    def _sent(self, task: asyncio.Future) -> None:
+        self._pending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Progress notification failed: {task.exception()}")
+
+
+def set_current_reporter(reporter: Optional[ProgressReporter]) -> None:
+    """현재 워커 스레드에 진행 상황 보고기 연결 (None이면 해제)"""
+    _thread_state.reporter = reporter
+
+
+def get_progress_reporter() -> Optional[ProgressReporter]:
+    """
+    현재 호출의 진행 상황 보고기 반환 (디스패처 밖에서 호출되면 None)
+
+    다른 스레드에서 보고해야 하는 경우(GitPython 진행 콜백 등) 워커 스레드에서 미리 가져와 넘긴다.
+    병합된 호출이 나중에 sink를 추가할 수 있으므로 sink가 아직 없어도 보고기를 반환한다.
+    """
+    return getattr(_thread_state, "reporter", None)
+
+
+def report_progress(progress: float, total: Optional[float] = None, **counters: Any) -> None:
+    """현재 호출의 진행 상황 보고 (디스패처 밖이거나 알림을 요청하지 않은 호출이면 아무것도 하지 않음)"""
+    reporter = getattr(_thread_state, "reporter", None)
+    if reporter is not None:
+        reporter.report(progress, total, **counters)
@@ -0,0 +1,110 @@
+"""
+도구 결과 직렬화
+MCP 텍스트 응답, FastAPI JSON 응답, NDJSON 스트리밍, 메트릭 결과 크기 계산이 공유하는 JSON 인코더
+(orjson이 설치되어 있으면 사용하고, 인코딩할 수 없는 값은 표준 json으로 대체)
+"""
+
+import json
+from typing import Dict, Any, Optional
+
+import config
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# 지원하는 출력 형식
+#   formatted: formatted_results가 있으면 그것만, 없으면 압축 JSON
+#   compact:   결과 전체를 압축 JSON으로
+#   raw:       텍스트와 파생 요약(RAW_DROPPED_KEYS)을 뺀 구조화 데이터만 압축 JSON으로
+#   pretty:    formatted 와 같지만 JSON을 들여쓰기해서 출력 (이전 동작)
+OUTPUT_FORMATS = ("formatted", "compact", "raw", "pretty")
+
+FORMATTED_KEY = "formatted_results"
+
+# raw 형식에서 검색 결과가 빼는 키 - 남는 구조화 목록 하나(raw_results/file_results/detailed_results)에서 다시 얻을 수 있음
+#   formatted_results: 같은 매칭의 텍스트 표현 (search_in_file, search_in_directory, regex_search)
+#   statistics:        파일별 매칭 수/줄 번호 - file_results와 같고 합계는 최상위 키에 있음 (search_in_directory)
+#   match_lines:       매칭 줄 번호 - raw_results/detailed_results의 line_number (search_in_file, regex_search)
+RAW_DROPPED_KEYS = frozenset((FORMATTED_KEY, "statistics", "match_lines"))
+
+
+def _resolve_backend(name: str) -> str:
+    """설정된 백엔드 이름을 실제 사용할 백엔드로 변환"""
+    name = (name or "auto").lower()
+    if name == "json":
+        return "json"
+    if name not in ("auto", "orjson"):
+        raise ValueError(f"Unknown JSON backend: {name}")
+    return "orjson" if ORJSON_AVAILABLE else "json"
+
+
+JSON_BACKEND = _resolve_backend(config.JSON_BACKEND)
+
+
+def _stdlib_dumps(obj: Any, pretty: bool) -> str:
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2, default=str)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def dumps_bytes(obj: Any, pretty: bool = False) -> bytes:
+    """UTF-8 JSON 바이트로 직렬화"""
+    if JSON_BACKEND == "orjson":
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        try:
+            return orjson.dumps(obj, default=str, option=option)
+        except (TypeError, orjson.JSONEncodeError):
+            # 짝 없는 surrogate 문자, 64비트를 넘는 정수 등은 표준 json으로 처리
+            pass
+    return _stdlib_dumps(obj, pretty).encode("utf-8", "surrogatepass")
+
+
+def dumps(obj: Any, pretty: bool = False) -> str:
+    """JSON 문자열로 직렬화 (ensure_ascii=False와 같은 출력)"""
+    if JSON_BACKEND == "orjson":
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        try:
+            return orjson.dumps(obj, default=str, option=option).decode("utf-8")
+        except (TypeError, orjson.JSONEncodeError):
+            pass
+    return _stdlib_dumps(obj, pretty)
+
+
+def get_output_format(output_format: Optional[str] = None) -> str:
+    """출력 형식 검증 (None이면 config.RESULT_OUTPUT_FORMAT)"""
+    output_format = (output_format or config.RESULT_OUTPUT_FORMAT).lower()
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format} (expected one of {', '.join(OUTPUT_FORMATS)})")
+    return output_format
+
+
+def shape_result(result: Dict[str, Any], output_format: Optional[str] = None) -> Any:
+    """
+    출력 형식에 맞게 dict 결과에서 필요한 부분만 남김
+
+    검색 핸들러는 같은 매칭을 formatted_results(텍스트), 구조화 목록, 파생 요약(statistics/match_lines)으로
+    함께 돌려주므로 formatted는 텍스트만, raw는 구조화 목록 하나와 스칼라 요약만 남겨 중복 직렬화를 피한다.
+    """
+    output_format = get_output_format(output_format)
+    if output_format in ("formatted", "pretty") and FORMATTED_KEY in result:
+        return result[FORMATTED_KEY]
+    if output_format == "raw" and FORMATTED_KEY in result:
+        return {key: value for key, value in result.items() if key not in RAW_DROPPED_KEYS}
+    return result
+
+
+def format_tool_result(result: Any, output_format: Optional[str] = None) -> str:
+    """MCP 텍스트 응답용으로 도구 결과를 문자열로 변환"""
+    if not isinstance(result, dict):
+        return str(result)
+
+    output_format = get_output_format(output_format)
+    shaped = shape_result(result, output_format)
+    if isinstance(shaped, str):
+        return shaped
+    return dumps(shaped, pretty=output_format == "pretty")
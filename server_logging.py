@@ -0,0 +1,128 @@
+"""
+서버 로깅 설정
+레벨 기반 로깅, 도구 인자 요약/절단, JSON Lines 출력 지원
+(stdout은 MCP stdio 프로토콜이 사용하므로 로그는 항상 stderr 또는 파일로 출력)
+"""
+
+import json
+import logging
+import sys
+from typing import Any, Dict, Optional
+
+import config
+
+# 모든 서버 로거의 상위 로거 이름
+ROOT_LOGGER_NAME = "nexus"
+
+_TEXT_FORMAT = "[%(levelname)s] %(message)s"
+
+# 마지막으로 적용한 setup_logging() 인자 (하위 프로세스에 같은 설정을 적용할 때 사용)
+_applied_settings: Dict[str, Any] = {}
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """한 줄에 하나의 JSON 객체로 로그 레코드를 출력하는 포매터"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """서버 하위 로거 반환 (예: get_logger("mcp_server") → nexus.mcp_server)"""
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+
+def setup_logging(level: Optional[str] = None, json_lines: Optional[bool] = None,
+                  log_file: Optional[str] = None) -> None:
+    """
+    로깅 핸들러 설정 (인자가 None이면 config 값 사용)
+
+    Args:
+        level: 로그 레벨 이름 (DEBUG/INFO/WARNING/ERROR)
+        json_lines: True면 JSON Lines 형식으로 출력
+        log_file: 로그 파일 경로 (None이면 stderr)
+    """
+    level = (level or config.LOG_LEVEL).upper()
+    json_lines = config.LOG_JSON if json_lines is None else json_lines
+    log_file = log_file or config.LOG_FILE
+
+    if log_file:
+        handler: logging.Handler = logging.FileHandler(log_file, encoding="utf-8")
+    else:
+        handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonLinesFormatter() if json_lines else logging.Formatter(_TEXT_FORMAT))
+
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(getattr(logging, level, logging.INFO))
+    root.propagate = False
+    _applied_settings.update(level=level, json_lines=json_lines, log_file=log_file)
+
+
+def get_logging_settings() -> Dict[str, Any]:
+    """현재 적용된 로깅 설정 (setup_logging()에 그대로 넘길 수 있는 인자)"""
+    return dict(_applied_settings)
+
+
+def _summarize_value(value: Any, max_length: int, depth: int) -> Any:
+    """긴 문자열/리스트를 잘라 로그에 안전한 크기로 축약"""
+    if isinstance(value, str):
+        if len(value) <= max_length:
+            return value
+        return f"{value[:max_length]}…<{len(value)} chars>"
+    if isinstance(value, (bytes, bytearray)):
+        return f"<{len(value)} bytes>"
+    if isinstance(value, dict):
+        if depth <= 0:
+            return f"<dict {len(value)} keys>"
+        return {k: _summarize_value(v, max_length, depth - 1) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        if depth <= 0:
+            return f"<list {len(value)} items>"
+        items = [_summarize_value(v, max_length, depth - 1) for v in value[:config.LOG_MAX_LIST_ITEMS]]
+        if len(value) > config.LOG_MAX_LIST_ITEMS:
+            items.append(f"…<{len(value)} items>")
+        return items
+    return value
+
+
+def summarize_arguments(arguments: Optional[Dict[str, Any]], max_length: Optional[int] = None) -> Dict[str, Any]:
+    """
+    도구 인자를 로그용으로 요약 (write_file의 content 같은 대용량 값 절단)
+
+    Args:
+        arguments: 도구 인자 딕셔너리
+        max_length: 문자열 값 최대 길이 (None이면 config.LOG_MAX_ARG_LENGTH)
+    """
+    if not arguments:
+        return {}
+    max_length = config.LOG_MAX_ARG_LENGTH if max_length is None else max_length
+    return _summarize_value(arguments, max_length, depth=2)
+
+
+def log_tool_call(logger: logging.Logger, source: str, tool_name: str, arguments: Dict[str, Any]) -> None:
+    """도구 호출 로그 - DEBUG 레벨이 꺼져 있으면 인자 요약 비용도 들지 않음"""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    summary = summarize_arguments(arguments)
+    logger.debug(
+        "%s tool called: %s with args: %s", source, tool_name, summary,
+        extra={"fields": {"tool": tool_name, "source": source, "arguments": summary}},
+    )
+
+
+# import 시점에 config 기본값으로 설정 (main.py가 명령행 옵션으로 다시 설정할 수 있음)
+setup_logging()
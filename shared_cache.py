@@ -0,0 +1,213 @@
+"""
+파일 기반 결과 캐시 (인코딩 감지, 줄 위치 색인, tree-sitter 분석 결과)
+항목은 파일의 (mtime_ns, size)로 검증하므로 파일이 바뀌면 자동으로 무효화된다.
+
+- 프로세스 내부: LRU 딕셔너리
+- --workers N 모드: 환경 변수 NEXUS_SHARED_CACHE가 가리키는 SQLite 파일을 워커들이 함께 사용
+  (값은 JSON으로 저장 - 파일을 다른 사용자가 건드려도 역직렬화로 코드가 실행되지 않도록 pickle은 쓰지 않음)
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import config
+from server_logging import get_logger
+
+logger = get_logger("shared_cache")
+
+# 메인 프로세스가 워커 프로세스들에게 SQLite 캐시 경로를 전달하는 환경 변수
+SHARED_CACHE_ENV = "NEXUS_SHARED_CACHE"
+
+_MISSING = object()
+
+
+def create_private_cache_path() -> str:
+    """
+    --workers 모드의 기본 공유 캐시 경로 - 새로 만든 비공개 임시 디렉토리(0700) 안의 SQLite 파일
+
+    공용 임시 디렉토리에 예측 가능한 이름으로 두면 다른 사용자가 먼저 파일이나 심볼릭 링크를 만들어
+    항목을 심을 수 있으므로 mkdtemp로 서버 실행 사용자만 접근할 수 있는 디렉토리를 만든다 (정리는 호출한 쪽).
+    """
+    directory = tempfile.mkdtemp(prefix="nexus-shared-cache-")
+    return os.path.join(directory, "cache.sqlite3")
+
+
+def file_validator(path: Any) -> Optional[Tuple[int, int]]:
+    """캐시 검증용 (mtime_ns, size) - 파일이 없으면 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class SharedCache:
+    """파일 상태로 검증하는 2단계 (메모리 → SQLite) 캐시"""
+
+    def __init__(self, db_path: Optional[str] = None, memory_entries: int = 1024,
+                 max_db_entries: int = 50000):
+        self.db_path = db_path
+        self.memory_entries = memory_entries
+        self.max_db_entries = max_db_entries
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[Tuple[int, int], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes = 0
+        self._stats = {"hits": 0, "db_hits": 0, "misses": 0}
+
+        if db_path:
+            try:
+                self._connect()
+            except sqlite3.Error as e:
+                logger.warning(f"Shared cache disabled ({db_path}): {e}")
+                self.db_path = None
+
+    # ==================== SQLite ====================
+
+    def _connect(self) -> sqlite3.Connection:
+        """스레드별 SQLite 연결 (최초 사용 시 생성)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL,"
+                " mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL,"
+                " value BLOB NOT NULL, updated_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._local.conn = conn
+        return conn
+
+    def _db_get(self, namespace: str, key: str, validator: Tuple[int, int]) -> Any:
+        try:
+            row = self._connect().execute(
+                "SELECT mtime_ns, size, value FROM cache WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug(f"Shared cache read failed: {e}")
+            return _MISSING
+        if row is None or (row[0], row[1]) != validator:
+            return _MISSING
+        try:
+            return json.loads(row[2])
+        except (TypeError, ValueError):
+            # JSON이 아닌 값 (이전 버전이 pickle로 저장한 항목 등)은 없는 것으로 취급
+            return _MISSING
+
+    def _db_set(self, namespace: str, key: str, validator: Tuple[int, int], value: Any) -> None:
+        """JSON으로 직렬화할 수 있는 값만 저장 (인코딩 이름, 줄 위치 목록, 함수 목록 dict)"""
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, mtime_ns, size, value, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, key, validator[0], validator[1],
+                 json.dumps(value, ensure_ascii=False, separators=(",", ":")), time.time()),
+            )
+            with self._lock:
+                self._writes += 1
+                prune = self._writes % 1000 == 0
+            if prune:
+                # 가끔 오래된 항목을 정리해 파일 크기 제한
+                conn.execute(
+                    "DELETE FROM cache WHERE rowid IN ("
+                    " SELECT rowid FROM cache ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_db_entries,),
+                )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.debug(f"Shared cache write failed: {e}")
+
+    # ==================== 공개 API ====================
+
+    def get(self, namespace: str, path: Any, extra_key: str = "",
+            validator: Optional[Tuple[int, int]] = None) -> Any:
+        """
+        캐시된 값 반환 (없거나 파일이 바뀌었으면 None)
+
+        Args:
+            namespace: 캐시 종류 (예: "encoding", "line_index")
+            path: 값이 의존하는 파일 경로 (validator를 넘기면 파일 식별자 등 임의의 키)
+            extra_key: 같은 파일에 대한 값이 여러 개일 때 구분 키 (예: 옵션)
+            validator: 이미 잰 (mtime_ns, size) - 없으면 path를 stat
+        """
+        validator = validator or file_validator(path)
+        if validator is None:
+            return None
+
+        key = (namespace, f"{os.fspath(path)}\0{extra_key}")
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] == validator:
+                self._memory.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[1]
+
+        if self.db_path:
+            value = self._db_get(namespace, key[1], validator)
+            if value is not _MISSING:
+                self._remember(key, validator, value)
+                with self._lock:
+                    self._stats["db_hits"] += 1
+                return value
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def set(self, namespace: str, path: Any, value: Any, extra_key: str = "",
+            validator: Optional[Tuple[int, int]] = None) -> None:
+        """
+        값 저장 (validator는 값을 계산하기 전에 잰 파일 상태 - 계산 도중 파일이 바뀌면 다음 조회에서 버려짐)
+        """
+        validator = validator or file_validator(path)
+        if validator is None or value is None:
+            return
+
+        key = (namespace, f"{os.fspath(path)}\0{extra_key}")
+        self._remember(key, validator, value)
+        if self.db_path:
+            self._db_set(namespace, key[1], validator, value)
+
+    def get_or_compute(self, namespace: str, path: Any, compute: Callable[[], Any], extra_key: str = "") -> Any:
+        """캐시된 값이 없으면 compute()로 계산해 저장 후 반환"""
+        value = self.get(namespace, path, extra_key)
+        if value is not None:
+            return value
+        validator = file_validator(path)
+        value = compute()
+        if validator is not None:
+            self.set(namespace, path, value, extra_key, validator=validator)
+        return value
+
+    def _remember(self, key: Tuple[str, str], validator: Tuple[int, int], value: Any) -> None:
+        with self._lock:
+            self._memory[key] = (validator, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 적중 통계 (/health)"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        stats["backend"] = "sqlite" if self.db_path else "memory"
+        return stats
+
+
+# 전역 캐시 (워커 프로세스는 메인 프로세스가 설정한 SQLite 경로를 공유)
+shared_cache = SharedCache(
+    db_path=os.environ.get(SHARED_CACHE_ENV) or None,
+    memory_entries=config.CACHE_MEMORY_ENTRIES,
+    max_db_entries=config.SHARED_CACHE_MAX_ENTRIES,
+)
@@ -0,0 +1,81 @@
+"""
+시작 시간 프로파일러
+main.py --profile-startup 에서 import/초기화 단계별 소요 시간을 기록하고 정렬된 보고서 출력
+(uvloop 설정보다 먼저 import 되므로 표준 라이브러리만 사용)
+"""
+
+import json
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+
+class StartupProfiler:
+    """단계별 wall time 기록기 - 비활성 상태에서는 아무것도 기록하지 않음"""
+
+    def __init__(self):
+        self.enabled = False
+        self.created_at = time.perf_counter()
+        self._phases: List[Dict[str, Any]] = []
+        self._depth = 0
+
+    def enable(self) -> None:
+        """프로파일링 활성화"""
+        self.enabled = True
+
+    @contextmanager
+    def phase(self, name: str):
+        """with 블록의 실행 시간을 하나의 단계로 기록"""
+        if not self.enabled:
+            yield
+            return
+
+        depth = self._depth
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.record(name, time.perf_counter() - start, depth=depth)
+
+    def record(self, name: str, seconds: float, depth: Optional[int] = None) -> None:
+        """외부에서 측정한 단계 시간 기록 (depth > 0 이면 하위 단계)"""
+        if not self.enabled:
+            return
+        self._phases.append({
+            "phase": name,
+            "ms": round(seconds * 1000, 3),
+            "depth": self._depth if depth is None else depth,
+        })
+
+    def get_phases(self) -> List[Dict[str, Any]]:
+        """소요 시간 내림차순으로 정렬된 단계 목록"""
+        return sorted(self._phases, key=lambda p: p["ms"], reverse=True)
+
+    def get_total_ms(self) -> float:
+        """최상위 단계 시간 합계 (하위 단계는 상위 단계에 포함되므로 제외)"""
+        return round(sum(p["ms"] for p in self._phases if p["depth"] == 0), 3)
+
+    def print_report(self, title: str = "Startup profile") -> None:
+        """정렬된 보고서를 stderr로 출력"""
+        total = self.get_total_ms()
+        print(f"[PROFILE] {title}", file=sys.stderr)
+        for phase in self.get_phases():
+            share = (phase["ms"] / total * 100) if total else 0.0
+            marker = "  └ " if phase["depth"] else ""
+            print(f"[PROFILE] {phase['ms']:10.1f} ms  ({share:5.1f}%)  {marker}{phase['phase']}", file=sys.stderr)
+        print(f"[PROFILE] {total:10.1f} ms  total (top-level phases)", file=sys.stderr)
+
+    def write_json(self, path: str, **metadata: Any) -> None:
+        """보고서를 JSON 파일로 저장 (버전 간 비교용)"""
+        report = dict(metadata)
+        report["total_ms"] = self.get_total_ms()
+        report["phases"] = self.get_phases()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+# 전역 프로파일러
+startup_profiler = StartupProfiler()
@@ -0,0 +1,22 @@
+"""
+테스트 공통 설정
+저장소 루트의 모듈(config, tools 등)을 설치 없이 import할 수 있도록 경로에 추가한다.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def allowed_tmp_path(tmp_path):
+    """tmp_path만 허용 디렉토리로 둔 상태 (tools.utils가 같은 리스트 객체를 쓰므로 내용을 바꿨다가 되돌림)"""
+    import config
+
+    saved = list(config.ALLOWED_DIRECTORIES)
+    config.ALLOWED_DIRECTORIES[:] = [os.path.realpath(tmp_path)]
+    yield tmp_path
+    config.ALLOWED_DIRECTORIES[:] = saved
@@ -0,0 +1,97 @@
+"""수락 제어 미들웨어 - MCP over HTTP의 tools/call도 한도/대기열을 적용받는지 확인"""
+
+import asyncio
+import json
+
+import pytest
+
+import config
+from admission import AdmissionController
+from tools import fastapi_routes
+
+
+def _mcp_body(method, request_id=7, **params):
+    return json.dumps({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}).encode()
+
+
+async def _post(app, path, body):
+    """ASGI POST 요청 하나를 보내고 (상태 코드, 헤더, 본문) 반환"""
+    scope = {"type": "http", "method": "POST", "path": path, "headers": [], "query_string": b""}
+    chunks = [{"type": "http.request", "body": body[:10], "more_body": True},
+              {"type": "http.request", "body": body[10:], "more_body": False}]
+    sent = []
+
+    async def receive():
+        return chunks.pop(0) if chunks else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    start = next(m for m in sent if m["type"] == "http.response.start")
+    body = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+    return start["status"], dict(start["headers"]), body
+
+
+async def _echo_app(scope, receive, send):
+    """받은 본문을 그대로 돌려주는 하위 앱 (미들웨어가 읽은 본문을 다시 넘기는지 확인)"""
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": body})
+
+
+@pytest.fixture
+def saturated(monkeypatch):
+    """처리 한도 1, 대기열 0인 제어기의 슬롯을 이미 다 쓴 상태"""
+    controller = AdmissionController(max_in_flight=1, category_limits={}, default_category_limit=None,
+                                     max_queue=0, queue_timeout=None, retry_after=3)
+    monkeypatch.setattr(fastapi_routes, "get_admission_controller", lambda: controller)
+    monkeypatch.setattr(config, "MCP_HTTP_ENABLED", True)
+    asyncio.run(controller.acquire("file_operations"))
+    return controller
+
+
+def test_saturated_server_rejects_mcp_tool_call(saturated):
+    middleware = fastapi_routes.AdmissionControlMiddleware(_echo_app)
+    body = _mcp_body("tools/call", name="read_file", arguments={"path": "/tmp/x"})
+
+    status, headers, response = asyncio.run(_post(middleware, config.MCP_HTTP_PATH, body))
+
+    assert status == 429
+    assert headers[b"retry-after"] == b"3"
+    payload = json.loads(response)
+    assert payload["id"] == 7
+    assert payload["error"]["code"] == -32000
+    assert saturated.get_stats()["rejected"] == 1
+
+
+def test_saturated_server_still_handles_mcp_handshake(saturated):
+    middleware = fastapi_routes.AdmissionControlMiddleware(_echo_app)
+    body = _mcp_body("initialize", protocolVersion="2025-06-18")
+
+    status, _, response = asyncio.run(_post(middleware, config.MCP_HTTP_PATH, body))
+
+    # 도구 호출이 아닌 요청은 한도와 상관없이 통과하고, 미리 읽은 본문이 그대로 전달됨
+    assert status == 200
+    assert response == body
+
+
+def test_admitted_mcp_tool_call_is_counted_under_tool_category(monkeypatch):
+    controller = AdmissionController(max_in_flight=4, category_limits={}, default_category_limit=None,
+                                     max_queue=0, queue_timeout=None, retry_after=1)
+    monkeypatch.setattr(fastapi_routes, "get_admission_controller", lambda: controller)
+    middleware = fastapi_routes.AdmissionControlMiddleware(_echo_app)
+    body = _mcp_body("tools/call", name="read_file", arguments={})
+
+    status, _, response = asyncio.run(_post(middleware, config.MCP_HTTP_PATH, body))
+
+    assert status == 200
+    assert response == body
+    stats = controller.get_stats()
+    assert stats["in_flight"] == 0
+    assert stats["categories"][fastapi_routes.get_tool_category("read_file")]["admitted"] == 1
@@ -0,0 +1,45 @@
+"""analyze_project - 파일 수/크기 집계와 진행 알림 확인"""
+
+import asyncio
+
+from progress import set_current_reporter
+from tools.directory_manager import handle_analyze_project
+
+
+class RecordingReporter:
+    def __init__(self):
+        self.reports = []
+
+    def report(self, progress, total=None, **counters):
+        self.reports.append((progress, counters))
+
+
+def _make_project(root):
+    (root / "src").mkdir()
+    for i in range(3):
+        (root / "src" / f"m{i}.py").write_text("x" * 10, encoding="utf-8")
+    (root / "README").write_text("x" * 5, encoding="utf-8")
+
+
+def test_counts_files_and_reports_progress(allowed_tmp_path):
+    _make_project(allowed_tmp_path)
+    reporter = RecordingReporter()
+
+    set_current_reporter(reporter)
+    try:
+        result = asyncio.run(handle_analyze_project({"path": str(allowed_tmp_path)}))
+    finally:
+        set_current_reporter(None)
+
+    assert "Files: 4\n" in result
+    assert "Types: .py(3), no ext(1)" in result
+    assert [progress for progress, _ in reporter.reports] == [1, 2, 3, 4]
+    assert reporter.reports[-1][1] == {"files": 4, "bytes": 35}
+
+
+def test_runs_without_reporter(allowed_tmp_path):
+    _make_project(allowed_tmp_path)
+
+    result = asyncio.run(handle_analyze_project({"path": str(allowed_tmp_path)}))
+
+    assert "Files: 4\n" in result
@@ -0,0 +1,131 @@
+"""batch 도구와 POST /batch - 결과 순서, 순차 실행, 첫 실패 이후 건너뛰기, 항목별 오류 확인"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import tool_dispatcher
+from tool_dispatcher import dispatch_batch
+from tools import fastapi_routes
+
+
+@pytest.fixture
+def delayed_dispatch(monkeypatch):
+    """앞 항목일수록 늦게 끝나는 dispatch_tool (시작/종료 순서 기록)"""
+    events = []
+
+    async def dispatch(tool_name, arguments):
+        events.append(("start", arguments["n"]))
+        await asyncio.sleep(0.01 * (5 - arguments["n"]))
+        events.append(("end", arguments["n"]))
+        if arguments.get("fail"):
+            raise RuntimeError("boom")
+        return f"result {arguments['n']}"
+
+    monkeypatch.setattr(tool_dispatcher, "dispatch_tool", dispatch)
+    return events
+
+
+def _calls(*failing):
+    return [{"tool": "read_file", "arguments": {"n": n, "fail": n in failing}} for n in range(5)]
+
+
+def test_concurrent_results_keep_request_order(delayed_dispatch):
+    result = asyncio.run(dispatch_batch(_calls()))
+
+    assert [entry["result"] for entry in result["results"]] == [f"result {n}" for n in range(5)]
+    assert [entry["index"] for entry in result["results"]] == list(range(5))
+    # 모두 먼저 시작하고, 마지막 항목이 가장 먼저 끝남
+    assert delayed_dispatch[:5] == [("start", n) for n in range(5)]
+    assert delayed_dispatch[5] == ("end", 4)
+    assert result["sequential"] is False
+
+
+def test_sequential_runs_one_call_at_a_time(delayed_dispatch):
+    result = asyncio.run(dispatch_batch(_calls(), sequential=True))
+
+    assert [entry["result"] for entry in result["results"]] == [f"result {n}" for n in range(5)]
+    assert delayed_dispatch == [(event, n) for n in range(5) for event in ("start", "end")]
+    assert result["sequential"] is True
+
+
+def test_stop_on_error_skips_remaining_calls(delayed_dispatch):
+    result = asyncio.run(dispatch_batch(_calls(1), sequential=True, stop_on_error=True))
+
+    assert [entry["ok"] for entry in result["results"]] == [True, False, False, False, False]
+    assert "boom" in result["results"][1]["error"]
+    assert all(entry["error"].startswith("Skipped") for entry in result["results"][2:])
+    assert ("start", 2) not in delayed_dispatch
+    assert (result["succeeded"], result["failed"]) == (1, 4)
+
+
+def test_without_stop_on_error_later_calls_still_run(delayed_dispatch):
+    result = asyncio.run(dispatch_batch(_calls(1), sequential=True))
+
+    assert [entry["ok"] for entry in result["results"]] == [True, False, True, True, True]
+
+
+def test_errors_are_reported_per_entry(allowed_tmp_path):
+    (allowed_tmp_path / "a.txt").write_text("hello", encoding="utf-8")
+    outside = allowed_tmp_path.parent / (allowed_tmp_path.name + "-outside.txt")
+    outside.write_text("secret", encoding="utf-8")
+
+    result = asyncio.run(dispatch_batch([
+        {"tool": "read_file", "arguments": {"path": str(allowed_tmp_path / "a.txt")}},
+        {"tool": "no_such_tool", "arguments": {}},
+        {"tool": "read_file", "arguments": {"path": str(outside)}},
+        {"tool": "batch", "arguments": {"calls": []}},
+    ]))
+
+    ok, unknown, denied, nested = result["results"]
+    assert ok["ok"] and "hello" in ok["result"]
+    assert not unknown["ok"] and "Unknown tool" in unknown["error"]
+    assert not denied["ok"] and "Access denied" in denied["error"]
+    assert not nested["ok"] and "cannot be nested" in nested["error"]
+    assert (result["succeeded"], result["failed"]) == (1, 3)
+
+
+def test_rejects_empty_or_oversized_batch(monkeypatch):
+    with pytest.raises(ValueError, match="non-empty"):
+        asyncio.run(dispatch_batch([]))
+    monkeypatch.setattr(tool_dispatcher.config, "BATCH_MAX_CALLS", 2)
+    with pytest.raises(ValueError, match="Too many calls"):
+        asyncio.run(dispatch_batch(_calls()))
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    fastapi_routes.register_routes(app)
+    with TestClient(app) as client:
+        yield client
+
+
+def test_post_batch_route(client, allowed_tmp_path):
+    path = allowed_tmp_path / "notes.txt"
+
+    response = client.post("/batch", json={
+        "sequential": True,
+        "stop_on_error": True,
+        "calls": [
+            {"tool": "write_file", "arguments": {"path": str(path), "content": "first"}},
+            {"tool": "read_file", "arguments": {"path": str(path)}},
+            {"tool": "no_such_tool"},
+            {"tool": "read_file", "arguments": {"path": str(path)}},
+        ],
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [entry["ok"] for entry in body["results"]] == [True, True, False, False]
+    # 순차 실행이므로 앞 항목이 쓴 내용을 다음 항목이 읽음
+    assert "first" in body["results"][1]["result"]
+    assert "Unknown tool" in body["results"][2]["error"]
+    assert body["results"][3]["error"].startswith("Skipped")
+
+
+def test_post_batch_rejects_empty_calls(client):
+    response = client.post("/batch", json={"calls": []})
+    assert response.status_code == 400
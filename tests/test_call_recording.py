@@ -0,0 +1,124 @@
+"""호출 기록/재생 - 민감한 인자와 긴 문자열은 길이만 남기고, 크기 한도에서 멈추고, 재생 시 경로를 옮기는지 확인"""
+
+import asyncio
+import json
+import os
+
+import pytest
+
+import config
+import tool_dispatcher
+from call_recorder import REDACTED_KEY, CallRecorder, redact_value
+from call_replay import build_path_map, load_recording, restore_arguments
+from tool_dispatcher import dispatch_tool
+
+
+def _read_records(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_redacts_sensitive_keys_and_nested_operations():
+    arguments = {
+        "path": "/tmp/project/a.py",
+        "content": "secret file body",
+        "message": "commit message",
+        "operations": [{"type": "replace", "start": 3, "content": "new line"}],
+        "edit_operations": {"rename": {"replacement": "new_name", "count": 2}},
+    }
+
+    redacted = redact_value(arguments)
+
+    assert redacted["path"] == "/tmp/project/a.py"
+    assert redacted["content"] == {REDACTED_KEY: len("secret file body")}
+    assert redacted["message"] == {REDACTED_KEY: len("commit message")}
+    assert redacted["operations"] == [{"type": "replace", "start": 3, "content": {REDACTED_KEY: 8}}]
+    assert redacted["edit_operations"] == {"rename": {"replacement": {REDACTED_KEY: 8}, "count": 2}}
+
+
+def test_redacts_long_strings(monkeypatch):
+    monkeypatch.setattr(config, "CALL_RECORDING_MAX_STRING_CHARS", 10)
+
+    redacted = redact_value({"search_text": "a" * 11, "pattern": "a" * 10, "paths": ["b" * 20, "short"]})
+
+    assert redacted == {"search_text": {REDACTED_KEY: 11}, "pattern": "a" * 10,
+                        "paths": [{REDACTED_KEY: 20}, "short"]}
+
+
+def test_recording_stops_at_max_bytes(tmp_path):
+    path = tmp_path / "calls.jsonl"
+    recorder = CallRecorder(str(path), max_bytes=1000)
+    try:
+        for i in range(20):
+            recorder.record("read_file", {"path": f"/tmp/project/file_{i}.txt"}, 1000.0 + i, 0.001, True)
+    finally:
+        recorder.close()
+
+    stats = recorder.get_stats()
+    assert stats["stopped"] is True
+    assert stats["recorded"] > 0 and stats["dropped"] > 0
+    assert stats["recorded"] + stats["dropped"] == 20
+    assert os.path.getsize(path) == stats["bytes"] <= 1000
+    records = _read_records(path)
+    assert records[0]["type"] == "header"
+    assert len(records) == stats["recorded"] + 1
+
+
+def test_restore_arguments_maps_paths_and_fills_redacted_values(tmp_path):
+    snapshot = tmp_path / "snapshot"
+    snapshot.mkdir()
+    headers = [{"type": "header", "allowed_directories": ["/home/dev/project"]}]
+    path_map = build_path_map(headers, str(snapshot), ["/home/dev/project/vendor=/opt/vendor"])
+
+    restored = restore_arguments({
+        "path": "/home/dev/project/src/a.py",
+        "paths": ["/home/dev/project", "/home/dev/project/vendor/lib.py", "/home/dev/project-old/a.py"],
+        "content": {REDACTED_KEY: 5},
+        "operations": [{"start": 1, "content": {REDACTED_KEY: 3}}],
+        "search_text": "needle",
+    }, path_map)
+
+    assert restored == {
+        "path": os.path.join(os.path.realpath(snapshot), "src", "a.py"),
+        "paths": [os.path.realpath(snapshot), os.path.realpath("/opt/vendor") + "/lib.py",
+                  "/home/dev/project-old/a.py"],
+        "content": "xxxxx",
+        "operations": [{"start": 1, "content": "xxx"}],
+        "search_text": "needle",
+    }
+
+
+def test_snapshot_needs_single_recorded_directory(tmp_path):
+    headers = [{"allowed_directories": ["/a"]}, {"allowed_directories": ["/b"]}]
+    with pytest.raises(ValueError, match="exactly one"):
+        build_path_map(headers, str(tmp_path), [])
+
+
+def test_dispatched_calls_are_recorded_and_replayable(allowed_tmp_path, tmp_path, monkeypatch):
+    recording = tmp_path / "calls.jsonl"
+    recorder = CallRecorder(str(recording), max_bytes=config.CALL_RECORDING_MAX_BYTES)
+    monkeypatch.setattr(tool_dispatcher, "get_call_recorder", lambda: recorder)
+    target = allowed_tmp_path / "notes.txt"
+
+    async def run():
+        await dispatch_tool("write_file", {"path": str(target), "content": "hello world"})
+        await dispatch_tool("read_file", {"path": str(target), "timeout_seconds": 5})
+
+    try:
+        asyncio.run(run())
+    finally:
+        recorder.close()
+
+    headers, calls = load_recording(str(recording))
+    assert headers[0]["allowed_directories"] == config.ALLOWED_DIRECTORIES
+    assert [call["tool"] for call in calls] == ["write_file", "read_file"]
+    assert calls[0]["arguments"] == {"path": str(target), "content": {REDACTED_KEY: 11}}
+    assert calls[1]["arguments"]["timeout_seconds"] == 5
+    assert all(call["ok"] for call in calls)
+
+    snapshot = tmp_path / "snapshot"
+    path_map = build_path_map(headers, str(snapshot), [])
+    assert restore_arguments(calls[0]["arguments"], path_map) == {
+        "path": os.path.join(os.path.realpath(snapshot), "notes.txt"),
+        "content": "x" * 11,
+    }
@@ -0,0 +1,111 @@
+"""읽기 전용 호출 병합 - 같은 호출은 한 번만 실행하고, 취소는 기다리는 호출이 모두 떠났을 때만 전파되는지 확인"""
+
+import asyncio
+
+import pytest
+
+import tool_dispatcher
+from tool_dispatcher import CallCoalescer, ToolExecutor, dispatch_tool
+
+
+class GatedExecutor(ToolExecutor):
+    """gate가 열릴 때까지 기다렸다가 호출 인자를 돌려주는 실행기 (실행 횟수와 취소 여부 기록)"""
+
+    def __init__(self):
+        super().__init__(max_workers=2, category_limits={}, default_limit=2)
+        self.calls = []
+        self.cancelled = 0
+        self.gate = None
+
+    async def run(self, tool_name, arguments, reporter=None):
+        self.calls.append(tool_name)
+        try:
+            await self.gate.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return f"{tool_name}: {arguments['path']}"
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = GatedExecutor()
+    monkeypatch.setattr(tool_dispatcher, "_executor", executor)
+    monkeypatch.setattr(tool_dispatcher, "call_coalescer", CallCoalescer())
+    yield executor
+    executor.shutdown(wait=False)
+
+
+async def _settle():
+    """생성한 태스크들이 게이트 앞까지 진행하도록 이벤트 루프를 몇 번 돌림"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_identical_read_only_calls_share_one_execution(executor):
+    async def run():
+        executor.gate = asyncio.Event()
+        calls = [asyncio.ensure_future(dispatch_tool("analyze_project", {"path": "/tmp/project"}))
+                 for _ in range(5)]
+        other = asyncio.ensure_future(dispatch_tool("analyze_project", {"path": "/tmp/other"}))
+        await _settle()
+        executor.gate.set()
+        return await asyncio.gather(*calls), await other
+
+    results, other = asyncio.run(run())
+    assert results == ["analyze_project: /tmp/project"] * 5
+    assert other == "analyze_project: /tmp/other"
+    # 인자가 다른 호출은 따로 실행됨
+    assert executor.calls == ["analyze_project", "analyze_project"]
+    assert tool_dispatcher.call_coalescer.get_stats() == {"inflight": 0, "coalesced": 4}
+
+
+def test_mutating_calls_are_never_merged(executor):
+    async def run():
+        executor.gate = asyncio.Event()
+        calls = [asyncio.ensure_future(dispatch_tool("write_file", {"path": "/tmp/project/a.txt"}))
+                 for _ in range(3)]
+        await _settle()
+        executor.gate.set()
+        return await asyncio.gather(*calls)
+
+    asyncio.run(run())
+    assert executor.calls == ["write_file"] * 3
+    assert tool_dispatcher.call_coalescer.get_stats()["coalesced"] == 0
+
+
+def test_cancelling_one_waiter_keeps_shared_execution(executor):
+    async def run():
+        executor.gate = asyncio.Event()
+        first = asyncio.ensure_future(dispatch_tool("analyze_project", {"path": "/tmp/project"}))
+        second = asyncio.ensure_future(dispatch_tool("analyze_project", {"path": "/tmp/project"}))
+        await _settle()
+        first.cancel()
+        await _settle()
+        cancelled = executor.cancelled
+        executor.gate.set()
+        return first, await second, cancelled
+
+    first, second, cancelled = asyncio.run(run())
+    assert first.cancelled()
+    assert second == "analyze_project: /tmp/project"
+    assert executor.calls == ["analyze_project"]
+    assert cancelled == 0
+
+
+def test_cancelling_every_waiter_cancels_shared_execution(executor):
+    async def run():
+        executor.gate = asyncio.Event()
+        calls = [asyncio.ensure_future(dispatch_tool("analyze_project", {"path": "/tmp/project"}))
+                 for _ in range(3)]
+        await _settle()
+        for call in calls:
+            call.cancel()
+        await _settle()
+        # asyncio.run()이 남은 태스크를 정리하며 취소하기 전에 확인
+        return calls, executor.cancelled, tool_dispatcher.call_coalescer.get_stats()["inflight"]
+
+    calls, cancelled, inflight = asyncio.run(run())
+    assert all(call.cancelled() for call in calls)
+    assert cancelled == 1
+    assert inflight == 0
@@ -0,0 +1,52 @@
+"""인코딩 감지 캐시 - 같은 크기로 다시 쓴 파일에 낡은 결과를 돌려주지 않는지 확인"""
+
+import os
+import time
+
+import pytest
+
+from shared_cache import shared_cache
+from tools.utils import detect_file_encoding
+
+KOREAN = ("한글 텍스트 파일입니다 " * 20).encode("cp949")
+ASCII = b"a" * len(KOREAN)
+
+
+def _cached(path):
+    stat = os.stat(path)
+    return shared_cache.get("encoding", f"{stat.st_dev}:{stat.st_ino}",
+                            validator=(stat.st_mtime_ns, stat.st_size))
+
+
+def _set_mtime(path, mtime_ns):
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def text_file(tmp_path):
+    return tmp_path / "notes.txt"
+
+
+def test_same_size_rewrite_is_detected_again(text_file):
+    text_file.write_bytes(ASCII)
+    hour_ago = time.time_ns() - 3600 * 10**9
+    _set_mtime(text_file, hour_ago)
+    assert detect_file_encoding(text_file) == "utf-8"
+    assert _cached(text_file) == "utf-8"
+
+    text_file.write_bytes(KOREAN)
+    _set_mtime(text_file, hour_ago + 10**9)
+    assert os.stat(text_file).st_size == len(ASCII)
+    assert detect_file_encoding(text_file) == "cp949"
+
+
+def test_rewrite_within_same_timestamp_is_detected_again(text_file):
+    # mtime 해상도가 거친 파일 시스템 - 방금 쓴 파일을 같은 크기로 다시 써도 mtime이 그대로인 경우
+    text_file.write_bytes(ASCII)
+    mtime_ns = os.stat(text_file).st_mtime_ns
+    assert detect_file_encoding(text_file) == "utf-8"
+    assert _cached(text_file) is None
+
+    text_file.write_bytes(KOREAN)
+    _set_mtime(text_file, mtime_ns)
+    assert detect_file_encoding(text_file) == "cp949"
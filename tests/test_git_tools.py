@@ -0,0 +1,47 @@
+"""Git 도구 저장소 캐시 - 예열이 연 저장소를 재사용하고 .git이 바뀌면 새로 여는지 확인"""
+
+import asyncio
+import shutil
+import subprocess
+
+import pytest
+
+git = pytest.importorskip("git")
+
+from tools import git_tools  # noqa: E402
+
+
+def _commit(path, message):
+    subprocess.run(["git", "init", "-q"], cwd=path, check=True)
+    subprocess.run(["git", "add", "."], cwd=path, check=True)
+    subprocess.run(["git", "-c", "user.email=dev@example.com", "-c", "user.name=dev",
+                    "commit", "-qm", message], cwd=path, check=True)
+
+
+@pytest.fixture
+def repo_dir(allowed_tmp_path):
+    tmp_path = allowed_tmp_path
+    (tmp_path / "a.txt").write_text("a\n", encoding="utf-8")
+    _commit(tmp_path, "first")
+    yield tmp_path
+    git_tools._repositories.clear()
+
+
+def test_preloaded_repository_is_reused(repo_dir):
+    assert git_tools.preload_repository(str(repo_dir)) == str(repo_dir)
+    preloaded = git_tools._repositories.take(str(repo_dir))
+    git_tools._repositories.put(str(repo_dir), preloaded)
+
+    with git_tools.open_repository(repo_dir) as repo:
+        assert repo is preloaded
+        assert str(repo_dir) not in git_tools._repositories
+    assert str(repo_dir) in git_tools._repositories
+
+
+def test_recreated_repository_is_reopened(repo_dir):
+    git_tools.preload_repository(str(repo_dir))
+    shutil.rmtree(repo_dir / ".git")
+    _commit(repo_dir, "second")
+
+    log = asyncio.run(git_tools.handle_git_log({"repo_path": str(repo_dir)}))
+    assert "second" in log
@@ -0,0 +1,82 @@
+"""지연 로드 핸들러 - 첫 호출의 모듈 import가 이벤트 루프를 막지 않는지 확인"""
+
+import asyncio
+import sys
+import time
+
+import pytest
+
+import tool_dispatcher
+from tool_dispatcher import ToolExecutor
+from tools_registry import TOOL_HANDLERS
+
+SLOW_IMPORT_SECONDS = 0.3
+
+
+@pytest.fixture
+def slow_tool(tmp_path, monkeypatch):
+    """import에 SLOW_IMPORT_SECONDS가 걸리는 모듈의 도구를 TOOL_HANDLERS에 등록"""
+    module_name = f"slow_tool_module_{tmp_path.name}"
+    (tmp_path / f"{module_name}.py").write_text(
+        "import time\n"
+        f"time.sleep({SLOW_IMPORT_SECONDS})\n"
+        "async def handle(arguments):\n"
+        "    return 'done'\n",
+        encoding="utf-8",
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setitem(TOOL_HANDLERS._specs, "slow_tool", (module_name, "handle"))
+    yield "slow_tool"
+    TOOL_HANDLERS._resolved.pop("slow_tool", None)
+    sys.modules.pop(module_name, None)
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = ToolExecutor(max_workers=2, category_limits={}, default_limit=2)
+    monkeypatch.setattr(tool_dispatcher, "get_process_pool", lambda: None)
+    yield executor
+    executor.shutdown(wait=False)
+
+
+def test_first_call_imports_handler_off_event_loop(slow_tool, executor):
+    async def run():
+        gaps = []
+
+        async def ticker():
+            last = time.perf_counter()
+            while True:
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        task = asyncio.ensure_future(ticker())
+        result = await executor.run(slow_tool, {})
+        task.cancel()
+        return result, max(gaps)
+
+    result, max_gap = asyncio.run(run())
+    assert result == "done"
+    assert max_gap < SLOW_IMPORT_SECONDS / 2
+
+
+def test_unknown_tool_is_rejected_without_import(executor):
+    with pytest.raises(ValueError, match="Unknown tool"):
+        asyncio.run(executor.run("no_such_tool", {}))
+
+
+def test_process_pool_tool_is_not_resolved_in_parent(slow_tool, executor, monkeypatch):
+    class FakePool:
+        def handles(self, tool_name):
+            return True
+
+        def run(self, tool_name, arguments, token):
+            return "from pool"
+
+        def shutdown(self, wait=True):
+            pass
+
+    monkeypatch.setattr(tool_dispatcher, "get_process_pool", lambda: FakePool())
+    assert asyncio.run(executor.run(slow_tool, {})) == "from pool"
+    assert slow_tool not in TOOL_HANDLERS._resolved
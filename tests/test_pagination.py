@@ -0,0 +1,94 @@
+"""커서 페이지네이션 - 페이지를 이어 붙이면 전체 결과와 같고, 커서는 같은 질의에만 쓸 수 있는지 확인"""
+
+import asyncio
+import re
+import subprocess
+
+import pytest
+
+from tools.directory_manager import handle_list_directory
+from tools.file_search import handle_search_in_directory
+from tools.pagination import decode_cursor, encode_cursor
+
+NEXT_CURSOR = re.compile(r"^next_cursor: (\S+)$", re.MULTILINE)
+
+
+def _text_cursor(text):
+    match = NEXT_CURSOR.search(text)
+    return match.group(1) if match else None
+
+
+def test_cursor_round_trip_and_mismatch():
+    arguments = {"path": "/tmp/project", "limit": 10}
+    cursor = encode_cursor("list_directory", arguments, "b.txt")
+
+    # limit은 지문에서 빠지므로 페이지 크기를 바꿔도 이어서 조회할 수 있음
+    assert decode_cursor("list_directory", {"path": "/tmp/project", "limit": 5, "cursor": cursor}) == "b.txt"
+    with pytest.raises(ValueError, match="does not match"):
+        decode_cursor("list_directory", {"path": "/tmp/other", "cursor": cursor})
+    with pytest.raises(ValueError, match="does not match"):
+        decode_cursor("list_functions", {"path": "/tmp/project", "cursor": cursor})
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor("list_directory", {"path": "/tmp/project", "cursor": "not-a-cursor"})
+
+
+def test_list_directory_pages_cover_every_entry_once(allowed_tmp_path):
+    for i in range(7):
+        (allowed_tmp_path / f"file_{i}.txt").write_text("x", encoding="utf-8")
+
+    names = []
+    arguments = {"path": str(allowed_tmp_path), "limit": 3}
+    while True:
+        text = asyncio.run(handle_list_directory(arguments))
+        names += re.findall(r"\[FILE\] (\S+)", text)
+        cursor = _text_cursor(text)
+        if cursor is None:
+            break
+        arguments = {**arguments, "cursor": cursor}
+
+    assert names == [f"file_{i}.txt" for i in range(7)]
+
+
+def test_search_in_directory_pages_match_full_search(allowed_tmp_path):
+    for i in range(5):
+        sub = allowed_tmp_path / f"dir_{i % 2}"
+        sub.mkdir(exist_ok=True)
+        (sub / f"f{i}.txt").write_text("needle\nhay\n", encoding="utf-8")
+    base = {"directory": str(allowed_tmp_path), "search_text": "needle"}
+
+    full = asyncio.run(handle_search_in_directory(base))
+    pages = []
+    arguments = {**base, "limit": 2}
+    while True:
+        result = asyncio.run(handle_search_in_directory(arguments))
+        pages.append(list(result.get("file_results", {})))
+        if not result["next_cursor"]:
+            break
+        arguments = {**arguments, "cursor": result["next_cursor"]}
+
+    seen = [path for page in pages for path in page]
+    assert all(len(page) <= 2 for page in pages)
+    assert len(seen) == len(set(seen))
+    assert sorted(seen) == sorted(full["file_results"])
+
+
+def test_git_log_pages_are_stable_across_new_commits(allowed_tmp_path):
+    pytest.importorskip("git")
+    from tools.git_tools import handle_git_log
+
+    def commit(message):
+        subprocess.run(["git", "-c", "user.email=dev@example.com", "-c", "user.name=dev",
+                        "commit", "-q", "--allow-empty", "-m", message], cwd=allowed_tmp_path, check=True)
+
+    subprocess.run(["git", "init", "-q"], cwd=allowed_tmp_path, check=True)
+    for i in range(5):
+        commit(f"commit {i}")
+
+    first = asyncio.run(handle_git_log({"repo_path": str(allowed_tmp_path), "limit": 2}))
+    commit("new commit")
+    second = asyncio.run(handle_git_log({"repo_path": str(allowed_tmp_path), "limit": 2,
+                                         "cursor": _text_cursor(first)}))
+
+    assert re.findall(r" - (commit \d)", first) == ["commit 4", "commit 3"]
+    # 첫 페이지 이후 생긴 커밋이 끼어들지 않고 이어서 조회됨
+    assert re.findall(r" - (commit \d)", second) == ["commit 2", "commit 1"]
@@ -0,0 +1,74 @@
+"""경로 정규화 캐시 - 디렉토리 mtime이 바뀌면 캐시한 결과를 버리고 다시 확인하는지 확인"""
+
+import os
+
+import pytest
+
+import config
+from tools import utils
+from tools.utils import normalize_path
+
+
+@pytest.fixture
+def project(allowed_tmp_path):
+    """allowed_tmp_path/project/src/main.py 와 허용 디렉토리 밖의 outside/src/main.py"""
+    root = allowed_tmp_path / "project"
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "main.py").write_text("print()\n", encoding="utf-8")
+    outside = allowed_tmp_path.parent / (allowed_tmp_path.name + "-outside")
+    (outside / "src").mkdir(parents=True)
+    (outside / "src" / "main.py").write_text("print()\n", encoding="utf-8")
+    utils._resolved_paths.clear()
+    yield root, outside
+    utils._resolved_paths.clear()
+
+
+def _bump_mtime(path):
+    """파일 시스템의 mtime 해상도와 상관없이 확실히 다른 값으로 바꿈"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_cached_path_is_dropped_when_directory_mtime_changes(project):
+    root, _ = project
+    path = str(root / "src" / "main.py")
+
+    assert normalize_path(path) == root / "src" / "main.py"
+    assert utils._resolved_paths.get(path) is not None
+
+    _bump_mtime(root / "src")
+    assert utils._resolved_paths.get(path) is None
+
+
+def test_component_swapped_for_symlink_is_denied(project):
+    root, outside = project
+    path = str(root / "src" / "main.py")
+    normalize_path(path)
+
+    # src를 허용 디렉토리 밖을 가리키는 심볼릭 링크로 바꾸면 project의 mtime이 바뀌어 다시 해석됨
+    os.rename(root / "src", root / "src-old")
+    os.symlink(outside / "src", root / "src")
+    _bump_mtime(root)
+
+    with pytest.raises(PermissionError):
+        normalize_path(path)
+
+
+def test_changing_allowed_directories_clears_cache(project):
+    root, _ = project
+    path = str(root / "src" / "main.py")
+    normalize_path(path)
+
+    config.ALLOWED_DIRECTORIES[:] = [str(root / "other")]
+    with pytest.raises(PermissionError):
+        normalize_path(path)
+
+
+def test_sibling_with_same_prefix_is_denied(project):
+    root, _ = project
+    sibling = root.parent / (root.name + "-old")
+    sibling.mkdir()
+
+    config.ALLOWED_DIRECTORIES[:] = [str(root)]
+    with pytest.raises(PermissionError):
+        normalize_path(str(sibling))
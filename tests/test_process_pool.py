@@ -0,0 +1,100 @@
+"""CPU 위주 도구 프로세스 풀 - 라우팅, IPC 통계, 공유 플래그 취소, 워커가 죽은 뒤 다시 띄우기 확인"""
+
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+
+import pytest
+
+import process_pool
+import tool_dispatcher
+from cancellation import CancelToken, OperationCancelled, check_cancelled, set_current_token
+from process_pool import ToolProcessPool, _SharedCancelToken
+from tool_dispatcher import ToolExecutor
+
+
+@pytest.fixture
+def source_file(allowed_tmp_path):
+    path = allowed_tmp_path / "module.py"
+    path.write_text("def first():\n    pass\n\ndef second():\n    pass\n", encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def pool(source_file):
+    """regex_search만 맡는 워커 1개짜리 풀 (spawn - 워커는 허용 디렉토리를 풀 생성 시점에 받음)"""
+    pool = ToolProcessPool(1, ["regex_search"])
+    yield pool
+    pool.shutdown()
+
+
+def _regex_search(path):
+    return {"path": str(path), "pattern": r"def (\w+)"}
+
+
+def test_pool_tools_are_routed_to_worker_process(pool, source_file, monkeypatch):
+    executor = ToolExecutor(max_workers=2, category_limits={}, default_limit=2)
+    monkeypatch.setattr(tool_dispatcher, "get_process_pool", lambda: pool)
+
+    async def run():
+        return (await executor.run("regex_search", _regex_search(source_file)),
+                await executor.run("read_file", {"path": str(source_file)}))
+
+    try:
+        matches, text = asyncio.run(run())
+    finally:
+        executor.shutdown(wait=False)
+
+    assert matches["total_matches"] == 2
+    assert "def first" in text
+    stats = pool.get_stats()
+    # 풀 대상이 아닌 read_file은 스레드 풀에서 실행되어 통계에 없음
+    assert list(stats["tools"]) == ["regex_search"]
+    tool_stats = stats["tools"]["regex_search"]
+    assert (tool_stats["calls"], tool_stats["errors"]) == (1, 0)
+    assert tool_stats["avg_result_bytes"] > 0
+    assert tool_stats["avg_roundtrip_ms"] >= tool_stats["avg_handler_ms"]
+    assert tool_stats["avg_ipc_ms"] >= 0
+    assert (stats["busy"], stats["restarts"]) == (0, 0)
+
+
+def test_shared_flag_cancels_worker_token(monkeypatch):
+    flags = multiprocessing.get_context("spawn").RawArray("b", 2)
+    monkeypatch.setattr(process_pool, "_worker_cancel_flags", flags)
+
+    set_current_token(_SharedCancelToken(1))
+    try:
+        check_cancelled()
+        flags[0] = 1
+        check_cancelled()
+        flags[1] = 1
+        with pytest.raises(OperationCancelled):
+            check_cancelled()
+    finally:
+        set_current_token(None)
+
+
+def test_cancelled_call_releases_its_flag_slot(pool, source_file):
+    token = CancelToken()
+    token.cancel("timeout")
+    # 핸들러가 취소 확인 전에 끝나도 슬롯과 플래그는 다음 호출을 위해 초기화됨
+    pool.run("regex_search", _regex_search(source_file), token)
+
+    assert list(pool._cancel_flags) == [0]
+    assert pool.get_stats()["busy"] == 0
+
+
+def test_pool_restarts_after_worker_dies(pool, source_file):
+    pool.start()
+    for pid in list(pool._pool._processes):
+        os.kill(pid, signal.SIGKILL)
+    time.sleep(0.5)
+
+    result = pool.run("regex_search", _regex_search(source_file), CancelToken())
+
+    assert result["total_matches"] == 2
+    stats = pool.get_stats()
+    assert stats["restarts"] == 1
+    assert stats["tools"]["regex_search"]["calls"] == 1
@@ -0,0 +1,20 @@
+"""출력 형식 - raw는 검색 결과의 구조화 목록 하나만 남기는지 확인"""
+
+import asyncio
+
+from result_serializer import dumps_bytes, shape_result
+from tools.file_search import handle_search_in_directory
+
+
+def test_raw_keeps_single_structured_view(allowed_tmp_path):
+    tmp_path = allowed_tmp_path
+    for i in range(3):
+        (tmp_path / f"f{i}.txt").write_text("alpha\nbeta alpha\n", encoding="utf-8")
+
+    result = asyncio.run(handle_search_in_directory({"directory": str(tmp_path), "search_text": "alpha"}))
+    raw = shape_result(result, "raw")
+
+    assert "file_results" in raw
+    assert not {"formatted_results", "statistics", "match_lines"} & raw.keys()
+    assert raw["total_matches"] == 6
+    assert len(dumps_bytes(raw)) < len(dumps_bytes(shape_result(result, "compact")))
@@ -0,0 +1,61 @@
+"""공유 캐시 - 기본 경로는 비공개 디렉토리에 두고, SQLite 값은 JSON으로만 읽는지 확인"""
+
+import os
+import pickle
+import shutil
+import sqlite3
+import stat
+
+import pytest
+
+from shared_cache import SharedCache, create_private_cache_path
+
+_planted = []
+
+
+class _Payload:
+    """pickle.loads 하면 _planted에 기록하는 객체 (심어 둔 항목이 실행되는지 확인용)"""
+
+    def __reduce__(self):
+        return _planted.append, ("executed",)
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "source.txt"
+    path.write_text("x\n", encoding="utf-8")
+    return path
+
+
+def test_default_cache_path_is_in_private_directory():
+    path = create_private_cache_path()
+    try:
+        directory = os.path.dirname(path)
+        assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+        assert not os.path.exists(path)
+        assert path != create_private_cache_path()
+    finally:
+        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+
+def test_values_round_trip_through_sqlite_as_json(tmp_path, source):
+    db_path = str(tmp_path / "cache.sqlite3")
+    SharedCache(db_path).set("list_functions", source, {"functions": [{"name": "f", "line": 1}]})
+
+    # 다른 워커 (메모리 캐시가 빈 새 인스턴스)
+    assert SharedCache(db_path).get("list_functions", source) == {"functions": [{"name": "f", "line": 1}]}
+    stored = sqlite3.connect(db_path).execute("SELECT value FROM cache").fetchone()[0]
+    assert stored == '{"functions":[{"name":"f","line":1}]}'
+
+
+def test_planted_pickle_row_is_not_loaded(tmp_path, source):
+    db_path = str(tmp_path / "cache.sqlite3")
+    cache = SharedCache(db_path)
+    st = os.stat(source)
+    cache._connect().execute(
+        "INSERT INTO cache (namespace, key, mtime_ns, size, value, updated_at) VALUES (?, ?, ?, ?, ?, 0)",
+        ("encoding", f"{source}\0", st.st_mtime_ns, st.st_size, pickle.dumps(_Payload())),
+    )
+
+    assert SharedCache(db_path).get("encoding", source) is None
+    assert _planted == []
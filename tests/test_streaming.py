@@ -0,0 +1,90 @@
+"""NDJSON 스트리밍 - 스트림 전체에 타임아웃을 적용하고 카테고리 슬롯을 끝날 때까지 잡는지 확인"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+import config
+import tool_dispatcher
+from cancellation import check_cancelled
+from tool_dispatcher import ToolExecutor, stream_tool
+from tool_metrics import tool_metrics
+
+TOOL = "read_file"
+
+
+def _slow_records(arguments):
+    """첫 레코드 뒤 취소될 때까지 (최대 2초) 다음 레코드를 늦추는 생성기"""
+    yield {"type": "chunk", "data": "a"}
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline:
+        check_cancelled()
+        time.sleep(0.01)
+    yield {"type": "summary"}
+
+
+def _quick_records(arguments):
+    yield {"type": "chunk", "data": "a"}
+    yield {"type": "summary"}
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    """카테고리 한도가 1인 새 실행기와 가짜 스트림 핸들러"""
+    executor = ToolExecutor(max_workers=4, category_limits={}, default_limit=1)
+    monkeypatch.setattr(tool_dispatcher, "_executor", executor)
+    monkeypatch.setattr(tool_dispatcher, "is_streamable", lambda tool_name: True)
+    monkeypatch.setattr(config, "CALL_RECORDING_ENABLED", False)
+    yield executor
+    executor.shutdown(wait=False)
+
+
+def _use_handler(monkeypatch, handler):
+    monkeypatch.setattr(tool_dispatcher, "get_stream_handler", lambda tool_name: handler)
+
+
+async def _collect(lines):
+    return [json.loads(line) async for line in lines]
+
+
+def test_stream_timeout_ends_with_error_record(executor, monkeypatch):
+    _use_handler(monkeypatch, _slow_records)
+
+    async def run():
+        start = time.perf_counter()
+        records = await _collect(await stream_tool(TOOL, {"path": "x", "timeout_seconds": 0.2}))
+        return records, time.perf_counter() - start
+
+    before = tool_metrics.get_summary()["tools"].get(TOOL, {}).get("errors", 0)
+    records, elapsed = asyncio.run(run())
+
+    assert records[0] == {"type": "chunk", "data": "a"}
+    assert records[-1]["type"] == "error"
+    assert "timed out after 0.2 seconds" in records[-1]["error"]
+    assert elapsed < 1.5
+    assert tool_metrics.get_summary()["tools"][TOOL]["errors"] == before + 1
+    stats = executor.get_stats()["categories"]
+    assert all(category["running"] == 0 and category["queued"] == 0 for category in stats.values())
+
+
+def test_stream_holds_category_slot_until_finished(executor, monkeypatch):
+    _use_handler(monkeypatch, _quick_records)
+
+    async def run():
+        first = await stream_tool(TOOL, {"path": "x"})
+        second_task = asyncio.ensure_future(stream_tool(TOOL, {"path": "x"}))
+        await asyncio.sleep(0.1)
+        # 첫 스트림을 다 읽기 전에는 한도 1인 카테고리의 두 번째 스트림이 시작하지 못함
+        waiting = not second_task.done()
+        queued = executor.get_stats()["queue_depth"]
+        await _collect(first)
+        second = await asyncio.wait_for(second_task, 1)
+        await _collect(second)
+        return waiting, queued
+
+    waiting, queued = asyncio.run(run())
+    assert waiting
+    assert queued == 1
+    assert executor.get_stats()["running"] == 0
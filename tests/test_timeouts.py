@@ -0,0 +1,71 @@
+"""비스트리밍 호출 타임아웃 - ToolTimeoutError를 내고 워커가 곧 멈춰 카테고리 슬롯을 반납하는지 확인"""
+
+import asyncio
+import time
+
+import pytest
+
+import tool_dispatcher
+from cancellation import ToolTimeoutError
+from tool_dispatcher import ToolExecutor, dispatch_tool
+from tools import directory_manager, file_search
+from tools_registry import get_tool_category
+
+FILE_DELAY = 0.02
+FILE_COUNT = 100
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = ToolExecutor(max_workers=2, category_limits={}, default_limit=1)
+    monkeypatch.setattr(tool_dispatcher, "_executor", executor)
+    monkeypatch.setattr(tool_dispatcher, "get_process_pool", lambda: None)
+    yield executor
+    executor.shutdown(wait=False)
+
+
+@pytest.fixture
+def slow_tree(allowed_tmp_path, monkeypatch):
+    """파일 하나 처리할 때마다 FILE_DELAY씩 걸리는 디렉토리 (끝까지 돌면 2초) - 처리한 파일 수 기록"""
+    for i in range(FILE_COUNT):
+        (allowed_tmp_path / f"f{i:03d}.txt").write_text("needle\n", encoding="utf-8")
+    visited = []
+
+    def slow(func):
+        def wrapper(*args, **kwargs):
+            visited.append(time.perf_counter())
+            time.sleep(FILE_DELAY)
+            return func(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(file_search, "search_in_file", slow(file_search.search_in_file))
+    monkeypatch.setattr(directory_manager, "report_progress", slow(directory_manager.report_progress))
+    return allowed_tmp_path, visited
+
+
+@pytest.mark.parametrize("tool_name, path_key, extra", [
+    ("search_in_directory", "directory", {"search_text": "needle"}),
+    ("get_directory_size", "path", {}),
+])
+def test_timeout_stops_worker_and_releases_slot(executor, slow_tree, tool_name, path_key, extra):
+    root, visited = slow_tree
+    arguments = {path_key: str(root), **extra}
+    category = get_tool_category(tool_name)
+
+    async def run():
+        started = time.perf_counter()
+        with pytest.raises(ToolTimeoutError):
+            await dispatch_tool(tool_name, {**arguments, "timeout_seconds": 0.2})
+        timed_out = time.perf_counter()
+        # 워커는 다음 check_cancelled()에서 멈추고 슬롯을 반납
+        while executor.get_stats()["categories"][category]["running"]:
+            assert time.perf_counter() - timed_out < 0.5
+            await asyncio.sleep(0.01)
+        return started, timed_out
+
+    started, timed_out = asyncio.run(run())
+    assert timed_out - started < 0.5
+    assert 0 < len(visited) < FILE_COUNT
+    processed = len(visited)
+    time.sleep(FILE_DELAY * 3)
+    assert len(visited) == processed
@@ -0,0 +1,40 @@
+"""trace 내보내기 - 파일 쓰기는 호출한 스레드가 아닌 쓰기 스레드가 하는지 확인"""
+
+import json
+import threading
+
+import pytest
+
+import config
+import tracing
+from tracing import flush_traces, span, start_trace
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(config, "TRACING_ENABLED", True)
+    monkeypatch.setattr(config, "TRACING_FILE", str(path))
+    return path
+
+
+def test_trace_is_written_by_background_thread(trace_file, monkeypatch):
+    writer_threads = []
+    write = tracing._TraceWriter._write
+
+    def recording_write(self, path, record):
+        writer_threads.append(threading.current_thread().name)
+        write(self, path, record)
+
+    monkeypatch.setattr(tracing._TraceWriter, "_write", recording_write)
+
+    with start_trace("tool.dispatch", tool="read_file") as root:
+        with span("normalize_path"):
+            pass
+    flush_traces()
+
+    assert writer_threads == ["nexus-trace-writer"]
+    record = json.loads(trace_file.read_text(encoding="utf-8"))
+    spans = record["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert [s["name"] for s in spans] == ["normalize_path", "tool.dispatch"]
+    assert {s["traceId"] for s in spans} == {root.trace_id}
@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+도구별 벤치마크
+합성 프로젝트(파일 수/크기, 언어, git 히스토리 깊이 지정)를 임시 디렉토리에 만들고
+TOOL_HANDLERS의 모든 핸들러를 실행해 p50/p95 지연 시간, 처리량, 최대 메모리를 JSON으로 저장한다.
+
+사용 예:
+    python tool_benchmark.py --size medium --output bench.json
+    python tool_benchmark.py --files 2000 --lines 400 --commits 300 --tools search_in_directory,patch_apply
+    python tool_benchmark.py --output new.json --compare bench.json --fail-on-regression 15
+
+지연 시간은 핸들러만 측정한다 (인자 준비와 파일 복원은 측정에서 제외, 디스패처 오버헤드 제외).
+최대 메모리는 측정 반복과 별도로 warmup 뒤 tracemalloc을 켠 한 번의 호출에서 Python 할당량의 최대값을 잰다.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+import config
+
+# 규모별 기본값 (명령행 옵션으로 개별 값 덮어쓰기 가능)
+SIZE_PRESETS = {
+    "small": {"files": 50, "lines": 100, "large_file_lines": 2000, "commits": 10},
+    "medium": {"files": 500, "lines": 200, "large_file_lines": 10000, "commits": 100},
+    "large": {"files": 5000, "lines": 300, "large_file_lines": 50000, "commits": 500},
+}
+
+# 언어별 확장자와 함수 템플릿 ({name}, {i}를 채워 함수 하나를 만든다)
+LANGUAGE_TEMPLATES = {
+    "python": (".py", 'def {name}(value, count={i}):\n    """Compute {name}"""\n'
+                      '    # TODO: tune {name}\n    total = value * count\n    return total + {i}\n\n'),
+    "javascript": (".js", "function {name}(value) {{\n  // TODO: tune {name}\n"
+                          "  const total = value * {i};\n  return total + {i};\n}}\n\n"),
+    "typescript": (".ts", "export function {name}(value: number): number {{\n  // TODO: tune {name}\n"
+                          "  const total = value * {i};\n  return total + {i};\n}}\n\n"),
+    "java": (".java", "    public static int {name}(int value) {{\n        // TODO: tune {name}\n"
+                      "        int total = value * {i};\n        return total + {i};\n    }}\n\n"),
+    "c": (".c", "int {name}(int value) {{\n    /* TODO: tune {name} */\n"
+                "    int total = value * {i};\n    return total + {i};\n}}\n\n"),
+    "rust": (".rs", "pub fn {name}(value: i64) -> i64 {{\n    // TODO: tune {name}\n"
+                    "    let total = value * {i};\n    total + {i}\n}}\n\n"),
+}
+
+FILES_PER_DIRECTORY = 25
+
+
+def _render_source(language: str, lines: int, prefix: str) -> str:
+    """대략 lines 줄짜리 소스 파일 내용 생성 (함수 이름은 {prefix}_0, {prefix}_1, ...)"""
+    template = LANGUAGE_TEMPLATES[language][1]
+    lines_per_function = template.count("\n")
+    parts = []
+    if language == "java":
+        parts.append(f"public class {prefix.capitalize()} {{\n\n")
+    for i in range(max(1, lines // lines_per_function)):
+        parts.append(template.format(name=f"{prefix}_{i}", i=i))
+    if language == "java":
+        parts.append("}\n")
+    return "".join(parts)
+
+
+class SyntheticProject:
+    """
+    벤치마크용 합성 프로젝트
+
+    root 아래에 project/(소스 트리, commits > 0 이면 git 저장소), remote.git(push/pull/clone 대상),
+    scratch/(쓰기 도구가 매 반복 사용하는 작업 공간)를 만든다.
+    """
+
+    def __init__(self, root: str, files: int, lines: int, large_file_lines: int,
+                 languages: List[str], commits: int, seed: int = 0):
+        self.root = root
+        self.project = os.path.join(root, "project")
+        self.remote = os.path.join(root, "remote.git")
+        self.scratch = os.path.join(root, "scratch")
+        self.files = files
+        self.lines = lines
+        self.large_file_lines = large_file_lines
+        self.languages = languages
+        self.commits = commits
+        self.seed = seed
+        self.source_files: List[str] = []
+        self.large_file = os.path.join(self.project, "large_module.py")
+        self.git_ready = False
+        # 부하 테스트가 여러 스레드에서 인자를 만들 수 있으므로 itertools.count로 번호 발급
+        self._counter = itertools.count(1)
+
+    def generate(self) -> None:
+        """소스 트리와 git 히스토리 생성"""
+        rng = random.Random(self.seed)
+        os.makedirs(self.scratch, exist_ok=True)
+        for index in range(self.files):
+            language = self.languages[index % len(self.languages)]
+            extension = LANGUAGE_TEMPLATES[language][0]
+            directory = os.path.join(self.project, "src", f"pkg_{index // FILES_PER_DIRECTORY}")
+            os.makedirs(directory, exist_ok=True)
+            # 파일 크기를 0.5~1.5배로 흩뜨려 실제 프로젝트처럼 만든다
+            lines = max(5, int(self.lines * rng.uniform(0.5, 1.5)))
+            path = os.path.join(directory, f"module_{index}{extension}")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(_render_source(language, lines, f"func_{index}"))
+            self.source_files.append(path)
+
+        with open(self.large_file, "w", encoding="utf-8") as f:
+            f.write(_render_source("python", self.large_file_lines, "large"))
+
+        if self.commits > 0:
+            self._generate_history(rng)
+
+    def _generate_history(self, rng: random.Random) -> None:
+        """commits개의 커밋 히스토리와 bare 원격 저장소 생성 (GitPython이 없으면 생략)"""
+        try:
+            import git
+        except ImportError:
+            print("[BENCH] GitPython not installed - git history skipped", file=sys.stderr)
+            return
+
+        repo = git.Repo.init(self.project)
+        with repo.config_writer() as writer:
+            writer.set_value("user", "name", "bench")
+            writer.set_value("user", "email", "bench@example.com")
+
+        repo.index.add([os.path.relpath(p, self.project) for p in self.source_files + [self.large_file]])
+        repo.index.commit("Initial commit")
+        for number in range(1, self.commits):
+            path = rng.choice(self.source_files)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(f"\n// revision {number}\n")
+            repo.index.add([os.path.relpath(path, self.project)])
+            repo.index.commit(f"Change {number}: update {os.path.basename(path)}")
+
+        git.Repo.clone_from(self.project, self.remote, bare=True)
+        origin = repo.create_remote("origin", self.remote)
+        origin.fetch()
+        repo.active_branch.set_tracking_branch(origin.refs[repo.active_branch.name])
+        self.git_ready = True
+
+    def scratch_path(self, name: str) -> str:
+        """반복마다 새로 쓰는 작업 파일/디렉토리 경로"""
+        return os.path.join(self.scratch, f"{next(self._counter)}_{name}")
+
+    def scratch_copy(self, source: Optional[str] = None) -> str:
+        """원본 파일을 작업 공간으로 복사한 경로 (편집 도구가 매번 같은 크기의 파일을 다루도록)"""
+        source = source or self.large_file
+        path = self.scratch_path(os.path.basename(source))
+        shutil.copyfile(source, path)
+        return path
+
+    def touch_tracked_file(self) -> str:
+        """git 추적 파일 하나를 수정하고 저장소 기준 상대 경로 반환"""
+        number = next(self._counter)
+        path = self.source_files[number % len(self.source_files)]
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(f"\n// bench edit {number}\n")
+        return os.path.relpath(path, self.project)
+
+    def describe(self) -> Dict[str, Any]:
+        """결과 파일에 기록할 프로젝트 구성"""
+        total_bytes = sum(os.path.getsize(p) for p in self.source_files)
+        return {
+            "files": self.files,
+            "lines_per_file": self.lines,
+            "large_file_lines": self.large_file_lines,
+            "languages": self.languages,
+            "commits": self.commits if self.git_ready else 0,
+            "total_source_bytes": total_bytes,
+            "seed": self.seed,
+        }
+
+
+def _git_commit_args(project: SyntheticProject) -> Dict[str, Any]:
+    import git
+    repo = git.Repo(project.project)
+    repo.index.add([project.touch_tracked_file()])
+    return {"repo_path": project.project, "message": "bench commit"}
+
+
+def _patch_args(project: SyntheticProject) -> Dict[str, Any]:
+    return {"path": project.scratch_copy(), "operations": [
+        {"type": "replace", "start": 10, "end": 12, "content": "    # patched\n    return 0"}
+    ]}
+
+
+# 도구별 인자 생성기 - 측정 전에 호출되며 쓰기 도구는 여기서 대상 파일을 새로 준비한다
+BENCHMARK_CASES: Dict[str, Callable[[SyntheticProject], Dict[str, Any]]] = {
+    # 기본 파일 I/O
+    "read_file": lambda p: {"path": p.large_file},
+    "write_file": lambda p: {"path": p.scratch_path("written.txt"), "content": "x" * 65536},
+    "copy_file": lambda p: {"source": p.large_file, "destination": p.scratch_path("copy.py")},
+    "move_file": lambda p: {"source": p.scratch_copy(), "destination": p.scratch_path("moved.py")},
+    "delete_file": lambda p: {"path": p.scratch_copy(), "force": True},
+    "backup_file": lambda p: {"path": p.scratch_copy()},
+    "backup_files": lambda p: {"paths": [p.scratch_copy(src) for src in p.source_files[:10]]},
+
+    # 디렉토리 관리
+    "list_directory": lambda p: {"path": os.path.dirname(p.source_files[0])},
+    "create_directory": lambda p: {"path": p.scratch_path("dir")},
+    "create_directories": lambda p: {"paths": [p.scratch_path(f"dir{i}") for i in range(10)]},
+    "list_allowed_directories": lambda p: {},
+    "count_files": lambda p: {"path": p.project},
+    "get_directory_size": lambda p: {"path": p.project},
+    "get_recent_files": lambda p: {"path": p.project, "limit": 10},
+    "analyze_project": lambda p: {"path": p.project},
+
+    # Git (저장소가 없으면 건너뜀)
+    "git_status": lambda p: {"repo_path": p.project},
+    "git_add": lambda p: {"repo_path": p.project, "files": [p.touch_tracked_file()]},
+    "git_commit": _git_commit_args,
+    "git_push": lambda p: {"repo_path": p.project},
+    "git_pull": lambda p: {"repo_path": p.project},
+    "git_clone": lambda p: {"url": p.remote, "path": p.scratch_path("clone")},
+    "git_branch": lambda p: {"repo_path": p.project, "action": "list"},
+    "git_log": lambda p: {"repo_path": p.project, "max_count": 50},
+    "git_init": lambda p: {"repo_path": p.scratch_path("init")},
+
+    # 텍스트 처리
+    "append_to_file": lambda p: {"path": p.scratch_copy(), "content": "# appended\n"},
+    "get_file_section": lambda p: {"path": p.large_file, "start_line": p.large_file_lines // 2,
+                                   "end_line": p.large_file_lines // 2 + 50},
+    "count_occurrences": lambda p: {"path": p.large_file, "search_text": "TODO"},
+
+    # 파일 메타데이터
+    "file_exists": lambda p: {"path": p.large_file},
+    "files_exist": lambda p: {"paths": p.source_files[:50]},
+    "file_info": lambda p: {"path": p.large_file},
+
+    # 고급 편집
+    "replace_line_range": lambda p: {"path": p.scratch_copy(), "start_line": 10, "end_line": 20,
+                                     "content": "# replaced"},
+    "delete_lines": lambda p: {"path": p.scratch_copy(), "start_line": 10, "end_line": 20},
+    "regex_replace": lambda p: {"path": p.scratch_copy(), "pattern": r"TODO: tune (\w+)",
+                                "replacement": "DONE: $1"},
+    "insert_at_position": lambda p: {"path": p.scratch_copy(), "position": 1024, "content": "# inserted\n"},
+    "patch_apply": _patch_args,
+    "smart_indent": lambda p: {"path": p.scratch_copy(), "start_line": 1, "end_line": 200, "indent_change": 1},
+
+    # 검색
+    "search_in_file": lambda p: {"path": p.large_file, "search_text": "TODO", "context_lines": 1},
+    "search_in_directory": lambda p: {"directory": p.project, "search_text": "TODO",
+                                      "max_files": max(100, p.files)},
+    "regex_search": lambda p: {"path": p.large_file, "pattern": r"def (large_\d+)", "capture_groups": True},
+
+    # 함수 분석
+    "find_function": lambda p: {"path": p.large_file, "function_name": f"large_{p.large_file_lines // 12}"},
+    "list_functions": lambda p: {"path": p.large_file},
+    "extract_function": lambda p: {"path": p.large_file, "function_name": "large_1"},
+    "get_function_info": lambda p: {"path": p.large_file, "function_name": "large_1"},
+}
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """정렬된 값들의 백분위수 (선형 보간)"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def benchmark_tool(tool_name: str, handler: Callable, make_args: Callable[[SyntheticProject], Dict[str, Any]],
+                   project: SyntheticProject, iterations: int, warmup: int) -> Dict[str, Any]:
+    """도구 하나를 warmup + iterations 번 실행하고 지연 시간/처리량/메모리 통계 반환"""
+    from tool_dispatcher import run_handler_sync
+    from tool_metrics import is_error_result, result_size_bytes
+
+    # 첫 호출은 지연 import/캐시 생성 비용까지 포함한 cold 지연 시간으로 따로 기록
+    start = time.perf_counter()
+    result = run_handler_sync(handler, make_args(project))
+    first_seconds = time.perf_counter() - start
+
+    if is_error_result(result):
+        message = result.get("error") if isinstance(result, dict) else result
+        return {"status": "error", "error": str(message)[:500]}
+
+    for _ in range(warmup):
+        run_handler_sync(handler, make_args(project))
+
+    # 최대 메모리는 tracemalloc 오버헤드가 지연 시간에 섞이지 않도록 별도 호출로 측정
+    arguments = make_args(project)
+    tracemalloc.start()
+    try:
+        run_handler_sync(handler, arguments)
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    samples = []
+    errors = 0
+    result_bytes = 0
+    for _ in range(iterations):
+        arguments = make_args(project)
+        start = time.perf_counter()
+        result = run_handler_sync(handler, arguments)
+        samples.append(time.perf_counter() - start)
+        if is_error_result(result):
+            errors += 1
+        result_bytes += result_size_bytes(result)
+
+    samples.sort()
+    total = sum(samples)
+    return {
+        "status": "ok",
+        "iterations": iterations,
+        "errors": errors,
+        "first_call_ms": round(first_seconds * 1000, 3),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+        "calls_per_sec": round(iterations / total, 2) if total else None,
+        "avg_result_bytes": result_bytes // iterations if iterations else 0,
+        "peak_memory_kb": round(peak_bytes / 1024, 1),
+    }
+
+
+def run_benchmarks(project: SyntheticProject, tool_names: List[str], iterations: int,
+                   warmup: int) -> Dict[str, Dict[str, Any]]:
+    """선택한 도구들을 차례로 측정 (인자 생성기가 없거나 실행에 실패한 도구는 status로 표시)"""
+    from tools_registry import TOOL_HANDLERS
+
+    results = {}
+    for tool_name in tool_names:
+        make_args = BENCHMARK_CASES.get(tool_name)
+        if make_args is None:
+            results[tool_name] = {"status": "skipped", "reason": "no benchmark case"}
+        elif tool_name.startswith("git_") and not project.git_ready:
+            results[tool_name] = {"status": "skipped", "reason": "git history not generated"}
+        else:
+            try:
+                handler = TOOL_HANDLERS[tool_name]
+                results[tool_name] = benchmark_tool(tool_name, handler, make_args, project, iterations, warmup)
+            except Exception as e:
+                results[tool_name] = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+
+        entry = results[tool_name]
+        if entry["status"] == "ok":
+            print(f"[BENCH] {tool_name:<26} p50 {entry['p50_ms']:>10.3f} ms  p95 {entry['p95_ms']:>10.3f} ms  "
+                  f"{entry['calls_per_sec'] or 0:>10.1f}/s  peak {entry['peak_memory_kb']:>10.1f} KB", file=sys.stderr)
+        else:
+            print(f"[BENCH] {tool_name:<26} {entry['status']}: {entry.get('reason') or entry.get('error')}",
+                  file=sys.stderr)
+    return results
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    두 결과 파일의 p50/p95 비교표를 출력하고 threshold(%)보다 느려진 도구 목록 반환
+
+    노이즈를 줄이기 위해 p50과 p95가 모두 threshold 이상 느려진 경우만 회귀로 본다.
+    """
+    regressions = []
+    print(f"\n{'tool':<26} {'p50 base':>10} {'p50 new':>10} {'Δp50':>8} {'p95 base':>10} {'p95 new':>10} {'Δp95':>8}")
+    for tool_name, entry in current["results"].items():
+        base = baseline.get("results", {}).get(tool_name)
+        if not base or base.get("status") != "ok" or entry.get("status") != "ok":
+            continue
+        deltas = []
+        for key in ("p50_ms", "p95_ms"):
+            deltas.append((entry[key] - base[key]) / base[key] * 100 if base[key] else 0.0)
+        marker = ""
+        if all(delta > threshold for delta in deltas):
+            regressions.append(tool_name)
+            marker = "  <-- regression"
+        print(f"{tool_name:<26} {base['p50_ms']:>10.3f} {entry['p50_ms']:>10.3f} {deltas[0]:>+7.1f}% "
+              f"{base['p95_ms']:>10.3f} {entry['p95_ms']:>10.3f} {deltas[1]:>+7.1f}%{marker}")
+    return regressions
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark every tool handler against a synthetic project")
+    parser.add_argument("--size", choices=sorted(SIZE_PRESETS), default="small", help="project size preset")
+    parser.add_argument("--files", type=int, help="number of source files")
+    parser.add_argument("--lines", type=int, help="average lines per source file")
+    parser.add_argument("--large-file-lines", type=int, help="lines in the large file used by single-file tools")
+    parser.add_argument("--commits", type=int, help="git history depth (0 skips git tools)")
+    parser.add_argument("--languages", default=",".join(LANGUAGE_TEMPLATES),
+                        help=f"comma separated languages ({', '.join(LANGUAGE_TEMPLATES)})")
+    parser.add_argument("--tools", help="comma separated tool names (default: every handler in TOOL_HANDLERS)")
+    parser.add_argument("--iterations", type=int, default=20, help="measured calls per tool")
+    parser.add_argument("--warmup", type=int, default=2, help="unmeasured calls per tool before measuring")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for file sizes and history")
+    parser.add_argument("--workdir", help="directory for the synthetic project (default: temporary, removed afterwards)")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON results to compare against")
+    parser.add_argument("--fail-on-regression", type=float, metavar="PERCENT",
+                        help="exit with status 1 if p50 and p95 of any tool are this much slower than the baseline")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    sizes = dict(SIZE_PRESETS[args.size])
+    for key in sizes:
+        value = getattr(args, key)
+        if value is not None:
+            sizes[key] = value
+
+    languages = [name.strip() for name in args.languages.split(",") if name.strip()]
+    unknown = [name for name in languages if name not in LANGUAGE_TEMPLATES]
+    if unknown or not languages:
+        print(f"Unknown languages: {', '.join(unknown) or '(none given)'}", file=sys.stderr)
+        return 2
+
+    from tools_registry import TOOL_HANDLERS
+
+    tool_names = list(TOOL_HANDLERS)
+    if args.tools:
+        tool_names = [name.strip() for name in args.tools.split(",") if name.strip()]
+        missing = [name for name in tool_names if name not in TOOL_HANDLERS]
+        if missing:
+            print(f"Unknown or disabled tools: {', '.join(missing)}", file=sys.stderr)
+            return 2
+
+    root = os.path.realpath(args.workdir or tempfile.mkdtemp(prefix="nexus-bench-"))
+    os.makedirs(root, exist_ok=True)
+    # 핸들러의 경로 검사를 통과하도록 작업 디렉토리를 허용 목록에 추가 (tools.utils와 같은 리스트 객체)
+    config.ALLOWED_DIRECTORIES.append(root)
+
+    try:
+        project = SyntheticProject(root, sizes["files"], sizes["lines"], sizes["large_file_lines"],
+                                   languages, sizes["commits"], seed=args.seed)
+        start = time.perf_counter()
+        project.generate()
+        # git 도구가 추적 파일을 수정하므로 측정 전에 구성을 기록 (기준 결과와 비교할 때 사용)
+        description = project.describe()
+        print(f"[BENCH] Generated {project.files} files in {root} ({time.perf_counter() - start:.1f}s)",
+              file=sys.stderr)
+
+        results = run_benchmarks(project, tool_names, args.iterations, args.warmup)
+        report = {
+            "server_name": config.SERVER_NAME,
+            "server_version": config.SERVER_VERSION,
+            "python_version": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "project": description,
+            "results": results,
+        }
+    finally:
+        if not args.workdir:
+            shutil.rmtree(root, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"[BENCH] Results written to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("project") != report["project"]:
+            print("[BENCH] Warning: baseline was measured on a different synthetic project", file=sys.stderr)
+        threshold = args.fail_on_regression if args.fail_on_regression is not None else 10.0
+        regressions = compare_results(baseline, report, threshold)
+        if regressions and args.fail_on_regression is not None:
+            print(f"[BENCH] Regressions over {threshold:g}%: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
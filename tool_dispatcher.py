@@ -0,0 +1,732 @@
+"""
+도구 호출 디스패처
+MCP와 FastAPI가 공유하는 실행 경로 - 블로킹 핸들러를 이벤트 루프 밖의 스레드 풀에서 실행
+"""
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, Iterator, List, Optional, Tuple
+
+import config
+from call_recorder import get_call_recorder
+from cancellation import CancelToken, OperationCancelled, ToolTimeoutError, resolve_timeout, set_current_token
+from process_pool import get_process_pool
+from progress import ProgressReporter, ProgressSink, set_current_reporter
+from result_serializer import dumps_bytes
+from server_logging import get_logger
+from tool_metrics import is_error_result, result_size_bytes, tool_metrics
+from tools_registry import TOOL_HANDLERS, get_tool_category, is_read_only_tool
+from tracing import Span, get_current_span, set_current_span, span, start_trace
+from tools.streaming import get_stream_handler
+from warmup import get_warmup_status
+
+logger = get_logger("dispatcher")
+
+# 워커 스레드별 이벤트 루프 (async 핸들러를 스레드 안에서 실행하기 위함)
+_thread_state = threading.local()
+
+
+def run_handler_sync(handler: Callable, arguments: Dict[str, Any]) -> Any:
+    """
+    워커 스레드에서 핸들러를 동기적으로 실행
+
+    핸들러는 async로 선언되어 있지만 내부는 동기 I/O이므로
+    스레드마다 전용 이벤트 루프를 하나 두고 그 위에서 끝까지 실행한다.
+    """
+    if not asyncio.iscoroutinefunction(handler):
+        return handler(arguments)
+
+    loop = getattr(_thread_state, "loop", None)
+    if loop is None:
+        loop = asyncio.new_event_loop()
+        _thread_state.loop = loop
+    return loop.run_until_complete(handler(arguments))
+
+
+class ToolExecutor:
+    """카테고리별 동시 실행 한도를 가진 스레드 풀 기반 도구 실행기"""
+
+    def __init__(self, max_workers: int, category_limits: Dict[str, int], default_limit: int):
+        self.max_workers = max_workers
+        self.category_limits = dict(category_limits)
+        self.default_limit = default_limit
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool-worker")
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def get_limit(self, category: str) -> int:
+        """카테고리의 동시 실행 한도 반환"""
+        return self.category_limits.get(category, self.default_limit)
+
+    def _get_semaphore(self, category: str) -> asyncio.Semaphore:
+        """현재 이벤트 루프에 묶인 카테고리 세마포어 반환"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # 루프가 바뀌면 (테스트 클라이언트 재시작 등) 세마포어를 새로 만든다
+            self._loop = loop
+            self._semaphores = {}
+
+        semaphore = self._semaphores.get(category)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.get_limit(category))
+            self._semaphores[category] = semaphore
+        return semaphore
+
+    def _category_stats(self, category: str) -> Dict[str, float]:
+        stats = self._stats.get(category)
+        if stats is None:
+            stats = {
+                "queued": 0,
+                "running": 0,
+                "started": 0,
+                "completed": 0,
+                "total_wait": 0.0,
+                "max_wait": 0.0,
+            }
+            self._stats[category] = stats
+        return stats
+
+    def _run_in_worker(self, tool_name: str, arguments: Dict[str, Any], category: str,
+                       ticket: Dict[str, Any], token: CancelToken,
+                       reporter: Optional[ProgressReporter], parent_span: Optional[Span]) -> Any:
+        """
+        워커 스레드 진입점 - 대기 시간을 기록하고 취소 토큰/진행 보고기를 연결한 채 핸들러 실행
+
+        CPU 위주 도구(config.PROCESS_POOL_TOOLS)는 이 스레드가 프로세스 풀에 넘기고 끝날 때까지 기다린다.
+        핸들러 모듈의 첫 import(GitPython 등 수백 ms)도 이벤트 루프가 아닌 이 스레드에서 일어난다.
+        """
+        with self._lock:
+            stats = self._category_stats(category)
+            ticket["started"] = True
+            if not ticket["abandoned"]:
+                stats["queued"] -= 1
+            wait = time.perf_counter() - ticket["enqueued"]
+            stats["running"] += 1
+            stats["started"] += 1
+            stats["total_wait"] += wait
+            stats["max_wait"] = max(stats["max_wait"], wait)
+
+        set_current_token(token)
+        set_current_reporter(reporter)
+        set_current_span(parent_span)
+        try:
+            if token.cancelled:
+                # 대기하는 동안 취소/타임아웃된 호출은 시작하지 않음
+                raise OperationCancelled(token.reason)
+            with span("execute", category=category, queue_wait_ms=round(wait * 1000, 3)):
+                process_pool = get_process_pool()
+                if process_pool is not None and process_pool.handles(tool_name):
+                    # 핸들러는 풀 워커 프로세스가 찾으므로 이 프로세스에서는 모듈을 import 하지 않음
+                    return process_pool.run(tool_name, arguments, token)
+                return run_handler_sync(TOOL_HANDLERS[tool_name], arguments)
+        finally:
+            set_current_token(None)
+            set_current_reporter(None)
+            set_current_span(None)
+            with self._lock:
+                stats["running"] -= 1
+                stats["completed"] += 1
+
+    async def run(self, tool_name: str, arguments: Dict[str, Any],
+                  reporter: Optional[ProgressReporter] = None) -> Any:
+        """도구를 카테고리 한도 안에서 스레드 풀로 실행 (reporter: 진행 상황 알림 대상)"""
+        # 이름만 확인 - 핸들러 모듈 import는 워커 스레드에서 (이벤트 루프를 막지 않도록)
+        if tool_name not in TOOL_HANDLERS:
+            raise ValueError(f"Unknown tool: {tool_name}")
+
+        category = get_tool_category(tool_name)
+        ticket = {"enqueued": time.perf_counter(), "started": False, "abandoned": False}
+        with self._lock:
+            self._category_stats(category)["queued"] += 1
+
+        token = CancelToken()
+        try:
+            semaphore = self._get_semaphore(category)
+            await semaphore.acquire()
+            loop = asyncio.get_running_loop()
+            try:
+                future = self._pool.submit(self._run_in_worker, tool_name, arguments, category,
+                                           ticket, token, reporter, get_current_span())
+            except BaseException:
+                semaphore.release()
+                raise
+            # 슬롯은 워커 스레드가 실제로 끝날 때 반납 (취소된 호출이 한도를 넘겨 실행되지 않도록)
+            future.add_done_callback(lambda _: _call_soon_threadsafe(loop, semaphore.release))
+            try:
+                return await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                # 타임아웃/MCP 취소 - 워커는 다음 check_cancelled()에서 멈춘다
+                token.cancel("timeout or client cancellation")
+                raise
+        finally:
+            with self._lock:
+                if not ticket["started"]:
+                    # 시작 전에 취소된 호출은 대기열에서 제거
+                    ticket["abandoned"] = True
+                    self._category_stats(category)["queued"] -= 1
+
+    async def acquire_slot(self, category: str) -> Callable[[], None]:
+        """
+        스레드 풀 작업 여러 개에 걸쳐 유지되는 호출(NDJSON 스트림)의 카테고리 슬롯 획득
+
+        대기/실행 통계에 일반 호출과 함께 잡히며, 반환한 함수를 호출하면 슬롯을 반납한다 (여러 번 불러도 한 번만).
+        """
+        enqueued = time.perf_counter()
+        with self._lock:
+            stats = self._category_stats(category)
+            stats["queued"] += 1
+        semaphore = self._get_semaphore(category)
+        try:
+            await semaphore.acquire()
+        finally:
+            with self._lock:
+                stats["queued"] -= 1
+
+        wait = time.perf_counter() - enqueued
+        with self._lock:
+            stats["running"] += 1
+            stats["started"] += 1
+            stats["total_wait"] += wait
+            stats["max_wait"] = max(stats["max_wait"], wait)
+
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if released:
+                return
+            released = True
+            semaphore.release()
+            with self._lock:
+                stats["running"] -= 1
+                stats["completed"] += 1
+
+        return release
+
+    async def run_blocking(self, func: Callable, *args: Any, token: Optional[CancelToken] = None,
+                           parent_span: Optional[Span] = None) -> Any:
+        """임의의 블로킹 함수를 실행기 스레드 풀에서 실행 (스트리밍 생성기 진행용)"""
+        loop = asyncio.get_running_loop()
+        if token is None and parent_span is None:
+            return await loop.run_in_executor(self._pool, func, *args)
+        return await loop.run_in_executor(self._pool, _run_with_token, token, parent_span, func, args)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """대기열 깊이와 대기 시간 통계 반환"""
+        with self._lock:
+            categories = {}
+            for category, stats in sorted(self._stats.items()):
+                started = stats["started"]
+                categories[category] = {
+                    "limit": self.get_limit(category),
+                    "queued": stats["queued"],
+                    "running": stats["running"],
+                    "completed": stats["completed"],
+                    "avg_wait_ms": round(stats["total_wait"] / started * 1000, 3) if started else 0.0,
+                    "max_wait_ms": round(stats["max_wait"] * 1000, 3),
+                }
+
+        process_pool = get_process_pool()
+        return {
+            "max_workers": self.max_workers,
+            "queue_depth": sum(c["queued"] for c in categories.values()),
+            "running": sum(c["running"] for c in categories.values()),
+            "categories": categories,
+            "process_pool": process_pool.get_stats() if process_pool is not None else None,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """스레드 풀 종료 (프로세스 풀 포함)"""
+        self._pool.shutdown(wait=wait)
+        process_pool = get_process_pool()
+        if process_pool is not None:
+            process_pool.shutdown(wait=wait)
+
+
+def _call_soon_threadsafe(loop: asyncio.AbstractEventLoop, callback: Callable[[], Any]) -> None:
+    """워커 스레드에서 이벤트 루프로 콜백 전달 (루프가 이미 닫혔으면 무시)"""
+    try:
+        loop.call_soon_threadsafe(callback)
+    except RuntimeError:
+        pass
+
+
+def _run_with_token(token: Optional[CancelToken], parent_span: Optional[Span],
+                    func: Callable, args: Tuple[Any, ...]) -> Any:
+    """취소 토큰과 호출한 쪽의 span을 현재 워커 스레드에 연결한 채 func 실행"""
+    set_current_token(token)
+    set_current_span(parent_span)
+    try:
+        return func(*args)
+    finally:
+        set_current_token(None)
+        set_current_span(None)
+
+
+class CallCoalescer:
+    """
+    동시에 진행 중인 같은 호출을 하나의 실행으로 합치는 도우미
+
+    첫 호출이 실행을 태스크로 시작하고, 끝나기 전에 들어온 같은 키의 호출은 그 태스크를 기다린다.
+    실행이 끝나면 키를 지우므로 결과를 저장해 두지는 않는다 (완료 후 호출은 새로 실행).
+    기다리는 호출이 모두 취소되면 (타임아웃, MCP 취소) 실행도 취소한다.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self._reporters: Dict[str, ProgressReporter] = {}
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(tool_name: str, arguments: Dict[str, Any]) -> Optional[str]:
+        """도구 이름 + 정렬된 인자로 키 생성 (직렬화할 수 없는 인자면 None - 합치지 않음)"""
+        try:
+            return json.dumps([tool_name, arguments], sort_keys=True, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return None
+
+    async def run(self, key: str, factory: Callable[[ProgressReporter], Awaitable[Any]],
+                  progress: Optional[ProgressSink] = None) -> Tuple[Any, bool]:
+        """
+        같은 키의 실행이 진행 중이면 그 결과를, 아니면 새로 실행한 결과를 반환
+
+        Args:
+            key: make_key()로 만든 호출 키
+            factory: 실행에 쓸 진행 보고기를 받아 실행 코루틴을 만드는 함수
+            progress: 이 호출이 받을 진행 상황 알림 sink (병합된 호출도 실행 중인 보고기에 추가됨)
+
+        Returns:
+            (결과, 다른 호출의 실행을 공유했는지 여부)
+        """
+        task = self._inflight.get(key)
+        shared = task is not None
+        if shared:
+            self.coalesced += 1
+            reporter = self._reporters[key]
+        else:
+            reporter = ProgressReporter(asyncio.get_running_loop())
+            task = asyncio.ensure_future(factory(reporter))
+            self._inflight[key] = task
+            self._waiters[key] = 0
+            self._reporters[key] = reporter
+            task.add_done_callback(lambda t: self._finish(key, t))
+
+        self._waiters[key] += 1
+        if progress is not None:
+            reporter.add_sink(progress)
+        try:
+            # 먼저 온 호출이 취소되어도 실행 자체는 계속되어 나머지 호출이 결과를 받는다
+            return await asyncio.shield(task), shared
+        except asyncio.CancelledError:
+            if self._inflight.get(key) is task:
+                self._waiters[key] -= 1
+                if self._waiters[key] == 0:
+                    # 결과를 기다리는 호출이 없으면 실행 중단
+                    task.cancel()
+            raise
+        finally:
+            if progress is not None:
+                reporter.remove_sink(progress)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            del self._waiters[key]
+            del self._reporters[key]
+        if not task.cancelled():
+            # 기다리던 호출이 모두 취소된 경우 "exception was never retrieved" 경고 방지
+            task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"inflight": len(self._inflight), "coalesced": self.coalesced}
+
+
+# 읽기 전용 도구 호출 병합기 (이벤트 루프 스레드에서만 사용)
+call_coalescer = CallCoalescer()
+
+# 전역 실행기
+_executor: Optional[ToolExecutor] = None
+
+
+def get_tool_executor() -> ToolExecutor:
+    """전역 도구 실행기 인스턴스 반환 (최초 호출 시 생성)"""
+    global _executor
+    if _executor is None:
+        _executor = ToolExecutor(
+            max_workers=config.TOOL_EXECUTOR_MAX_WORKERS,
+            category_limits=config.TOOL_CATEGORY_CONCURRENCY,
+            default_limit=config.TOOL_CATEGORY_DEFAULT_CONCURRENCY,
+        )
+        logger.debug(f"Tool executor created with {_executor.max_workers} workers")
+    return _executor
+
+
+async def _run_with_timeout(tool_name: str, awaitable: Awaitable[Any], timeout: Optional[float]) -> Any:
+    """
+    제한 시간 안에 실행 (초과하면 실행을 취소하고 ToolTimeoutError)
+
+    asyncio.wait_for와 달리 핸들러가 직접 던진 TimeoutError(소켓 타임아웃 등)와 구분된다.
+    """
+    if timeout is None:
+        return await awaitable
+
+    task = asyncio.ensure_future(awaitable)
+    try:
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    if not done:
+        task.cancel()
+        raise ToolTimeoutError(tool_name, timeout)
+    return task.result()
+
+
+def split_call_options(arguments: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[float]]:
+    """
+    인자에서 디스패처 공통 옵션(timeout_seconds)을 분리
+
+    Returns:
+        (핸들러에 전달할 인자, 요청된 타임아웃 - 지정하지 않았으면 None)
+    """
+    if "timeout_seconds" not in arguments:
+        return arguments, None
+    arguments = dict(arguments)
+    return arguments, arguments.pop("timeout_seconds")
+
+
+async def dispatch_tool(tool_name: str, arguments: Dict[str, Any],
+                        progress: Optional[ProgressSink] = None) -> Any:
+    """
+    MCP/FastAPI 공용 도구 호출 진입점 - 타임아웃 적용과 도구별 메트릭 기록 포함
+
+    Args:
+        tool_name: 도구 이름
+        arguments: 도구 인자 (timeout_seconds 포함 가능)
+        progress: 진행 상황 알림을 받을 sink (MCP progressToken이 있는 호출)
+    """
+    if not is_tool_available(tool_name):
+        raise ValueError(f"Unknown tool: {tool_name}")
+
+    call_arguments = arguments
+    started_at = time.time()
+    start_time = time.perf_counter()
+    # 호출한 쪽(MCP/HTTP 핸들러, 배치)이 trace를 시작했으면 그 아래에, 아니면 새 trace로 기록
+    with start_trace("tool.dispatch", tool=tool_name) as dispatch_span:
+        try:
+            coalesced = False
+            arguments, requested_timeout = split_call_options(arguments)
+            dispatcher_tool = DISPATCHER_TOOLS.get(tool_name)
+            if dispatcher_tool is not None:
+                # 디스패처 수준 도구는 스레드 풀을 거치지 않고 이벤트 루프에서 실행
+                # (배치 항목은 각자 타임아웃이 적용되므로 전체 제한은 요청한 경우에만)
+                timeout = resolve_timeout(tool_name, requested_timeout) if requested_timeout is not None else None
+                result = await _run_with_timeout(tool_name, dispatcher_tool(arguments), timeout)
+            else:
+                timeout = resolve_timeout(tool_name, requested_timeout)
+                key = None
+                if config.COALESCE_READ_ONLY_CALLS and is_read_only_tool(tool_name):
+                    key = call_coalescer.make_key(tool_name, arguments)
+                if key is not None:
+                    # 같은 읽기 전용 호출이 이미 실행 중이면 그 결과를 공유 (타임아웃은 호출별로 적용)
+                    result, coalesced = await _run_with_timeout(tool_name, call_coalescer.run(
+                        key, lambda reporter: get_tool_executor().run(tool_name, arguments, reporter), progress
+                    ), timeout)
+                else:
+                    reporter = None
+                    if progress is not None:
+                        reporter = ProgressReporter(asyncio.get_running_loop())
+                        reporter.add_sink(progress)
+                    result = await _run_with_timeout(
+                        tool_name, get_tool_executor().run(tool_name, arguments, reporter), timeout
+                    )
+        except Exception as e:
+            duration = time.perf_counter() - start_time
+            tool_metrics.observe(tool_name, duration, exception=e)
+            _record_call(tool_name, call_arguments, started_at, duration, False, error=e)
+            raise
+        dispatch_span.set_attribute("coalesced", coalesced)
+
+    duration = time.perf_counter() - start_time
+    result_bytes = None
+    if config.METRICS_RECORD_RESULT_SIZE:
+        # 큰 결과의 JSON 직렬화가 이벤트 루프를 막지 않도록 실행기 스레드에서 계산 (지연 시간에는 포함하지 않음)
+        result_bytes = await get_tool_executor().run_blocking(result_size_bytes, result)
+    tool_metrics.observe(tool_name, duration, result=result, result_bytes=result_bytes, coalesced=coalesced)
+    _record_call(tool_name, call_arguments, started_at, duration, not is_error_result(result), coalesced=coalesced)
+    return result
+
+
+def _record_call(tool_name: str, arguments: Dict[str, Any], started_at: float, duration: float, ok: bool,
+                 coalesced: bool = False, error: Optional[BaseException] = None) -> None:
+    """호출 기록이 켜져 있으면 기록 (배치 등 디스패처 도구는 안쪽 호출이 각각 기록되므로 제외)"""
+    recorder = get_call_recorder()
+    if recorder is not None and tool_name not in DISPATCHER_TOOLS:
+        recorder.record(tool_name, arguments, started_at, duration, ok, coalesced=coalesced, error=error)
+
+
+# ==================== NDJSON 스트리밍 ====================
+
+def is_streamable(tool_name: str) -> bool:
+    """NDJSON 스트리밍 응답을 지원하는 도구인지 확인"""
+    return is_tool_available(tool_name) and get_stream_handler(tool_name) is not None
+
+
+def encode_record(record: Dict[str, Any]) -> bytes:
+    """레코드 하나를 NDJSON 한 줄로 직렬화"""
+    return dumps_bytes(record) + b"\n"
+
+
+async def stream_tool(tool_name: str, arguments: Dict[str, Any]) -> AsyncIterator[bytes]:
+    """
+    도구 결과를 NDJSON 줄 단위로 생성하는 비동기 이터레이터 반환
+
+    첫 레코드까지는 여기서 미리 실행하므로 인자 오류, 파일 없음 같은 시작 단계 오류는
+    응답 헤더를 보내기 전에 예외로 올라온다. 이후의 오류는 {"type": "error"} 레코드로 전달한다.
+    생성기의 각 단계는 실행기 스레드 풀에서 진행되어 이벤트 루프를 막지 않는다.
+
+    일반 호출과 같이 timeout_seconds(또는 도구별 기본 타임아웃)를 스트림 전체에 적용하고,
+    도구 카테고리 슬롯을 스트림이 끝날 때까지 잡고 있으며, trace/호출 기록/메트릭에 한 번의 호출로 남긴다.
+    """
+    if not is_streamable(tool_name):
+        raise ValueError(f"Tool '{tool_name}' does not support streaming")
+
+    call = _StreamCall(tool_name, arguments)
+    try:
+        await call.open()
+        first = await call.next_record()
+    except BaseException as e:
+        call.finish(exception=e)
+        raise
+
+    return _iter_stream(call, first)
+
+
+class _StreamCall:
+    """스트리밍 호출 하나의 상태 (카테고리 슬롯, 마감 시각, 취소 토큰, 루트 span)"""
+
+    def __init__(self, tool_name: str, arguments: Dict[str, Any]):
+        self.tool_name = tool_name
+        self.call_arguments = arguments
+        self.started_at = time.time()
+        self.start_time = time.perf_counter()
+        self.timeout: Optional[float] = None
+        self.token = CancelToken()
+        self.executor = get_tool_executor()
+        self.records: Optional[Iterator[Dict[str, Any]]] = None
+        self._release: Optional[Callable[[], None]] = None
+        self._finished = False
+        # 루트 span은 스트림이 끝날 때(finish) 닫는다 - 생성기 단계를 실행하는 워커 스레드에도 직접 넘김
+        self.span = start_trace("tool.stream", tool=tool_name)
+        self.span.__enter__()
+        self._parent_span = self.span if isinstance(self.span, Span) else None
+
+    async def open(self) -> None:
+        """타임아웃을 정하고 카테고리 슬롯을 기다린 뒤 레코드 생성기 생성"""
+        arguments, requested_timeout = split_call_options(self.call_arguments)
+        self.timeout = resolve_timeout(self.tool_name, requested_timeout)
+        with span("acquire_slot"):
+            self._release = await self.executor.acquire_slot(get_tool_category(self.tool_name))
+        self.records = get_stream_handler(self.tool_name)(arguments)
+
+    async def next_record(self) -> Optional[Dict[str, Any]]:
+        """
+        생성기를 한 단계 진행해 다음 레코드 반환 (끝나면 None)
+
+        마감 시각을 넘기면 토큰을 취소하고 ToolTimeoutError - 진행 중인 단계는 다음 check_cancelled()에서 멈춘다.
+        """
+        step = self.executor.run_blocking(next, self.records, None,
+                                          token=self.token, parent_span=self._parent_span)
+        if self.timeout is None:
+            return await step
+        remaining = self.start_time + self.timeout - time.perf_counter()
+        try:
+            return await _run_with_timeout(self.tool_name, step, max(remaining, 0))
+        except ToolTimeoutError:
+            self.token.cancel("timeout")
+            raise ToolTimeoutError(self.tool_name, self.timeout)
+        except asyncio.CancelledError:
+            self.token.cancel("client disconnected")
+            raise
+
+    def finish(self, exception: Optional[BaseException] = None, error_record: Optional[Dict[str, Any]] = None,
+               sent_bytes: Optional[int] = None) -> None:
+        """생성기 정리, 슬롯 반납, 메트릭/호출 기록, 루트 span 종료 (한 번만)"""
+        if self._finished:
+            return
+        self._finished = True
+        self.token.cancel("stream closed")
+        if self.records is not None:
+            try:
+                self.records.close()
+            except ValueError:
+                # 취소 시점에 워커 스레드가 아직 생성기를 진행 중인 경우 - 해당 단계가 끝나면 회수됨
+                pass
+        if self._release is not None:
+            self._release()
+
+        duration = time.perf_counter() - self.start_time
+        error = exception
+        if isinstance(exception, (asyncio.CancelledError, GeneratorExit)):
+            # 클라이언트 연결 종료는 도구 오류로 세지 않음
+            error = None
+        if error is not None or error_record is not None:
+            self.span.set_error(str(error) if error is not None else str(error_record.get("error")))
+        self.span.set_attribute("sent_bytes", sent_bytes or 0)
+        if isinstance(error, Exception):
+            tool_metrics.observe(self.tool_name, duration, exception=error, result_bytes=sent_bytes)
+        else:
+            tool_metrics.observe(self.tool_name, duration, result=error_record, result_bytes=sent_bytes)
+        _record_call(self.tool_name, self.call_arguments, self.started_at, duration,
+                     error is None and error_record is None, error=error if isinstance(error, Exception) else None)
+        self.span.__exit__(None, None, None)
+
+
+async def _iter_stream(call: _StreamCall, first: Optional[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """
+    레코드를 직렬화해 내보내고 끝나면 (클라이언트 연결 종료 포함) 호출 정리
+
+    연결이 끊기면 토큰을 취소해 진행 중인 생성기 단계도 다음 check_cancelled()에서 멈춘다.
+    타임아웃이나 생성기 예외는 {"type": "error"} 레코드 한 줄로 스트림을 끝낸다.
+    """
+    sent_bytes = 0
+    error_record = None
+    exception: Optional[BaseException] = None
+
+    try:
+        record = first
+        while record is not None:
+            if record.get("type") == "error":
+                error_record = record
+            line = encode_record(record)
+            sent_bytes += len(line)
+            yield line
+            record = await call.next_record()
+    except Exception as e:
+        exception = e
+        logger.warning(f"Stream for {call.tool_name} failed: {e}")
+        message = str(e) if isinstance(e, ToolTimeoutError) else f"Error executing {call.tool_name}: {str(e)}"
+        line = encode_record({"type": "error", "error": message})
+        sent_bytes += len(line)
+        yield line
+    except BaseException as e:
+        exception = e
+        raise
+    finally:
+        call.finish(exception=exception, error_record=error_record, sent_bytes=sent_bytes)
+
+
+# ==================== 배치 호출 ====================
+
+async def _run_batch_entry(index: int, call: Any) -> Dict[str, Any]:
+    """배치 항목 하나를 실행하고 결과 또는 오류를 항목 단위로 반환"""
+    tool_name = call.get("tool") if isinstance(call, dict) else None
+    entry = {"index": index, "tool": tool_name}
+
+    try:
+        if not isinstance(call, dict) or not isinstance(tool_name, str) or not tool_name:
+            raise ValueError("Each call must be an object with a 'tool' name")
+        if tool_name in DISPATCHER_TOOLS:
+            raise ValueError(f"'{tool_name}' cannot be nested inside a batch")
+
+        arguments = call.get("arguments") or {}
+        if not isinstance(arguments, dict):
+            raise ValueError("'arguments' must be an object")
+
+        result = await dispatch_tool(tool_name, arguments)
+        entry["ok"] = True
+        entry["result"] = result if isinstance(result, dict) else str(result)
+    except Exception as e:
+        entry["ok"] = False
+        entry["error"] = f"Error executing {tool_name}: {str(e)}"
+
+    return entry
+
+
+async def dispatch_batch(calls: List[Dict[str, Any]], sequential: bool = False,
+                         stop_on_error: bool = False) -> Dict[str, Any]:
+    """
+    여러 도구 호출을 한 번에 실행
+
+    Args:
+        calls: {"tool": 이름, "arguments": 인자} 항목 리스트
+        sequential: True면 요청 순서대로 하나씩 실행 (의존 관계가 있는 편집용)
+        stop_on_error: sequential 모드에서 첫 실패 이후 나머지 항목 건너뛰기
+
+    Returns:
+        요청 순서와 같은 순서의 항목별 결과와 요약
+    """
+    if not isinstance(calls, list) or not calls:
+        raise ValueError("'calls' must be a non-empty array")
+    if len(calls) > config.BATCH_MAX_CALLS:
+        raise ValueError(f"Too many calls in batch: {len(calls)} (max {config.BATCH_MAX_CALLS})")
+
+    if sequential:
+        results = []
+        failed = False
+        for index, call in enumerate(calls):
+            if failed and stop_on_error:
+                tool_name = call.get("tool") if isinstance(call, dict) else None
+                results.append({
+                    "index": index,
+                    "tool": tool_name,
+                    "ok": False,
+                    "error": "Skipped: a previous call in the batch failed"
+                })
+                continue
+            entry = await _run_batch_entry(index, call)
+            failed = failed or not entry["ok"]
+            results.append(entry)
+    else:
+        # 독립 호출은 동시에 실행 (카테고리별 한도는 실행기가 적용)
+        results = await asyncio.gather(
+            *(_run_batch_entry(index, call) for index, call in enumerate(calls))
+        )
+
+    succeeded = sum(1 for entry in results if entry["ok"])
+    return {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "sequential": sequential,
+        "results": list(results),
+    }
+
+
+async def handle_batch(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """batch 도구 핸들러"""
+    return await dispatch_batch(
+        arguments.get("calls"),
+        sequential=bool(arguments.get("sequential", False)),
+        stop_on_error=bool(arguments.get("stop_on_error", False)),
+    )
+
+
+async def handle_server_stats(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """server_stats 도구 핸들러 - 도구별 메트릭과 실행기 상태 반환"""
+    stats = tool_metrics.get_summary()
+    stats["executor"] = get_tool_executor().get_stats()
+    stats["coalescer"] = call_coalescer.get_stats()
+    recorder = get_call_recorder()
+    if recorder is not None:
+        stats["call_recording"] = recorder.get_stats()
+    stats["warmup"] = get_warmup_status()
+    return stats
+
+
+# 스레드 풀 대신 디스패처(이벤트 루프)에서 직접 처리하는 도구들
+DISPATCHER_TOOLS = {
+    "batch": handle_batch,
+    "server_stats": handle_server_stats,
+}
+
+
+def is_tool_available(tool_name: str) -> bool:
+    """현재 설정(카테고리 허용 목록)에서 호출 가능한 도구인지 확인"""
+    return tool_name in DISPATCHER_TOOLS or tool_name in TOOL_HANDLERS
@@ -0,0 +1,241 @@
+"""
+도구별 지연 시간/처리량 메트릭
+디스패처에서 호출 수, 오류 수, 지연 시간 히스토그램, 결과 크기를 기록하고
+Prometheus 텍스트 형식(GET /metrics)과 server_stats 도구용 요약으로 제공
+"""
+
+import bisect
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from result_serializer import dumps_bytes
+
+# 지연 시간 히스토그램 버킷 (초)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# 결과 크기 히스토그램 버킷 (바이트)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+METRIC_PREFIX = "nexus"
+
+
+def is_error_result(result: Any) -> bool:
+    """예외 대신 오류를 결과로 돌려주는 핸들러의 오류 응답인지 확인"""
+    if isinstance(result, dict):
+        return "error" in result
+    if isinstance(result, str):
+        return result.startswith(("Error", "Git error"))
+    return False
+
+
+def result_size_bytes(result: Any) -> int:
+    """도구 결과의 직렬화 크기(UTF-8 바이트) 계산"""
+    if result is None:
+        return 0
+    if isinstance(result, str):
+        return len(result.encode("utf-8", "surrogatepass"))
+    try:
+        return len(dumps_bytes(result))
+    except (TypeError, ValueError):
+        return len(str(result).encode("utf-8", "surrogatepass"))
+
+
+class Histogram:
+    """고정 버킷 누적 히스토그램"""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        """Prometheus 형식의 누적 버킷 카운트"""
+        result = []
+        running = 0
+        for count in self.counts:
+            running += count
+            result.append(running)
+        return result
+
+    def quantile(self, q: float) -> float:
+        """버킷 안 선형 보간으로 분위수 추정"""
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        running = 0
+        lower = 0.0
+        for index, count in enumerate(self.counts):
+            upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+            if count and running + count >= target:
+                return lower + (upper - lower) * ((target - running) / count)
+            running += count
+            lower = upper
+        return self.buckets[-1]
+
+
+class ToolStats:
+    """도구 하나의 누적 메트릭"""
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self.errors = {"exception": 0, "result": 0}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.result_bytes = Histogram(SIZE_BUCKETS)
+
+
+class ToolMetrics:
+    """도구별 메트릭 수집기 (스레드 안전)"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._tools: Dict[str, ToolStats] = {}
+
+    def observe(self, tool_name: str, seconds: float, result: Any = None,
+                exception: Optional[BaseException] = None, result_bytes: Optional[int] = None,
+                coalesced: bool = False) -> None:
+        """
+        도구 호출 한 번의 결과 기록
+
+        결과 크기는 이벤트 루프에서 직렬화하지 않도록 호출한 쪽이 result_bytes로 넘긴다
+        (스트리밍은 실제 전송한 바이트 수, 일반 호출은 config.METRICS_RECORD_RESULT_SIZE가 켜진 경우만).
+        coalesced는 진행 중이던 같은 호출의 실행을 공유한 호출인지 여부.
+        """
+        with self._lock:
+            stats = self._tools.get(tool_name)
+            if stats is None:
+                stats = ToolStats()
+                self._tools[tool_name] = stats
+
+            stats.calls += 1
+            if coalesced:
+                stats.coalesced += 1
+            stats.latency.observe(seconds)
+            if exception is not None:
+                stats.errors["exception"] += 1
+            elif is_error_result(result):
+                stats.errors["result"] += 1
+            if result_bytes is not None:
+                stats.result_bytes.observe(result_bytes)
+
+    def get_summary(self) -> Dict[str, Any]:
+        """server_stats 도구용 요약 (도구별 호출/오류/지연 분위수/결과 크기)"""
+        uptime = time.time() - self.started_at
+        with self._lock:
+            tools = {}
+            total_calls = 0
+            for tool_name, stats in sorted(self._tools.items()):
+                total_calls += stats.calls
+                latency = stats.latency
+                size = stats.result_bytes
+                tools[tool_name] = {
+                    "calls": stats.calls,
+                    "coalesced": stats.coalesced,
+                    "errors": stats.errors["exception"] + stats.errors["result"],
+                    "avg_ms": round(latency.total / latency.count * 1000, 3) if latency.count else 0.0,
+                    "p50_ms": round(latency.quantile(0.5) * 1000, 3),
+                    "p95_ms": round(latency.quantile(0.95) * 1000, 3),
+                    "p99_ms": round(latency.quantile(0.99) * 1000, 3),
+                    "avg_result_bytes": int(size.total / size.count) if size.count else 0,
+                    "total_result_bytes": int(size.total),
+                }
+
+        return {
+            "uptime_seconds": round(uptime, 1),
+            "total_calls": total_calls,
+            "calls_per_second": round(total_calls / uptime, 3) if uptime > 0 else 0.0,
+            "tools": tools,
+        }
+
+    def render_prometheus(self, executor_stats: Optional[Dict[str, Any]] = None) -> str:
+        """Prometheus 텍스트 노출 형식으로 렌더링"""
+        p = METRIC_PREFIX
+        lines = [
+            f"# HELP {p}_tool_calls_total Total tool calls.",
+            f"# TYPE {p}_tool_calls_total counter",
+        ]
+        with self._lock:
+            items = sorted(self._tools.items())
+            for tool_name, stats in items:
+                lines.append(f'{p}_tool_calls_total{{tool="{tool_name}"}} {stats.calls}')
+
+            lines.append(f"# HELP {p}_tool_coalesced_total Calls that shared the execution of an identical in-flight read-only call.")
+            lines.append(f"# TYPE {p}_tool_coalesced_total counter")
+            for tool_name, stats in items:
+                lines.append(f'{p}_tool_coalesced_total{{tool="{tool_name}"}} {stats.coalesced}')
+
+            lines.append(f"# HELP {p}_tool_errors_total Tool calls that raised (kind=exception) or returned an error result (kind=result).")
+            lines.append(f"# TYPE {p}_tool_errors_total counter")
+            for tool_name, stats in items:
+                for kind, count in stats.errors.items():
+                    lines.append(f'{p}_tool_errors_total{{tool="{tool_name}",kind="{kind}"}} {count}')
+
+            lines.extend(self._render_histogram(
+                f"{p}_tool_duration_seconds", "Tool call latency including executor queue wait.",
+                [(tool_name, stats.latency) for tool_name, stats in items]
+            ))
+            lines.extend(self._render_histogram(
+                f"{p}_tool_result_bytes", "Serialized tool result size in bytes.",
+                [(tool_name, stats.result_bytes) for tool_name, stats in items]
+            ))
+
+        if executor_stats:
+            lines.extend(self._render_executor(executor_stats))
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histogram(name: str, help_text: str, series: List[Tuple[str, Histogram]]) -> List[str]:
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for tool_name, histogram in series:
+            cumulative = histogram.cumulative()
+            for bound, count in zip(histogram.buckets, cumulative):
+                lines.append(f'{name}_bucket{{tool="{tool_name}",le="{bound:g}"}} {count}')
+            lines.append(f'{name}_bucket{{tool="{tool_name}",le="+Inf"}} {cumulative[-1]}')
+            lines.append(f'{name}_sum{{tool="{tool_name}"}} {histogram.total:.6f}')
+            lines.append(f'{name}_count{{tool="{tool_name}"}} {histogram.count}')
+        return lines
+
+    @staticmethod
+    def _render_executor(executor_stats: Dict[str, Any]) -> List[str]:
+        p = METRIC_PREFIX
+        categories = executor_stats.get("categories", {})
+        gauges = [
+            ("executor_queue_depth", "queued", "Calls waiting for a category slot or worker thread."),
+            ("executor_running", "running", "Calls currently running on worker threads."),
+            ("executor_avg_wait_ms", "avg_wait_ms", "Average queue wait before execution in milliseconds."),
+            ("executor_max_wait_ms", "max_wait_ms", "Maximum queue wait before execution in milliseconds."),
+        ]
+        lines = []
+        for metric, key, help_text in gauges:
+            lines.append(f"# HELP {p}_{metric} {help_text}")
+            lines.append(f"# TYPE {p}_{metric} gauge")
+            for category, stats in categories.items():
+                lines.append(f'{p}_{metric}{{category="{category}"}} {stats[key]}')
+
+        process_tools = (executor_stats.get("process_pool") or {}).get("tools", {})
+        process_gauges = [
+            ("process_pool_avg_handler_ms", "avg_handler_ms", "Average handler time inside pool workers in milliseconds."),
+            ("process_pool_avg_ipc_ms", "avg_ipc_ms", "Average IPC overhead per process pool call in milliseconds."),
+            ("process_pool_max_ipc_ms", "max_ipc_ms", "Maximum IPC overhead per process pool call in milliseconds."),
+            ("process_pool_avg_result_bytes", "avg_result_bytes", "Average pickled result size in bytes."),
+        ]
+        if process_tools:
+            for metric, key, help_text in process_gauges:
+                lines.append(f"# HELP {p}_{metric} {help_text}")
+                lines.append(f"# TYPE {p}_{metric} gauge")
+                for tool_name, stats in process_tools.items():
+                    lines.append(f'{p}_{metric}{{tool="{tool_name}"}} {stats[key]}')
+        return lines
+
+
+# 전역 메트릭 수집기
+tool_metrics = ToolMetrics()
@@ -2,16 +2,75 @@
 디렉토리 관리 관련 도구들
 """
 
+import heapq
+import os
 from datetime import datetime
 from collections import Counter
-from typing import Dict, Any
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
+import config
+from cancellation import check_cancelled
+from progress import get_progress_reporter, report_progress
+from tools.pagination import is_paginated, get_page_limit, encode_cursor, decode_cursor
 from tools.utils import normalize_path
 
 
-async def handle_list_directory(arguments: Dict[str, Any]) -> str:
-    """디렉토리 목록 도구"""
-    path_str = arguments.get("path", "")
+def _directory_entry(item: Path) -> Dict[str, Any]:
+    """디렉토리 항목 하나의 {"name", "type", "size"} 정보"""
+    size = None
+    if item.is_file():
+        try:
+            size = item.stat().st_size
+        except OSError:
+            pass
+    return {
+        "name": item.name,
+        "type": "directory" if item.is_dir() else "file",
+        "size": size,
+    }
+
+
+def iter_directory_entries(path: Path, sort: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    디렉토리 항목을 하나씩 생성 ({"name", "type", "size"})
+
+    sort=False면 파일 시스템 순서 그대로 내보내므로 항목 수와 상관없이 메모리 사용량이 일정하다.
+    """
+    iterator = sorted(path.iterdir()) if sort else path.iterdir()
+    for item in iterator:
+        check_cancelled()
+        yield _directory_entry(item)
+
+
+def page_directory_entries(path: Path, start_after: Optional[str], limit: int) -> Tuple[List[Dict[str, Any]], int, bool]:
+    """
+    이름순으로 start_after 다음 항목부터 limit개 반환
+
+    전체 목록을 정렬하지 않고 heapq로 필요한 limit+1개만 고르며, stat은 반환할 항목에만 호출한다.
+
+    Returns:
+        (항목 리스트, 디렉토리 전체 항목 수, 다음 페이지 존재 여부)
+    """
+    total = 0
+
+    def candidates():
+        nonlocal total
+        for name in os.listdir(path):
+            total += 1
+            if not total & 1023:
+                check_cancelled()
+            if start_after is None or name > start_after:
+                yield name
+
+    names = heapq.nsmallest(limit + 1, candidates())
+    has_more = len(names) > limit
+    entries = [_directory_entry(path / name) for name in names[:limit]]
+    return entries, total, has_more
+
+
+def resolve_directory(path_str: str) -> Path:
+    """경로 인자를 검증하고 디렉토리 Path 반환"""
     if not path_str:
         raise ValueError("Path argument is required")
 
@@ -20,17 +79,32 @@ async def handle_list_directory(arguments: Dict[str, Any]) -> str:
         raise FileNotFoundError(f"Directory not found: {path}")
     if not path.is_dir():
         raise ValueError(f"Path is not a directory: {path}")
+    return path
+
+
+def _format_directory_entry(entry: Dict[str, Any]) -> str:
+    size = f" ({entry['size']} bytes)" if entry["size"] is not None else ""
+    return f"[{entry['type'].upper()}] {entry['name']}{size}"
+
 
-    items = []
-    for item in sorted(path.iterdir()):
-        item_type = "directory" if item.is_dir() else "file"
-        size = ""
-        if item.is_file():
-            try:
-                size = f" ({item.stat().st_size} bytes)"
-            except:
-                pass
-        items.append(f"[{item_type.upper()}] {item.name}{size}")
+async def handle_list_directory(arguments: Dict[str, Any]) -> str:
+    """디렉토리 목록 도구 (limit/cursor 지정 시 이름순 페이지 단위로 반환)"""
+    path = resolve_directory(arguments.get("path", ""))
+
+    if is_paginated(arguments):
+        start_after = decode_cursor("list_directory", arguments)
+        limit = get_page_limit(arguments, default=config.PAGINATION_DEFAULT_LIMIT)
+        entries, total, has_more = page_directory_entries(path, start_after, limit)
+        if not entries:
+            return "Directory is empty" if total == 0 else f"No more items ({total} items total)"
+
+        items = [_format_directory_entry(entry) for entry in entries]
+        text = f"Directory contents ({len(items)} of {total} items):\n" + "\n".join(items)
+        if has_more:
+            text += f"\n\nnext_cursor: {encode_cursor('list_directory', arguments, entries[-1]['name'])}"
+        return text
+
+    items = [_format_directory_entry(entry) for entry in iter_directory_entries(path)]
 
     if not items:
         return "Directory is empty"
@@ -104,6 +178,7 @@ async def handle_count_files(arguments: Dict[str, Any]) -> str:
     else:
         extensions = Counter()
         for file in dir_path.rglob("*"):
+            check_cancelled()
             if file.is_file():
                 ext = file.suffix.lower() or "no extension"
                 extensions[ext] += 1
@@ -122,9 +197,11 @@ async def handle_get_directory_size(arguments: Dict[str, Any]) -> str:
     total_size = 0
     file_count = 0
     for file in dir_path.rglob("*"):
+        check_cancelled()
         if file.is_file():
             total_size += file.stat().st_size
             file_count += 1
+            report_progress(file_count, files=file_count, bytes=total_size)
 
     size_mb = total_size / (1024 * 1024)
     return f"Total: {size_mb:.1f} MB ({file_count} files)"
@@ -138,6 +215,7 @@ async def handle_get_recent_files(arguments: Dict[str, Any]) -> str:
     dir_path = normalize_path(path_str)
     files = []
     for file in dir_path.rglob("*"):
+        check_cancelled()
         if file.is_file():
             files.append((file, file.stat().st_mtime))
 
@@ -159,19 +237,26 @@ async def handle_analyze_project(arguments: Dict[str, Any]) -> str:
 
     extensions = Counter()
     total_size = 0
+    file_count = 0
+    # 진행 알림을 요청하지 않은 호출은 파일마다 알림 내용을 만들지 않음
+    reporter = get_progress_reporter()
 
     for file in dir_path.rglob("*"):
+        check_cancelled()
         if file.is_file():
             ext = file.suffix.lower() or "no ext"
             extensions[ext] += 1
             total_size += file.stat().st_size
+            file_count += 1
+            if reporter is not None:
+                reporter.report(file_count, files=file_count, bytes=total_size)
 
     top_types = extensions.most_common(3)
     size_mb = total_size / (1024 * 1024)
 
     result = f"Project: {dir_path.name}\n"
     result += f"Size: {size_mb:.1f} MB\n"
-    result += f"Files: {sum(extensions.values())}\n"
+    result += f"Files: {file_count}\n"
     result += "Types: " + ", ".join([f"{ext}({count})" for ext, count in top_types])
 
     return result
@@ -2,17 +2,180 @@
 FastAPI 라우트들과 Pydantic 모델들
 """
 
-from fastapi import FastAPI, HTTPException, Body
+from fastapi import FastAPI, HTTPException, Body, Query
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.routing import Route
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Callable
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Callable, List, Optional, Tuple
 import json
 import asyncio
-import sys
+import os
 import config
+from admission import AdmissionRejected, get_admission_controller
+from cancellation import ToolTimeoutError
+from result_serializer import dumps_bytes, get_output_format, shape_result, OUTPUT_FORMATS
+from server_logging import get_logger, log_tool_call
+from shared_cache import shared_cache
 from tools.utils import normalize_path, detect_file_encoding, ALLOWED_DIRECTORIES
-from tools.utils import load_tools_json, create_pydantic_model
-from tools_registry import TOOL_HANDLERS
+from tools.utils import load_tools_json, tool_definitions
+from tools_registry import get_tool_category
+from tool_dispatcher import dispatch_tool, dispatch_batch, get_tool_executor, is_tool_available
+from tool_dispatcher import is_streamable, stream_tool
+from tool_metrics import tool_metrics
+from tracing import get_trace_id, span, start_trace
+from warmup import get_warmup_status, start_warmup, stop_warmup
+
+logger = get_logger("fastapi")
+
+# 동적 라우트 대신 전용 라우트로 제공하는 도구들
+DEDICATED_ROUTE_TOOLS = {"batch"}
+
+# HTTP 응답은 기존과 같이 결과 전체를 기본으로 반환 (?format= 으로 변경 가능)
+HTTP_DEFAULT_OUTPUT_FORMAT = "compact"
+
+FORMAT_QUERY_DESCRIPTION = f"Result shape: {', '.join(OUTPUT_FORMATS)} (default: compact, the full result)"
+
+
+class FastJSONResponse(Response):
+    """result_serializer로 직렬화하는 JSON 응답 (jsonable_encoder 변환을 거치지 않음)"""
+
+    media_type = "application/json"
+
+    def __init__(self, content: Any, pretty: bool = False, **kwargs):
+        self.pretty = pretty
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content, pretty=self.pretty)
+
+
+def _trace_headers() -> Optional[Dict[str, str]]:
+    """추적 중이면 trace ID를 담은 응답 헤더 (X-Trace-Id)"""
+    trace_id = get_trace_id()
+    return {"X-Trace-Id": trace_id} if trace_id else None
+
+
+async def _read_request_body(receive) -> Tuple[bytes, List[Dict[str, Any]]]:
+    """요청 본문 전체와 받은 ASGI 메시지들 (다음 앱에 그대로 다시 넘기기 위해 보관)"""
+    messages, chunks = [], []
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks), messages
+
+
+def _replay_receive(messages: List[Dict[str, Any]], receive):
+    """미리 읽은 메시지를 먼저 돌려주고 이후에는 원래 receive로 넘기는 receive"""
+    pending = list(messages)
+
+    async def replay():
+        if pending:
+            return pending.pop(0)
+        return await receive()
+
+    return replay
+
+
+def _mcp_tool_call(body: bytes) -> Optional[Tuple[Any, str]]:
+    """MCP 요청 본문이 tools/call이면 (JSON-RPC id, 도구 이름), 아니면 None (initialize, 알림 등)"""
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return None
+    for message in payload if isinstance(payload, list) else [payload]:
+        if isinstance(message, dict) and message.get("method") == "tools/call":
+            params = message.get("params") or {}
+            return message.get("id"), str(params.get("name", ""))
+    return None
+
+
+class AdmissionControlMiddleware:
+    """
+    도구 실행 요청(POST /<도구>, POST /batch, MCP over HTTP의 tools/call)에 수락 제어를 적용하는 ASGI 미들웨어
+
+    슬롯은 응답 본문 전송이 끝날 때까지 유지하므로 NDJSON 스트리밍 응답과 MCP SSE 응답도 처리 중으로 계산된다.
+    헬스 체크/메트릭 등 GET 요청과 MCP의 initialize, tools/list, 알림은 부하와 상관없이 항상 처리한다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        mcp_request_id = None
+        tool_name = scope["path"].strip("/")
+        is_mcp = config.MCP_HTTP_ENABLED and scope["path"].rstrip("/") == config.MCP_HTTP_PATH.rstrip("/")
+        if is_mcp:
+            # 어느 도구를 부르는지 알려면 본문을 읽어야 함 - 읽은 본문은 MCP 세션 관리자에 그대로 다시 전달
+            body, messages = await _read_request_body(receive)
+            receive = _replay_receive(messages, receive)
+            tool_call = _mcp_tool_call(body)
+            if tool_call is None:
+                await self.app(scope, receive, send)
+                return
+            mcp_request_id, tool_name = tool_call
+            category = get_tool_category(tool_name) if is_tool_available(tool_name) else "mcp"
+        elif tool_name in DEDICATED_ROUTE_TOOLS:
+            category = tool_name
+        elif is_tool_available(tool_name):
+            category = get_tool_category(tool_name)
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        controller = get_admission_controller()
+        try:
+            await controller.acquire(category)
+        except AdmissionRejected as e:
+            logger.warning(f"Rejected {tool_name} ({category}) with {e.status_code}: {e.reason}")
+            if is_mcp:
+                # MCP 클라이언트가 요청별 오류로 처리할 수 있도록 JSON-RPC 오류 형식으로 응답
+                content = {"jsonrpc": "2.0", "id": mcp_request_id,
+                           "error": {"code": -32000, "message": e.reason, "data": {"retryAfter": e.retry_after}}}
+            else:
+                content = {"detail": e.reason}
+            response = FastJSONResponse(content, status_code=e.status_code,
+                                        headers={"Retry-After": str(e.retry_after)})
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release(category)
+
+
+# MCP 가용성 (헬스 체크마다 import를 시도하지 않도록 한 번만 확인)
+try:
+    from mcp.server import Server
+    MCP_AVAILABLE = True
+except ImportError:
+    MCP_AVAILABLE = False
+
+
+# ==================== 배치 요청 모델 ====================
+
+class BatchCall(BaseModel):
+    """배치 안의 개별 도구 호출"""
+    tool: str = Field(..., description="Tool name")
+    arguments: Dict[str, Any] = Field(default_factory=dict, description="Tool arguments")
+
+
+class BatchRequest(BaseModel):
+    """여러 도구 호출을 한 번에 실행하는 요청"""
+    calls: List[BatchCall] = Field(..., description="Tool calls to run")
+    sequential: bool = Field(False, description="Run calls one after another in order")
+    stop_on_error: bool = Field(False, description="In sequential mode, skip remaining calls after the first failure")
 
 
 # ==================== 동적 라우트 생성 로직 ====================
@@ -30,78 +193,97 @@ def create_dynamic_route(app: FastAPI, tool_data: Dict[str, Any]) -> None:
     input_schema = tool_data['inputSchema']
 
     try:
-        # 1. Pydantic 요청 모델 동적 생성
-        request_model = create_pydantic_model(tool_name, input_schema)
+        # 1. Pydantic 요청 모델 (레지스트리에서 한 번만 생성)
+        request_model = tool_definitions.get_request_model(tool_name, input_schema)
 
         # 2. 동적 핸들러 함수 생성
-        async def dynamic_handler(data: request_model = Body(...)) -> Dict[str, Any]:
+        async def dynamic_handler(data: request_model = Body(...),
+                                  output_format: Optional[str] = Query(None, alias="format", description=FORMAT_QUERY_DESCRIPTION)) -> Response:
             """동적으로 생성된 도구 핸들러"""
-            try:
-                # Pydantic 모델을 딕셔너리로 변환
-                arguments = data.dict()
-
-                # tools_registry에서 해당 도구 핸들러 가져오기
-                if tool_name not in TOOL_HANDLERS:
+            with start_trace(f"POST /{tool_name}", tool=tool_name):
+                try:
+                    # Pydantic 모델을 딕셔너리로 변환
+                    arguments = data.dict()
+                    log_tool_call(logger, "HTTP", tool_name, arguments)
+
+                    # tools_registry에서 해당 도구 핸들러 가져오기
+                    if not is_tool_available(tool_name):
+                        raise HTTPException(
+                            status_code=501,
+                            detail=f"Tool '{tool_name}' handler not implemented"
+                        )
+
+                    try:
+                        output_format = get_output_format(output_format or HTTP_DEFAULT_OUTPUT_FORMAT)
+                    except ValueError as e:
+                        raise HTTPException(status_code=400, detail=str(e))
+
+                    # 스레드 풀에서 핸들러 실행 (이벤트 루프 블로킹 방지)
+                    result = await dispatch_tool(tool_name, arguments)
+
+                    # 결과 처리 - dict는 출력 형식에 맞게 줄이고, 텍스트는 {"result": ...}로 감쌈
+                    with span("format_result", format=output_format):
+                        if isinstance(result, dict):
+                            result = shape_result(result, output_format)
+                        if not isinstance(result, dict):
+                            result = {"result": str(result)}
+                        return FastJSONResponse(result, pretty=output_format == "pretty", headers=_trace_headers())
+
+                except HTTPException:
+                    # HTTPException은 그대로 re-raise
+                    raise
+                except ToolTimeoutError as e:
+                    raise HTTPException(status_code=504, detail=str(e), headers=_trace_headers())
+                except Exception as e:
+                    # 기타 예외는 HTTPException으로 변환
                     raise HTTPException(
-                        status_code=501,
-                        detail=f"Tool '{tool_name}' handler not implemented"
+                        status_code=500,
+                        detail=f"Error executing {tool_name}: {str(e)}",
+                        headers=_trace_headers()
                     )
 
-                handler_func = TOOL_HANDLERS[tool_name]
+        endpoint = dynamic_handler
+        if is_streamable(tool_name):
+            # 스트리밍 지원 도구는 ?stream=true 로 NDJSON 응답을 받을 수 있음
+            async def streaming_handler(data: request_model = Body(...),
+                                        stream: bool = Query(False, description="Stream the result as NDJSON records"),
+                                        output_format: Optional[str] = Query(None, alias="format", description=FORMAT_QUERY_DESCRIPTION)):
+                """동적으로 생성된 도구 핸들러 (NDJSON 스트리밍 지원)"""
+                if not stream:
+                    return await dynamic_handler(data, output_format)
 
-                # 핸들러 함수 호출 (비동기 처리)
-                if asyncio.iscoroutinefunction(handler_func):
-                    result = await handler_func(arguments)
-                else:
-                    result = handler_func(arguments)
-
-                # 결과 처리 - MCP와 동일한 형식 유지
-                if isinstance(result, dict):
-                    return result
-                else:
-                    return {"result": str(result)}
+                arguments = data.dict()
+                log_tool_call(logger, "HTTP stream", tool_name, arguments)
+                try:
+                    lines = await stream_tool(tool_name, arguments)
+                except ToolTimeoutError as e:
+                    raise HTTPException(status_code=504, detail=str(e))
+                except Exception as e:
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Error executing {tool_name}: {str(e)}"
+                    )
+                # 스트림의 루트 span은 마지막 레코드를 보낸 뒤 닫히므로 trace ID는 응답 헤더로 먼저 알려 줌
+                return StreamingResponse(lines, media_type="application/x-ndjson", headers=_trace_headers())
 
-            except HTTPException:
-                # HTTPException은 그대로 re-raise
-                raise
-            except Exception as e:
-                # 기타 예외는 HTTPException으로 변환
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Error executing {tool_name}: {str(e)}"
-                )
+            endpoint = streaming_handler
 
         # 3. 라우트 등록
         route_path = f"/{tool_name}"
         app.add_api_route(
             path=route_path,
-            endpoint=dynamic_handler,
+            endpoint=endpoint,
             methods=["POST"],
             summary=f"Execute {tool_name}",
             description=tool_description,
             response_model=None,  # 유연한 응답을 위해 None 사용
-            tags=[_get_tool_category(tool_name)]
+            tags=[get_tool_category(tool_name)]
         )
 
-        print(f"[DEBUG] Dynamic route created: POST {route_path}", file=sys.stderr)
+        logger.debug(f"Dynamic route created: POST {route_path}")
 
     except Exception as e:
-        print(f"[ERROR] Failed to create route for {tool_name}: {e}", file=sys.stderr)
-
-
-def _get_tool_category(tool_name: str) -> str:
-    """
-    도구 이름으로부터 카테고리를 추정
-    tools_registry.TOOL_CATEGORIES를 참조하여 적절한 태그 반환
-    """
-    try:
-        from tools_registry import TOOL_CATEGORIES
-        for category, tools in TOOL_CATEGORIES.items():
-            if tool_name in tools:
-                return category
-        return "tools"  # 기본 카테고리
-    except ImportError:
-        return "tools"
+        logger.error(f"Failed to create route for {tool_name}: {e}")
 
 
 def register_dynamic_routes(app: FastAPI) -> None:
@@ -116,10 +298,14 @@ def register_dynamic_routes(app: FastAPI) -> None:
         tools_data = load_tools_json()
 
         if not tools_data:
-            print("[WARNING] No tools loaded from tools.json", file=sys.stderr)
+            logger.warning("No tools loaded from tools.json")
             return
 
-        # 각 도구에 대해 동적 라우트 생성
+        # 각 도구에 대해 동적 라우트 생성 (전용 라우트가 있는 도구, 비활성 카테고리 제외)
+        tools_data = [
+            tool for tool in tools_data
+            if tool.get('name') not in DEDICATED_ROUTE_TOOLS and is_tool_available(tool.get('name'))
+        ]
         success_count = 0
         for tool_data in tools_data:
             try:
@@ -127,21 +313,51 @@ def register_dynamic_routes(app: FastAPI) -> None:
                 success_count += 1
             except Exception as e:
                 tool_name = tool_data.get('name', 'unknown')
-                print(f"[ERROR] Failed to create route for {tool_name}: {e}", file=sys.stderr)
+                logger.error(f"Failed to create route for {tool_name}: {e}")
 
-        print(f"[INFO] Successfully created {success_count}/{len(tools_data)} dynamic routes", file=sys.stderr)
+        logger.info(f"Successfully created {success_count}/{len(tools_data)} dynamic routes")
 
     except Exception as e:
-        print(f"[ERROR] Failed to register dynamic routes: {e}", file=sys.stderr)
+        logger.error(f"Failed to register dynamic routes: {e}")
 
 
 def create_fastapi_app() -> FastAPI:
     """FastAPI 앱 생성 및 설정"""
+    mcp_http = None
+    if config.MCP_HTTP_ENABLED:
+        from mcp_server import create_streamable_http_app
+        mcp_http = create_streamable_http_app()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # 파서/캐시 예열은 요청 처리를 막지 않도록 별도 스레드에서 진행 (워커 프로세스마다 한 번)
+        start_warmup()
+        try:
+            if mcp_http is None:
+                yield
+                return
+            # MCP 세션들은 세션 관리자의 태스크 그룹에서 실행되므로 앱이 살아 있는 동안 유지
+            async with mcp_http[1].run():
+                yield
+        finally:
+            stop_warmup()
+
     app = FastAPI(
         title=config.SERVER_NAME,
         version=config.SERVER_VERSION,
         description="A hybrid server supporting both HTTP REST API and MCP protocol with token-efficient tools, OS commands, and optimized file editing",
+        lifespan=lifespan,
     )
+    app.state.mcp_http_enabled = mcp_http is not None
+
+    if mcp_http is not None:
+        # 경로 하나로 POST(요청), GET(서버 알림 스트림), DELETE(세션 종료)를 모두 처리
+        app.router.routes.append(Route(config.MCP_HTTP_PATH, endpoint=mcp_http[0]))
+        logger.info(f"MCP streamable HTTP endpoint mounted at {config.MCP_HTTP_PATH}")
+
+    if config.HTTP_ADMISSION_ENABLED:
+        # 전체/카테고리별 처리 한도를 넘는 요청은 대기열에서 기다리고, 대기열이 차면 429/503으로 거절 (CORS 미들웨어 안쪽)
+        app.add_middleware(AdmissionControlMiddleware)
 
     app.add_middleware(
         CORSMiddleware,
@@ -149,6 +365,8 @@ def create_fastapi_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # 브라우저 클라이언트가 MCP 세션 ID와 trace ID를 읽을 수 있도록 노출
+        expose_headers=["Mcp-Session-Id", "X-Trace-Id"],
     )
 
     # 라우트 등록
@@ -163,9 +381,8 @@ def register_routes(app: FastAPI):
     @app.get("/")
     async def root():
         """루트 엔드포인트"""
-        # 동적으로 도구 목록 생성
-        tools_data = load_tools_json()
-        tool_names = [tool['name'] for tool in tools_data] if tools_data else []
+        # 캐시된 도구 목록 사용 (tools.json이 바뀔 때만 다시 로드)
+        tool_names = [name for name in tool_definitions.get_tool_names() if is_tool_available(name)]
 
         return {
             "message": config.SERVER_NAME,
@@ -175,37 +392,62 @@ def register_routes(app: FastAPI):
             "endpoints": {
                 "docs": "/docs",
                 "health": "/health",
-                "allowed_directories": "/list_allowed_directories"
+                "metrics": "/metrics",
+                "allowed_directories": "/list_allowed_directories",
+                "mcp": config.MCP_HTTP_PATH if app.state.mcp_http_enabled else None
             }
         }
 
     @app.get("/health")
     async def health_check():
         """헬스 체크"""
-        try:
-            from mcp.server import Server
-            MCP_AVAILABLE = True
-        except ImportError:
-            MCP_AVAILABLE = False
-
-        # 동적으로 도구 수 계산
-        tools_data = load_tools_json()
-        total_tools = len(tools_data) if tools_data else 0
+        # 캐시된 도구 목록 사용 (tools.json이 바뀔 때만 다시 로드)
+        total_tools = sum(1 for name in tool_definitions.get_tool_names() if is_tool_available(name))
 
         return {
             "status": "healthy",
             "mcp_available": MCP_AVAILABLE,
+            "mcp_http": {
+                "path": config.MCP_HTTP_PATH,
+                "stateless": config.MCP_HTTP_STATELESS,
+            } if app.state.mcp_http_enabled else None,
             "allowed_directories_count": len(ALLOWED_DIRECTORIES),
-            "total_tools": total_tools
+            "total_tools": total_tools,
+            "worker_pid": os.getpid(),
+            "executor": get_tool_executor().get_stats(),
+            "admission": get_admission_controller().get_stats() if config.HTTP_ADMISSION_ENABLED else None,
+            "cache": shared_cache.get_stats(),
+            "warmup": get_warmup_status(),
         }
 
+    @app.get("/metrics", response_class=PlainTextResponse, summary="Prometheus metrics")
+    async def metrics():
+        """도구별 호출 수, 오류 수, 지연 시간/결과 크기 히스토그램 (Prometheus 텍스트 형식)"""
+        return PlainTextResponse(
+            tool_metrics.render_prometheus(get_tool_executor().get_stats()),
+            media_type="text/plain; version=0.0.4"
+        )
+
+    @app.post("/batch", summary="Execute multiple tools in one request", tags=["batch"])
+    async def batch(request: BatchRequest):
+        """여러 도구 호출을 한 번에 실행 - 결과는 요청 순서대로 항목별 오류와 함께 반환"""
+        calls = [call.dict() for call in request.calls]
+        with start_trace("POST /batch", calls=len(calls)):
+            try:
+                result = await dispatch_batch(calls, sequential=request.sequential,
+                                              stop_on_error=request.stop_on_error)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            with span("format_result"):
+                return FastJSONResponse(result, headers=_trace_headers())
+
     # ==================== 동적 라우트 생성 ====================
     # tools.json의 모든 도구에 대해 동적 라우트 생성
     try:
         register_dynamic_routes(app)
-        print("[INFO] Dynamic routes registration completed", file=sys.stderr)
+        logger.info("Dynamic routes registration completed")
     except Exception as e:
-        print(f"[ERROR] Failed to register dynamic routes: {e}", file=sys.stderr)
+        logger.error(f"Failed to register dynamic routes: {e}")
         # 동적 라우트 생성 실패 시에도 서버는 계속 시작
 
     @app.get("/list_allowed_directories", summary="List access-permitted directories")
@@ -4,14 +4,16 @@
 
 import shutil
 from datetime import datetime
-from typing import Dict, Any
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional
 
+import config
 from tools.utils import normalize_path, detect_file_encoding
+from tracing import span
 
 
-async def handle_read_file(arguments: Dict[str, Any]) -> str:
-    """파일 읽기 도구"""
-    path_str = arguments.get("path", "")
+def resolve_file(path_str: str) -> Path:
+    """경로 인자를 검증하고 파일 Path 반환"""
     if not path_str:
         raise ValueError("Path argument is required")
 
@@ -20,9 +22,29 @@ async def handle_read_file(arguments: Dict[str, Any]) -> str:
         raise FileNotFoundError(f"File not found: {path}")
     if not path.is_file():
         raise ValueError(f"Path is not a file: {path}")
+    return path
+
+
+def iter_file_chunks(path: Path, chunk_chars: Optional[int] = None) -> Iterator[str]:
+    """파일 내용을 chunk_chars 문자 단위로 나눠 생성 (파일 전체를 메모리에 올리지 않음)"""
+    chunk_chars = chunk_chars or config.STREAM_READ_CHUNK_CHARS
+    encoding = detect_file_encoding(path)
+    with open(path, "r", encoding=encoding) as f:
+        while True:
+            chunk = f.read(chunk_chars)
+            if not chunk:
+                break
+            yield chunk
+
+
+async def handle_read_file(arguments: Dict[str, Any]) -> str:
+    """파일 읽기 도구"""
+    path = resolve_file(arguments.get("path", ""))
 
     encoding = detect_file_encoding(path)
-    content = path.read_text(encoding=encoding)
+    with span("read_file") as read_span:
+        content = path.read_text(encoding=encoding)
+        read_span.set_attribute("chars", len(content))
     return content
 
 
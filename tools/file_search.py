@@ -5,9 +5,17 @@ Windows findstr 같은 기능을 제공하는 검색 도구들
 
 import os
 import re
-from typing import List, Dict, Optional, Tuple, Any
+from typing import List, Dict, Optional, Tuple, Any, Iterator
 from pathlib import Path
 
+from cancellation import check_cancelled
+from progress import get_progress_reporter
+from server_logging import get_logger
+from tracing import span
+from tools.pagination import is_paginated, get_page_limit, encode_cursor, decode_cursor
+
+logger = get_logger("file_search")
+
 
 class SearchResult:
     """검색 결과를 저장하는 클래스"""
@@ -48,52 +56,57 @@ def search_in_file(file_path: str, search_text: str, case_sensitive: bool = True
     results = []
     
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-            lines = file.readlines()
-            
-        # 검색 패턴 준비
-        if use_regex:
-            flags = 0 if case_sensitive else re.IGNORECASE
-            pattern = re.compile(search_text, flags)
-        else:
-            search_target = search_text if case_sensitive else search_text.lower()
-        
-        # 매칭된 라인 번호들 수집
-        matched_lines = []
-        
-        for i, line in enumerate(lines, 1):
-            line_content = line.rstrip('\n\r')
+        with span("read_file"):
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
+                lines = file.readlines()
             
+        with span("match", regex=use_regex, lines=len(lines)) as match_span:
+            # 검색 패턴 준비
             if use_regex:
-                match = pattern.search(line_content)
-                if match:
-                    result = SearchResult(
-                        file_path=file_path,
-                        line_number=i,
-                        line_content=line_content,
-                        match_start=match.start(),
-                        match_end=match.end(),
-                        match_text=match.group()
-                    )
-                    results.append(result)
-                    matched_lines.append(i)
+                flags = 0 if case_sensitive else re.IGNORECASE
+                pattern = re.compile(search_text, flags)
             else:
-                line_target = line_content if case_sensitive else line_content.lower()
-                if search_target in line_target:
-                    # 매칭 위치 찾기
-                    match_start = line_target.find(search_target)
-                    match_end = match_start + len(search_target)
+                search_target = search_text if case_sensitive else search_text.lower()
+        
+            # 매칭된 라인 번호들 수집
+            matched_lines = []
+        
+            for i, line in enumerate(lines, 1):
+                if not i & 1023:
+                    check_cancelled()
+                line_content = line.rstrip('\n\r')
+            
+                if use_regex:
+                    match = pattern.search(line_content)
+                    if match:
+                        result = SearchResult(
+                            file_path=file_path,
+                            line_number=i,
+                            line_content=line_content,
+                            match_start=match.start(),
+                            match_end=match.end(),
+                            match_text=match.group()
+                        )
+                        results.append(result)
+                        matched_lines.append(i)
+                else:
+                    line_target = line_content if case_sensitive else line_content.lower()
+                    if search_target in line_target:
+                        # 매칭 위치 찾기
+                        match_start = line_target.find(search_target)
+                        match_end = match_start + len(search_target)
                     
-                    result = SearchResult(
-                        file_path=file_path,
-                        line_number=i,
-                        line_content=line_content,
-                        match_start=match_start,
-                        match_end=match_end,
-                        match_text=line_content[match_start:match_end]
-                    )
-                    results.append(result)
-                    matched_lines.append(i)
+                        result = SearchResult(
+                            file_path=file_path,
+                            line_number=i,
+                            line_content=line_content,
+                            match_start=match_start,
+                            match_end=match_end,
+                            match_text=line_content[match_start:match_end]
+                        )
+                        results.append(result)
+                        matched_lines.append(i)
+            match_span.set_attribute("matches", len(results))
         
         # 컨텍스트 라인 추가
         if context_lines > 0 and results:
@@ -143,12 +156,32 @@ def search_in_file(file_path: str, search_text: str, case_sensitive: bool = True
     return results
 
 
-def search_in_directory(directory: str, search_text: str, file_extensions: List[str] = None,
-                       case_sensitive: bool = True, context_lines: int = 0, 
-                       use_regex: bool = False, max_files: int = 100) -> Dict[str, List[SearchResult]]:
+def _walk_position_prefix(directory: str, root: str) -> List[List[Any]]:
+    """os.walk의 root 디렉토리에 해당하는 탐색 위치 접두사 ([1, 디렉토리명] 목록)"""
+    relative = os.path.relpath(root, directory)
+    if relative == os.curdir:
+        return []
+    return [[1, part] for part in relative.split(os.sep)]
+
+
+def _is_before(prefix: List[List[Any]], start_after: Optional[List[List[Any]]]) -> bool:
+    """prefix로 시작하는 모든 위치가 재개 위치보다 앞서는지 (건너뛸 하위 트리인지)"""
+    if start_after is None:
+        return False
+    return prefix < start_after[:len(prefix)]
+
+
+def iter_search_in_directory(directory: str, search_text: str, file_extensions: List[str] = None,
+                             case_sensitive: bool = True, context_lines: int = 0,
+                             use_regex: bool = False, max_files: int = 100,
+                             stats: Optional[Dict[str, Any]] = None,
+                             start_after: Optional[List[List[Any]]] = None) -> Iterator[Tuple[str, List[SearchResult]]]:
     """
-    디렉토리 내 여러 파일에서 텍스트 검색
-    
+    디렉토리 내 여러 파일에서 텍스트 검색 - 매칭이 있는 파일마다 결과를 하나씩 생성
+
+    결과를 모두 모으지 않으므로 파일 수와 상관없이 메모리 사용량이 일정하다.
+    디렉토리/파일을 이름순으로 탐색하므로 탐색 위치(walk_position)로 중단한 지점부터 재개할 수 있다.
+
     Args:
         directory: 검색할 디렉토리 경로
         search_text: 검색할 텍스트
@@ -157,9 +190,12 @@ def search_in_directory(directory: str, search_text: str, file_extensions: List[
         context_lines: 컨텍스트 라인 수
         use_regex: 정규식 사용 여부
         max_files: 최대 검색 파일 수 (성능 제한)
-        
-    Returns:
-        파일 경로를 키로 하는 SearchResult 리스트 딕셔너리
+        stats: 전달 시 'files_searched', 'last_position'(마지막으로 검사한 파일 위치),
+               'truncated'(max_files 때문에 중단했는지)를 갱신
+        start_after: 이 탐색 위치 이후의 파일부터 검색 (페이지네이션 재개용)
+
+    Yields:
+        (파일 경로, SearchResult 리스트) 튜플
     """
     if not os.path.exists(directory):
         raise FileNotFoundError(f"디렉토리를 찾을 수 없습니다: {directory}")
@@ -167,8 +203,16 @@ def search_in_directory(directory: str, search_text: str, file_extensions: List[
     if not os.path.isdir(directory):
         raise ValueError(f"파일입니다, 디렉토리가 아닙니다: {directory}")
     
-    results = {}
     file_count = 0
+    if stats is None:
+        stats = {}
+    stats.setdefault('files_searched', 0)
+    stats['last_position'] = start_after
+    stats['truncated'] = False
+    # 진행 상황 알림을 요청한 호출이면 탐색한 파일/바이트/매치 수를 보고
+    reporter = get_progress_reporter()
+    bytes_scanned = 0
+    match_count = 0
     
     # 파일 확장자 정규화
     if file_extensions:
@@ -177,14 +221,26 @@ def search_in_directory(directory: str, search_text: str, file_extensions: List[
     
     try:
         for root, dirs, files in os.walk(directory):
-            # 숨김 폴더 제외
-            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            check_cancelled()
+            root_position = _walk_position_prefix(directory, root)
+
+            # 숨김 폴더 제외, 이름순 탐색 (재개 위치 이전의 하위 트리는 통째로 건너뜀)
+            dirs[:] = sorted(
+                d for d in dirs
+                if not d.startswith('.')
+                and not _is_before(root_position + [[1, d]], start_after)
+            )
             
-            for file in files:
+            for file in sorted(files):
+                check_cancelled()
                 # 숨김 파일 제외
                 if file.startswith('.'):
                     continue
                 
+                position = root_position + [[0, file]]
+                if start_after is not None and position <= start_after:
+                    continue
+                
                 file_path = os.path.join(root, file)
                 
                 # 확장자 필터링
@@ -195,27 +251,73 @@ def search_in_directory(directory: str, search_text: str, file_extensions: List[
                 
                 # 최대 파일 수 제한
                 if file_count >= max_files:
+                    stats['truncated'] = True
                     break
                 
+                stats['last_position'] = position
                 try:
                     file_results = search_in_file(file_path, search_text, case_sensitive, 
                                                 context_lines, use_regex)
-                    if file_results:
-                        results[file_path] = file_results
                     file_count += 1
+                    stats['files_searched'] = file_count
                     
                 except Exception as e:
                     # 개별 파일 오류는 무시하고 계속 진행
-                    print(f"파일 검색 오류 (계속 진행): {file_path} - {str(e)}")
+                    logger.debug("파일 검색 오류 (계속 진행): %s - %s", file_path, e)
                     continue
+                
+                if reporter is not None:
+                    match_count += len(file_results)
+                    try:
+                        bytes_scanned += os.path.getsize(file_path)
+                    except OSError:
+                        pass
+                    reporter.report(file_count, max_files, files=file_count,
+                                    bytes=bytes_scanned, matches=match_count)
+                
+                if file_results:
+                    yield file_path, file_results
             
             if file_count >= max_files:
+                # 남은 파일이 있는지는 더 탐색해야 알 수 있으므로 중단된 것으로 간주 (다음 페이지가 빌 수 있음)
+                stats['truncated'] = True
                 break
                 
     except Exception as e:
         raise Exception(f"디렉토리 검색 중 오류 발생: {str(e)}")
+
+
+def search_in_directory(directory: str, search_text: str, file_extensions: List[str] = None,
+                       case_sensitive: bool = True, context_lines: int = 0, 
+                       use_regex: bool = False, max_files: int = 100) -> Dict[str, List[SearchResult]]:
+    """
+    디렉토리 내 여러 파일에서 텍스트 검색
     
-    return results
+    Args:
+        directory: 검색할 디렉토리 경로
+        search_text: 검색할 텍스트
+        file_extensions: 검색할 파일 확장자 리스트 (예: ['.py', '.js'])
+        case_sensitive: 대소문자 구분 여부
+        context_lines: 컨텍스트 라인 수
+        use_regex: 정규식 사용 여부
+        max_files: 최대 검색 파일 수 (성능 제한)
+        
+    Returns:
+        파일 경로를 키로 하는 SearchResult 리스트 딕셔너리
+    """
+    return dict(iter_search_in_directory(directory, search_text, file_extensions, case_sensitive,
+                                         context_lines, use_regex, max_files))
+
+
+def search_result_to_dict(result: SearchResult) -> Dict[str, Any]:
+    """SearchResult를 응답용 딕셔너리로 변환"""
+    return {
+        "line_number": result.line_number,
+        "line_content": result.line_content,
+        "match_start": result.match_start,
+        "match_end": result.match_end,
+        "match_text": result.match_text
+    }
 
 
 def regex_search_advanced(file_path: str, pattern: str, flags: str = "", 
@@ -252,28 +354,33 @@ def regex_search_advanced(file_path: str, pattern: str, flags: str = "",
     results = []
     
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-            lines = file.readlines()
-        
-        for i, line in enumerate(lines, 1):
-            line_content = line.rstrip('\n\r')
+        with span("read_file"):
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
+                lines = file.readlines()
+        
+        with span("regex.match", lines=len(lines)) as match_span:
+            for i, line in enumerate(lines, 1):
+                if not i & 1023:
+                    check_cancelled()
+                line_content = line.rstrip('\n\r')
             
-            for match in compiled_pattern.finditer(line_content):
-                result = {
-                    'file_path': file_path,
-                    'line_number': i,
-                    'line_content': line_content,
-                    'match_start': match.start(),
-                    'match_end': match.end(),
-                    'match_text': match.group(),
-                    'full_match': match.group(0)
-                }
+                for match in compiled_pattern.finditer(line_content):
+                    result = {
+                        'file_path': file_path,
+                        'line_number': i,
+                        'line_content': line_content,
+                        'match_start': match.start(),
+                        'match_end': match.end(),
+                        'match_text': match.group(),
+                        'full_match': match.group(0)
+                    }
                 
-                if capture_groups and match.groups():
-                    result['groups'] = match.groups()
-                    result['groupdict'] = match.groupdict()
+                    if capture_groups and match.groups():
+                        result['groups'] = match.groups()
+                        result['groupdict'] = match.groupdict()
                 
-                results.append(result)
+                    results.append(result)
+            match_span.set_attribute("matches", len(results))
     
     except Exception as e:
         raise Exception(f"정규식 검색 중 오류 발생: {str(e)}")
@@ -441,24 +548,45 @@ async def handle_search_in_directory(arguments: Dict[str, Any]) -> Dict[str, Any
         if not search_text:
             return {"error": "검색할 텍스트가 필요합니다"}
         
+        # 페이지네이션 (limit/cursor가 있으면 매칭 파일 limit개까지, 탐색 위치를 커서로 반환)
+        paginated = is_paginated(arguments)
+        start_after = decode_cursor("search_in_directory", arguments) if paginated else None
+        limit = get_page_limit(arguments, default=max_files) if paginated else None
+        
         # 검색 실행
-        results = search_in_directory(
+        walk_stats = {}
+        results = {}
+        for file_path, file_results in iter_search_in_directory(
             directory=directory,
             search_text=search_text,
             file_extensions=file_extensions,
             case_sensitive=case_sensitive,
             context_lines=context_lines,
             use_regex=use_regex,
-            max_files=max_files
-        )
+            max_files=max_files,
+            stats=walk_stats,
+            start_after=start_after
+        ):
+            results[file_path] = file_results
+            if limit is not None and len(results) >= limit:
+                break
+        
+        page = {}
+        if paginated:
+            has_more = len(results) >= limit or walk_stats["truncated"]
+            page["next_cursor"] = (
+                encode_cursor("search_in_directory", arguments, walk_stats["last_position"])
+                if has_more else None
+            )
         
         if not results:
             return {
                 "message": f"'{search_text}'에 대한 검색 결과가 없습니다.",
                 "directory": directory,
                 "search_text": search_text,
-                "files_searched": 0,
-                "total_matches": 0
+                "files_searched": walk_stats["files_searched"],
+                "total_matches": 0,
+                **page
             }
         
         # 통계 정보 생성
@@ -471,6 +599,8 @@ async def handle_search_in_directory(arguments: Dict[str, Any]) -> Dict[str, Any
         
         formatted_output = format_search_results(all_results, show_line_numbers=True, 
                                                highlight_matches=True)
+        if page.get("next_cursor"):
+            formatted_output += f"\n\nnext_cursor: {page['next_cursor']}"
         
         return {
             "message": f"📂 디렉토리 검색 완료: {directory}",
@@ -485,18 +615,10 @@ async def handle_search_in_directory(arguments: Dict[str, Any]) -> Dict[str, Any
             "statistics": stats,
             "formatted_results": formatted_output,
             "file_results": {
-                file_path: [
-                    {
-                        "line_number": r.line_number,
-                        "line_content": r.line_content,
-                        "match_start": r.match_start,
-                        "match_end": r.match_end,
-                        "match_text": r.match_text
-                    }
-                    for r in file_results
-                ]
+                file_path: [search_result_to_dict(r) for r in file_results]
                 for file_path, file_results in results.items()
-            }
+            },
+            **page
         }
         
     except Exception as e:
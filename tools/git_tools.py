@@ -3,8 +3,12 @@ GitPython 라이브러리 기반 Git 도구들
 """
 
 import logging
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import json
 
 try:
@@ -13,6 +17,9 @@ try:
 except ImportError:
     GIT_AVAILABLE = False
 
+import config
+from progress import get_progress_reporter
+from tools.pagination import is_paginated, get_page_limit, encode_cursor, decode_cursor
 from tools.utils import normalize_path
 
 
@@ -21,6 +28,124 @@ def is_git_available() -> bool:
     return GIT_AVAILABLE
 
 
+class _RepositoryCache:
+    """
+    열어 둔 git.Repo를 경로별로 보관했다가 다음 호출에 빌려줌 (config.GIT_REPO_CACHE_SIZE개까지, LRU)
+
+    git.Repo와 그 cat-file 프로세스는 스레드 안전하지 않으므로 빌려 간 저장소는 돌려받을 때까지 보관 목록에서 빠지고,
+    같은 저장소를 동시에 쓰는 호출은 새 객체를 연다. .git 디렉토리가 지워지거나 다시 만들어졌으면 버리고 새로 연다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle: "OrderedDict[str, List[Tuple[Any, Tuple[int, int]]]]" = OrderedDict()
+        self._count = 0
+
+    @staticmethod
+    def _identity(repo) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(repo.git_dir)
+        except OSError:
+            return None
+        return stat.st_dev, stat.st_ino
+
+    def take(self, key: str):
+        """보관 중인 저장소 하나를 꺼냄 (없거나 낡았으면 None)"""
+        while True:
+            with self._lock:
+                entries = self._idle.get(key)
+                if not entries:
+                    return None
+                repo, identity = entries.pop()
+                self._count -= 1
+                if not entries:
+                    del self._idle[key]
+            if self._identity(repo) == identity:
+                return repo
+            repo.close()
+
+    def put(self, key: str, repo) -> None:
+        """다 쓴 저장소를 보관 (한도를 넘으면 가장 오래 쓰지 않은 것을 닫음)"""
+        identity = self._identity(repo)
+        if config.GIT_REPO_CACHE_SIZE <= 0 or identity is None:
+            repo.close()
+            return
+        evicted = []
+        with self._lock:
+            self._idle.setdefault(key, []).append((repo, identity))
+            self._idle.move_to_end(key)
+            self._count += 1
+            while self._count > config.GIT_REPO_CACHE_SIZE:
+                oldest_key, entries = next(iter(self._idle.items()))
+                evicted.append(entries.pop(0)[0])
+                self._count -= 1
+                if not entries:
+                    del self._idle[oldest_key]
+        for old_repo in evicted:
+            old_repo.close()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._idle
+
+    def clear(self) -> None:
+        with self._lock:
+            entries = [repo for items in self._idle.values() for repo, _ in items]
+            self._idle.clear()
+            self._count = 0
+        for repo in entries:
+            repo.close()
+
+
+_repositories = _RepositoryCache()
+
+
+@contextmanager
+def open_repository(repo_path: Path) -> Iterator["git.Repo"]:
+    """
+    저장소를 열어 블록 안에서 사용 (캐시에 있으면 재사용, 끝나면 캐시에 반납)
+
+    블록 안에서 예외가 나면 cat-file 프로세스 상태를 믿을 수 없으므로 반납하지 않고 닫는다.
+    """
+    key = str(repo_path)
+    repo = _repositories.take(key)
+    if repo is None:
+        repo = git.Repo(key)
+    try:
+        yield repo
+    except BaseException:
+        repo.close()
+        raise
+    _repositories.put(key, repo)
+
+
+def preload_repository(path: str) -> Optional[str]:
+    """
+    path를 포함하는 저장소를 열고 HEAD 커밋과 index를 읽은 뒤 캐시에 넣음 (시작 예열용)
+
+    Returns:
+        저장소 작업 트리 경로 (저장소가 아니면 None)
+    """
+    try:
+        repo = git.Repo(path, search_parent_directories=True)
+    except (git.InvalidGitRepositoryError, git.NoSuchPathError):
+        return None
+    working_tree_dir = repo.working_tree_dir
+    if working_tree_dir is None or working_tree_dir in _repositories:
+        # bare 저장소는 Git 도구가 다루지 않고, 이미 보관 중인 저장소는 하나만 있으면 됨
+        repo.close()
+        return working_tree_dir
+    try:
+        if repo.head.is_valid():
+            repo.head.commit.hexsha
+        len(repo.index.entries)
+    except BaseException:
+        repo.close()
+        raise
+    _repositories.put(working_tree_dir, repo)
+    return working_tree_dir
+
+
 async def handle_git_status(arguments: Dict[str, Any]) -> str:
     """
     Git 저장소의 상세한 작업 트리 상태 표시
@@ -43,41 +168,40 @@ async def handle_git_status(arguments: Dict[str, Any]) -> str:
         if not repo_path.is_dir():
             return "Error: Directory does not exist"
         
-        repo = git.Repo(str(repo_path))
-        
-        # 기본 상태 정보
-        result = [f"Repository path: {repo_path}"]
-        result.append(f"Current branch: {repo.active_branch.name}")
+        with open_repository(repo_path) as repo:
+            # 기본 상태 정보
+            result = [f"Repository path: {repo_path}"]
+            result.append(f"Current branch: {repo.active_branch.name}")
         
-        # 변경된 파일들 확인
-        modified_files = [item.a_path for item in repo.index.diff(None)]
-        staged_files = [item.a_path for item in repo.index.diff("HEAD")]
-        untracked_files = repo.untracked_files
+            # 변경된 파일들 확인
+            modified_files = [item.a_path for item in repo.index.diff(None)]
+            staged_files = [item.a_path for item in repo.index.diff("HEAD")]
+            untracked_files = repo.untracked_files
         
-        result.append(f"\nStatus summary:")
-        result.append(f"  • Modified files: {len(modified_files)}")
-        result.append(f"  • Staged files: {len(staged_files)}") 
-        result.append(f"  • Untracked files: {len(untracked_files)}")
+            result.append(f"\nStatus summary:")
+            result.append(f"  • Modified files: {len(modified_files)}")
+            result.append(f"  • Staged files: {len(staged_files)}") 
+            result.append(f"  • Untracked files: {len(untracked_files)}")
         
-        if modified_files:
-            result.append(f"\nModified files:")
-            for file in modified_files:
-                result.append(f"  • {file}")
+            if modified_files:
+                result.append(f"\nModified files:")
+                for file in modified_files:
+                    result.append(f"  • {file}")
         
-        if staged_files:
-            result.append(f"\nStaged files:")
-            for file in staged_files:
-                result.append(f"  • {file}")
+            if staged_files:
+                result.append(f"\nStaged files:")
+                for file in staged_files:
+                    result.append(f"  • {file}")
         
-        if untracked_files:
-            result.append(f"\nUntracked files:")
-            for file in untracked_files:
-                result.append(f"  • {file}")
+            if untracked_files:
+                result.append(f"\nUntracked files:")
+                for file in untracked_files:
+                    result.append(f"  • {file}")
         
-        if not modified_files and not staged_files and not untracked_files:
-            result.append(f"\nWorking tree is clean")
+            if not modified_files and not staged_files and not untracked_files:
+                result.append(f"\nWorking tree is clean")
         
-        return "\n".join(result)
+            return "\n".join(result)
         
     except git.InvalidGitRepositoryError:
         return "Error: Not a git repository"
@@ -117,10 +241,10 @@ async def handle_git_add(arguments: Dict[str, Any]) -> str:
         if not repo_path.is_dir():
             return "Error: Directory does not exist"
         
-        repo = git.Repo(str(repo_path))
-        repo.index.add(files)
+        with open_repository(repo_path) as repo:
+            repo.index.add(files)
         
-        return f"Files staged successfully: {', '.join(files)}"
+            return f"Files staged successfully: {', '.join(files)}"
         
     except git.InvalidGitRepositoryError:
         return "Error: Not a git repository"
@@ -157,14 +281,13 @@ async def handle_git_commit(arguments: Dict[str, Any]) -> str:
         if not repo_path.is_dir():
             return "Error: Directory does not exist"
         
-        repo = git.Repo(str(repo_path))
+        with open_repository(repo_path) as repo:
+            # 스테이지된 변경사항이 있는지 확인
+            if not repo.index.diff("HEAD"):
+                return "Error: No staged changes to commit"
         
-        # 스테이지된 변경사항이 있는지 확인
-        if not repo.index.diff("HEAD"):
-            return "Error: No staged changes to commit"
-        
-        commit = repo.index.commit(message)
-        return f"Changes committed successfully with hash {commit.hexsha[:8]}"
+            commit = repo.index.commit(message)
+            return f"Changes committed successfully with hash {commit.hexsha[:8]}"
         
     except git.InvalidGitRepositoryError:
         return "Error: Not a git repository"
@@ -199,15 +322,14 @@ async def handle_git_push(arguments: Dict[str, Any]) -> str:
         if not repo_path.is_dir():
             return "Error: Directory does not exist"
         
-        repo = git.Repo(str(repo_path))
-        
-        if not branch:
-            branch = repo.active_branch.name
+        with open_repository(repo_path) as repo:
+            if not branch:
+                branch = repo.active_branch.name
         
-        remote = repo.remote(remote_name)
-        remote.push(branch)
+            remote = repo.remote(remote_name)
+            remote.push(branch)
         
-        return f"Push completed: {branch} → {remote_name}/{branch}"
+            return f"Push completed: {branch} → {remote_name}/{branch}"
         
     except git.InvalidGitRepositoryError:
         return "Error: Not a git repository"
@@ -242,15 +364,14 @@ async def handle_git_pull(arguments: Dict[str, Any]) -> str:
         if not repo_path.is_dir():
             return "Error: Directory does not exist"
         
-        repo = git.Repo(str(repo_path))
+        with open_repository(repo_path) as repo:
+            if not branch:
+                branch = repo.active_branch.name
         
-        if not branch:
-            branch = repo.active_branch.name
+            remote = repo.remote(remote_name)
+            remote.pull(branch)
         
-        remote = repo.remote(remote_name)
-        remote.pull(branch)
-        
-        return f"Pull completed: {remote_name}/{branch} → {branch}"
+            return f"Pull completed: {remote_name}/{branch} → {branch}"
         
     except git.InvalidGitRepositoryError:
         return "Error: Not a git repository"
@@ -260,6 +381,38 @@ async def handle_git_pull(arguments: Dict[str, Any]) -> str:
         return f"Error: {str(e)}"
 
 
+_CLONE_STAGES = {4: "counting", 8: "compressing", 16: "writing", 32: "receiving",
+                 64: "resolving", 128: "finding sources", 256: "checking out"}
+
+
+def _clone_progress_callback():
+    """
+    git clone 진행 상황을 MCP 진행 알림으로 전달하는 GitPython progress 콜백 (알림 요청이 없으면 None)
+
+    GitPython은 출력을 읽는 별도 스레드에서 콜백을 부를 수 있으므로 보고기는 워커 스레드에서 미리 가져온다.
+    단계마다 개수가 0부터 다시 시작하므로 진행 값은 "완료된 단계 수 + 현재 단계 비율"로 증가시킨다.
+    """
+    reporter = get_progress_reporter()
+    if reporter is None:
+        return None
+
+    stages_done = -1
+
+    def callback(op_code, cur_count, max_count=None, message=""):
+        nonlocal stages_done
+        if op_code & git.RemoteProgress.BEGIN:
+            stages_done += 1
+        fraction = (cur_count / max_count) if max_count else 0.0
+        stage = _CLONE_STAGES.get(op_code & git.RemoteProgress.OP_MASK, "working")
+        objects = f"{int(cur_count)}/{int(max_count)}" if max_count else str(int(cur_count))
+        counters = {"stage": stage, "objects": objects}
+        if message:
+            counters["transfer"] = message.strip(" ,")
+        reporter.report(max(stages_done, 0) + min(fraction, 1.0), **counters)
+
+    return callback
+
+
 async def handle_git_clone(arguments: Dict[str, Any]) -> str:
     """
     원격 저장소를 로컬에 복제
@@ -283,12 +436,13 @@ async def handle_git_clone(arguments: Dict[str, Any]) -> str:
         if not url:
             return "Error: Repository URL is required"
         
+        progress = _clone_progress_callback()
         if path:
             path = normalize_path(path)
-            repo = git.Repo.clone_from(url, str(path))
+            repo = git.Repo.clone_from(url, str(path), progress=progress)
             return f"Repository cloned successfully: {url} → {path}"
         else:
-            repo = git.Repo.clone_from(url, ".")
+            repo = git.Repo.clone_from(url, ".", progress=progress)
             return f"Repository cloned successfully: {url}"
         
     except git.GitCommandError as e:
@@ -324,73 +478,72 @@ async def handle_git_branch(arguments: Dict[str, Any]) -> str:
         if not repo_path.is_dir():
             return "Error: Directory does not exist"
         
-        repo = git.Repo(str(repo_path))
-        
-        if action == "list":
-            # 브랜치 목록 표시
-            branches = []
-            for branch in repo.branches:
-                prefix = "* " if branch == repo.active_branch else "  "
-                branches.append(f"{prefix}{branch.name}")
+        with open_repository(repo_path) as repo:
+            if action == "list":
+                # 브랜치 목록 표시
+                branches = []
+                for branch in repo.branches:
+                    prefix = "* " if branch == repo.active_branch else "  "
+                    branches.append(f"{prefix}{branch.name}")
             
-            result = ["Local branches:"]
-            result.extend(branches)
-            return "\n".join(result)
-        
-        elif action == "create":
-            # 새 브랜치 생성
-            if not branch_name:
-                return "Error: Branch name is required"
+                result = ["Local branches:"]
+                result.extend(branches)
+                return "\n".join(result)
+        
+            elif action == "create":
+                # 새 브랜치 생성
+                if not branch_name:
+                    return "Error: Branch name is required"
             
-            # 브랜치가 이미 존재하는지 확인
-            if branch_name in [ref.name for ref in repo.refs]:
-                return f"Error: Branch '{branch_name}' already exists"
+                # 브랜치가 이미 존재하는지 확인
+                if branch_name in [ref.name for ref in repo.refs]:
+                    return f"Error: Branch '{branch_name}' already exists"
             
-            if base_branch:
-                try:
-                    base = repo.refs[base_branch]
-                except IndexError:
-                    return f"Error: Base branch '{base_branch}' does not exist"
-            else:
-                base = repo.active_branch
+                if base_branch:
+                    try:
+                        base = repo.refs[base_branch]
+                    except IndexError:
+                        return f"Error: Base branch '{base_branch}' does not exist"
+                else:
+                    base = repo.active_branch
             
-            repo.create_head(branch_name, base)
-            return f"Branch created successfully: '{branch_name}' (based on {base.name})"
+                repo.create_head(branch_name, base)
+                return f"Branch created successfully: '{branch_name}' (based on {base.name})"
         
-        elif action == "checkout":
-            # 브랜치 전환
-            if not branch_name:
-                return "Error: Branch name is required"
+            elif action == "checkout":
+                # 브랜치 전환
+                if not branch_name:
+                    return "Error: Branch name is required"
             
-            # 브랜치가 존재하는지 확인
-            if branch_name not in [ref.name for ref in repo.refs]:
-                return f"Error: Branch '{branch_name}' does not exist"
+                # 브랜치가 존재하는지 확인
+                if branch_name not in [ref.name for ref in repo.refs]:
+                    return f"Error: Branch '{branch_name}' does not exist"
             
-            # 변경되지 않은 파일이 있는지 확인
-            if repo.is_dirty():
-                return "Error: You have unstaged changes. Please commit or stash them first"
+                # 변경되지 않은 파일이 있는지 확인
+                if repo.is_dirty():
+                    return "Error: You have unstaged changes. Please commit or stash them first"
             
-            repo.git.checkout(branch_name)
-            return f"Switched to branch '{branch_name}'"
+                repo.git.checkout(branch_name)
+                return f"Switched to branch '{branch_name}'"
         
-        elif action == "delete":
-            # 브랜치 삭제
-            if not branch_name:
-                return "Error: Branch name is required"
+            elif action == "delete":
+                # 브랜치 삭제
+                if not branch_name:
+                    return "Error: Branch name is required"
             
-            # 현재 브랜치인지 확인
-            if branch_name == repo.active_branch.name:
-                return f"Error: Cannot delete current branch '{branch_name}'"
+                # 현재 브랜치인지 확인
+                if branch_name == repo.active_branch.name:
+                    return f"Error: Cannot delete current branch '{branch_name}'"
             
-            # 브랜치가 존재하는지 확인
-            if branch_name not in [ref.name for ref in repo.refs]:
-                return f"Error: Branch '{branch_name}' does not exist"
+                # 브랜치가 존재하는지 확인
+                if branch_name not in [ref.name for ref in repo.refs]:
+                    return f"Error: Branch '{branch_name}' does not exist"
             
-            repo.delete_head(branch_name)
-            return f"Branch deleted successfully: {branch_name}"
+                repo.delete_head(branch_name)
+                return f"Branch deleted successfully: {branch_name}"
         
-        else:
-            return f"Error: Unknown action '{action}'. Available actions: list, create, checkout, delete"
+            else:
+                return f"Error: Unknown action '{action}'. Available actions: list, create, checkout, delete"
         
     except git.InvalidGitRepositoryError:
         return "Error: Not a git repository"
@@ -400,6 +553,17 @@ async def handle_git_branch(arguments: Dict[str, Any]) -> str:
         return f"Error: {str(e)}"
 
 
+def _format_commits(commits: List[Any], start: int) -> List[str]:
+    """커밋 목록을 git_log 출력 라인으로 변환 (start부터 번호 매김)"""
+    lines = []
+    for i, commit in enumerate(commits, start):
+        lines.append(f"{i}. {commit.hexsha[:8]} - {commit.summary}")
+        lines.append(f"   Author: {commit.author} <{commit.author.email}>")
+        lines.append(f"   Date: {commit.authored_datetime.strftime('%Y-%m-%d %H:%M:%S')}")
+        lines.append("")
+    return lines
+
+
 async def handle_git_log(arguments: Dict[str, Any]) -> str:
     """
     커밋 히스토리 조회
@@ -410,6 +574,8 @@ async def handle_git_log(arguments: Dict[str, Any]) -> str:
     Args:
         repo_path: Git 저장소 경로 (기본값: 현재 디렉토리)
         max_count: 조회할 최대 커밋 개수 (기본값: 10)
+        limit: 페이지 크기 (지정 시 페이지 단위 조회, 기본값: max_count)
+        cursor: 이전 페이지 결과의 next_cursor
         
     Returns:
         str: 커밋 히스토리 정보
@@ -424,22 +590,39 @@ async def handle_git_log(arguments: Dict[str, Any]) -> str:
         if not repo_path.is_dir():
             return "Error: Directory does not exist"
         
-        repo = git.Repo(str(repo_path))
-        commits = list(repo.iter_commits(max_count=max_count))
-        
-        if not commits:
-            return "No commits found"
-        
-        result = [f"Commit history (last {len(commits)} commits):"]
-        result.append("")
-        
-        for i, commit in enumerate(commits, 1):
-            result.append(f"{i}. {commit.hexsha[:8]} - {commit.summary}")
-            result.append(f"   Author: {commit.author} <{commit.author.email}>")
-            result.append(f"   Date: {commit.authored_datetime.strftime('%Y-%m-%d %H:%M:%S')}")
+        with open_repository(repo_path) as repo:
+            if not is_paginated(arguments):
+                commits = list(repo.iter_commits(max_count=max_count))
+            
+                if not commits:
+                    return "No commits found"
+            
+                result = [f"Commit history (last {len(commits)} commits):"]
+                result.append("")
+                result.extend(_format_commits(commits, start=1))
+                return "\n".join(result)
+        
+            # 페이지네이션 - 커서는 첫 페이지의 HEAD 커밋과 오프셋 (그 사이 새 커밋이 생겨도 페이지가 밀리지 않음)
+            limit = get_page_limit(arguments, default=max_count)
+            position = decode_cursor("git_log", arguments)
+            if position is None:
+                position = {"head": repo.head.commit.hexsha, "offset": 0}
+            head, offset = position["head"], position["offset"]
+        
+            # limit+1개를 조회해 다음 페이지 존재 여부 확인
+            commits = list(repo.iter_commits(rev=head, max_count=limit + 1, skip=offset))
+            has_more = len(commits) > limit
+            commits = commits[:limit]
+        
+            if not commits:
+                return "No more commits"
+        
+            result = [f"Commit history (commits {offset + 1}-{offset + len(commits)} from {head[:8]}):"]
             result.append("")
-        
-        return "\n".join(result)
+            result.extend(_format_commits(commits, start=offset + 1))
+            if has_more:
+                result.append(f"next_cursor: {encode_cursor('git_log', arguments, {'head': head, 'offset': offset + limit})}")
+            return "\n".join(result)
         
     except git.InvalidGitRepositoryError:
         return "Error: Not a git repository"
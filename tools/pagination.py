@@ -0,0 +1,67 @@
+"""
+커서 기반 페이지네이션 공통 프로토콜
+limit / cursor 인자를 받는 도구들이 공유 - 커서는 도구 이름, 나머지 인자의 지문,
+재개 위치(탐색 위치 또는 결과 오프셋)를 담은 불투명 문자열
+"""
+
+import base64
+import hashlib
+import json
+from typing import Dict, Any, Optional
+
+import config
+
+# 지문 계산에서 제외하는 페이지네이션 인자
+PAGINATION_ARGUMENTS = ("limit", "cursor")
+
+
+def is_paginated(arguments: Dict[str, Any]) -> bool:
+    """limit 또는 cursor가 지정된 호출인지 확인 (둘 다 없으면 기존처럼 전체 결과 반환)"""
+    return arguments.get("limit") is not None or bool(arguments.get("cursor"))
+
+
+def get_page_limit(arguments: Dict[str, Any], default: int) -> int:
+    """페이지 크기 반환 (1 ~ config.PAGINATION_MAX_LIMIT 범위로 검증)"""
+    limit = arguments.get("limit")
+    if limit is None:
+        limit = default
+    if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, config.PAGINATION_MAX_LIMIT)
+
+
+def _fingerprint(tool_name: str, arguments: Dict[str, Any]) -> str:
+    """페이지네이션 인자를 뺀 나머지 인자의 짧은 해시 (다른 질의에 커서를 재사용하는 것 방지)"""
+    query = {k: v for k, v in arguments.items() if k not in PAGINATION_ARGUMENTS}
+    payload = json.dumps([tool_name, query], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8", "surrogatepass")).hexdigest()[:12]
+
+
+def encode_cursor(tool_name: str, arguments: Dict[str, Any], position: Any) -> str:
+    """다음 페이지 재개 위치를 커서 문자열로 인코딩"""
+    payload = {"t": tool_name, "q": _fingerprint(tool_name, arguments), "p": position}
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8", "surrogatepass")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(tool_name: str, arguments: Dict[str, Any]) -> Optional[Any]:
+    """
+    인자의 cursor를 디코딩해 재개 위치 반환 (cursor가 없으면 None)
+
+    Raises:
+        ValueError: 형식이 잘못되었거나 다른 도구/다른 인자로 만든 커서인 경우
+    """
+    cursor = arguments.get("cursor")
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8", "surrogatepass"))
+        tool, fingerprint, position = payload["t"], payload["q"], payload["p"]
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if tool != tool_name or fingerprint != _fingerprint(tool_name, arguments):
+        raise ValueError("Cursor does not match this tool call (arguments other than limit/cursor must stay the same)")
+    return position
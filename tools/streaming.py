@@ -0,0 +1,124 @@
+"""
+NDJSON 스트리밍용 도구 레코드 생성기
+결과 전체를 메모리에 모으는 대신 파일/항목/청크 단위 레코드를 하나씩 생성하고
+마지막에 {"type": "summary"} 레코드로 끝낸다 (FastAPI 라우트의 ?stream=true)
+"""
+
+from typing import Dict, Any, Callable, Iterator, Optional
+
+Record = Dict[str, Any]
+
+
+def stream_search_in_directory(arguments: Dict[str, Any]) -> Iterator[Record]:
+    """search_in_directory - 매칭이 있는 파일마다 {"type": "file"} 레코드"""
+    from tools.file_search import iter_search_in_directory, search_result_to_dict
+
+    directory = arguments.get("directory", "")
+    search_text = arguments.get("search_text", "")
+    if not directory:
+        yield {"type": "error", "error": "디렉토리 경로가 필요합니다"}
+        return
+    if not search_text:
+        yield {"type": "error", "error": "검색할 텍스트가 필요합니다"}
+        return
+
+    stats = {"files_searched": 0}
+    files_with_matches = 0
+    total_matches = 0
+    for file_path, file_results in iter_search_in_directory(
+        directory=directory,
+        search_text=search_text,
+        file_extensions=arguments.get("file_extensions", None),
+        case_sensitive=arguments.get("case_sensitive", True),
+        context_lines=arguments.get("context_lines", 0),
+        use_regex=arguments.get("use_regex", False),
+        max_files=arguments.get("max_files", 100),
+        stats=stats,
+    ):
+        files_with_matches += 1
+        total_matches += len(file_results)
+        yield {
+            "type": "file",
+            "file_path": file_path,
+            "matches": [search_result_to_dict(r) for r in file_results],
+        }
+
+    yield {
+        "type": "summary",
+        "directory": directory,
+        "search_text": search_text,
+        "files_searched": stats["files_searched"],
+        "files_with_matches": files_with_matches,
+        "total_matches": total_matches,
+    }
+
+
+def stream_read_file(arguments: Dict[str, Any]) -> Iterator[Record]:
+    """read_file - config.STREAM_READ_CHUNK_CHARS 문자 단위 {"type": "chunk"} 레코드"""
+    from tools.file_io import resolve_file, iter_file_chunks
+
+    path = resolve_file(arguments.get("path", ""))
+    chunks = 0
+    chars = 0
+    for chunk in iter_file_chunks(path):
+        chunks += 1
+        chars += len(chunk)
+        yield {"type": "chunk", "data": chunk}
+
+    yield {"type": "summary", "path": str(path), "chunks": chunks, "chars": chars}
+
+
+def stream_list_directory(arguments: Dict[str, Any]) -> Iterator[Record]:
+    """list_directory - 항목마다 {"type": "entry"} 레코드 (정렬하지 않고 파일 시스템 순서)"""
+    from tools.directory_manager import resolve_directory, iter_directory_entries
+
+    path = resolve_directory(arguments.get("path", ""))
+    count = 0
+    for entry in iter_directory_entries(path, sort=False):
+        count += 1
+        yield {"type": "entry", "name": entry["name"], "entry_type": entry["type"], "size": entry["size"]}
+
+    yield {"type": "summary", "path": str(path), "count": count}
+
+
+def stream_list_functions(arguments: Dict[str, Any]) -> Iterator[Record]:
+    """
+    list_functions - 함수마다 {"type": "function"} 레코드
+
+    tree-sitter는 파일 전체를 한 번에 파싱하므로 분석 자체는 기존 핸들러로 수행하고
+    직렬화만 레코드 단위로 나눈다 (첫 바이트 이후 응답을 한 덩어리로 만들지 않음).
+    """
+    from tool_dispatcher import run_handler_sync
+    from tools.tree_sitter_analyzer import handle_list_functions
+
+    result = run_handler_sync(handle_list_functions, arguments)
+    if "error" in result:
+        yield {"type": "error", "error": result["error"]}
+        return
+
+    for function in result["functions"]:
+        record = {"type": "function", "function_type": function.get("type")}
+        record.update((key, value) for key, value in function.items() if key != "type")
+        yield record
+
+    yield {
+        "type": "summary",
+        "file_path": result["file_path"],
+        "language": result["language"],
+        "total_count": result["total_count"],
+        "include_private": result["include_private"],
+    }
+
+
+# 스트리밍을 지원하는 도구 → 레코드 생성기
+STREAM_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Iterator[Record]]] = {
+    "search_in_directory": stream_search_in_directory,
+    "read_file": stream_read_file,
+    "list_directory": stream_list_directory,
+    "list_functions": stream_list_functions,
+}
+
+
+def get_stream_handler(tool_name: str) -> Optional[Callable[[Dict[str, Any]], Iterator[Record]]]:
+    """도구의 스트리밍 레코드 생성기 반환 (지원하지 않으면 None)"""
+    return STREAM_HANDLERS.get(tool_name)
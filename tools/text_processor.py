@@ -5,8 +5,11 @@
 import tempfile
 import shutil
 import os
-from typing import Dict, Any
+from pathlib import Path
+from typing import Dict, Any, TextIO
 
+import config
+from shared_cache import shared_cache, file_validator
 from tools.utils import normalize_path
 
 
@@ -50,6 +53,34 @@ async def handle_append_to_file(arguments: Dict[str, Any]) -> str:
     return f"{base_msg}\n{change_msg}\n{total_msg}"
 
 
+def _skip_to_line(f: TextIO, path: Path, target_line: int) -> int:
+    """
+    텍스트 파일 f를 target_line 시작 위치로 이동하고 현재 줄 번호 반환
+
+    config.LINE_INDEX_STRIDE 줄마다 f.tell() 위치를 기록한 색인을 공유 캐시에 두어
+    같은 파일의 뒷부분을 다시 읽을 때 처음부터 줄을 세지 않는다 (파일이 바뀌면 색인 무효).
+    """
+    stride = config.LINE_INDEX_STRIDE
+    validator = file_validator(path)
+    cached = shared_cache.get("line_index", path)
+    offsets = list(cached) if cached else [0]  # offsets[i] = (i * stride + 1)번째 줄의 위치
+
+    slot = min((target_line - 1) // stride, len(offsets) - 1)
+    f.seek(offsets[slot])
+    current_line = slot * stride + 1
+
+    while current_line < target_line:
+        if (current_line - 1) % stride == 0 and (current_line - 1) // stride == len(offsets):
+            offsets.append(f.tell())
+        if not f.readline():  # 파일 끝
+            break
+        current_line += 1
+
+    if validator is not None and len(offsets) > (len(cached) if cached else 1):
+        shared_cache.set("line_index", path, offsets, validator=validator)
+    return current_line
+
+
 async def handle_get_file_section(arguments: Dict[str, Any]) -> str:
     """파일 섹션 읽기 도구 - 큰 파일용 최적화"""
     path_str = arguments.get("path", "")
@@ -69,12 +100,8 @@ async def handle_get_file_section(arguments: Dict[str, Any]) -> str:
 
     # 스트리밍 방식으로 큰 파일도 효율적으로 처리
     with path.open('r', encoding='utf-8') as f:
-        current_line = 1
-
-        # actual_start까지 스킵
-        while current_line < actual_start:
-            f.readline()
-            current_line += 1
+        # 줄 위치 색인으로 가까운 지점까지 바로 이동한 뒤 actual_start까지 스킵
+        current_line = _skip_to_line(f, path, actual_start)
 
         # 필요한 라인들만 읽기
         while current_line <= actual_end:
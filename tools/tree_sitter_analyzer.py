@@ -4,9 +4,19 @@ tree-sitter 0.24.0+ 전용
 """
 
 import os
+import threading
+import time
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 
+import config
+from server_logging import get_logger
+from shared_cache import shared_cache, file_validator
+from tracing import span
+from tools.pagination import is_paginated, get_page_limit, encode_cursor, decode_cursor
+
+logger = get_logger("tree_sitter")
+
 # Tree-sitter 관련 import 및 초기화
 TREE_SITTER_AVAILABLE = False
 AVAILABLE_PARSERS = {}
@@ -15,7 +25,7 @@ try:
     import tree_sitter
     from tree_sitter import Language, Parser
 
-    print("tree-sitter 기본 패키지 로드 성공")
+    logger.debug("tree-sitter 기본 패키지 로드 성공")
 
     # 언어별 파서 개별 import - 최신 API 방식
     parsers_to_load = [
@@ -48,21 +58,21 @@ try:
                 AVAILABLE_PARSERS[lang_name] = language_func
                 # print(f"{lang_name} 파서 로드 성공")
             else:
-                print(f"{lang_name} 파서에서 language 함수를 찾을 수 없음")
+                logger.warning(f"{lang_name} 파서에서 language 함수를 찾을 수 없음")
         except ImportError as e:
-            print(f"{lang_name} 파서 로드 실패: {e}")
+            logger.warning(f"{lang_name} 파서 로드 실패: {e}")
         except Exception as e:
-            print(f"{lang_name} 파서 로드 중 오류: {e}")
+            logger.warning(f"{lang_name} 파서 로드 중 오류: {e}")
     if AVAILABLE_PARSERS:
         TREE_SITTER_AVAILABLE = True
         # print(f"총 {len(AVAILABLE_PARSERS)}/{len(parsers_to_load)} 파서 로드됨")
     else:
-        print("사용 가능한 tree-sitter 파서가 없습니다")
+        logger.warning("사용 가능한 tree-sitter 파서가 없습니다")
 
 except ImportError as e:
-    print(f"tree-sitter 기본 패키지 로드 실패: {e}")
+    logger.warning(f"tree-sitter 기본 패키지 로드 실패: {e}")
 except Exception as e:
-    print(f"tree-sitter 초기화 중 예상치 못한 오류: {e}")
+    logger.error(f"tree-sitter 초기화 중 예상치 못한 오류: {e}")
 
 
 class TreeSitterAnalyzer:
@@ -71,15 +81,18 @@ class TreeSitterAnalyzer:
     def __init__(self):
         self.parsers: Dict[str, Parser] = {}
         self.languages: Dict[str, Language] = {}
+        self.init_times: Dict[str, float] = {}  # 언어별 파서 생성 시간 (초)
+        self.queries: Dict[str, Any] = {}  # 언어별 컴파일된 함수 검색 쿼리 (get_query에서 채움)
         self._init_languages()
 
     def _init_languages(self):
         """사용 가능한 언어의 파서만 초기화 - 최신 tree-sitter API"""
         if not TREE_SITTER_AVAILABLE:
-            print("[ERROR] tree-sitter를 사용할 수 없습니다")
+            logger.error("tree-sitter를 사용할 수 없습니다")
             return
 
         for lang_name, language_func in AVAILABLE_PARSERS.items():
+            start_time = time.perf_counter()
             try:
                 # 최신 tree-sitter API: language 함수를 직접 호출
                 language = Language(language_func())
@@ -89,15 +102,15 @@ class TreeSitterAnalyzer:
 
                 self.languages[lang_name] = language
                 self.parsers[lang_name] = parser
-                print(f"[OK] {lang_name} 파서 초기화 완료")
+                self.init_times[lang_name] = time.perf_counter() - start_time
+                logger.debug(f"{lang_name} 파서 초기화 완료")
 
             except Exception as e:
-                print(f"[ERROR] {lang_name} 파서 초기화 실패: {e}")
+                logger.error(f"{lang_name} 파서 초기화 실패: {e}")
                 # 디버깅을 위한 자세한 오류 정보
-                import traceback
-                print(f"[DEBUG] {lang_name} 상세 오류: {traceback.format_exc()}")
+                logger.debug(f"{lang_name} 상세 오류", exc_info=True)
 
-        print(f"[INFO] 총 {len(self.parsers)}개 파서 초기화 완료")
+        logger.info(f"총 {len(self.parsers)}개 파서 초기화 완료")
 
     def _get_language_from_extension(self, file_path: str) -> Optional[str]:
         """파일 확장자로부터 적절한 언어 파서 결정"""
@@ -188,6 +201,17 @@ class TreeSitterAnalyzer:
 
         return queries.get(language, '')
 
+    def get_query(self, language: str):
+        """언어별 함수 검색 쿼리 - 처음 사용할 때 한 번만 컴파일하고 재사용 (지원하지 않는 언어면 None)"""
+        query = self.queries.get(language)
+        if query is None:
+            query_text = self._get_function_query(language)
+            if not query_text:
+                return None
+            query = self.languages[language].query(query_text)
+            self.queries[language] = query
+        return query
+
     def _get_node_text(self, node, content: str) -> str:
         """노드에서 텍스트를 안전하게 추출"""
         try:
@@ -203,8 +227,9 @@ class TreeSitterAnalyzer:
 # MCP 도구 핸들러 함수들
 # =============================================================================
 
-# 전역 analyzer
+# 전역 analyzer (시작 예열 스레드와 도구 워커 스레드가 동시에 만들지 않도록 잠금)
 analyzer = None
+_analyzer_lock = threading.Lock()
 
 
 def get_analyzer():
@@ -217,12 +242,14 @@ def get_analyzer():
         if not AVAILABLE_PARSERS:
             return None, "No available tree-sitter language parsers."
 
-        try:
-            analyzer = TreeSitterAnalyzer()
-            if not analyzer.parsers:
-                return None, "Failed to initialize tree-sitter parsers."
-        except Exception as e:
-            return None, f"TreeSitter initialization failed: {str(e)}"
+        with _analyzer_lock:
+            if analyzer is None:
+                try:
+                    analyzer = TreeSitterAnalyzer()
+                except Exception as e:
+                    return None, f"TreeSitter initialization failed: {str(e)}"
+        if not analyzer.parsers:
+            return None, "Failed to initialize tree-sitter parsers."
     return analyzer, None
 
 
@@ -243,8 +270,9 @@ async def handle_find_function(arguments: Dict[str, Any]) -> Dict[str, Any]:
             return {"error": f"File not found: {path}"}
 
         # 파일 읽기
-        with open(path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        with span("read_file"):
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
 
         # 언어 결정
         language = analyzer._get_language_from_extension(path)
@@ -253,15 +281,17 @@ async def handle_find_function(arguments: Dict[str, Any]) -> Dict[str, Any]:
 
         # 파서로 구문 분석
         parser = analyzer.parsers[language]
-        tree = parser.parse(bytes(content, "utf8"))
+        with span("tree_sitter.parse", language=language, bytes=len(content)):
+            tree = parser.parse(bytes(content, "utf8"))
 
         # 함수 검색 쿼리
         query_text = analyzer._get_function_query(language)
         if not query_text:
             return {"error": f"Function search for {language} language is not yet supported"}
 
-        query = analyzer.languages[language].query(query_text)
-        captures = query.captures(tree.root_node)
+        with span("tree_sitter.query", language=language):
+            query = analyzer.get_query(language)
+            captures = query.captures(tree.root_node)
 
         # tree-sitter 0.24.0의 딕셔너리 형식 처리
         if language == 'html':
@@ -437,6 +467,217 @@ async def handle_find_function(arguments: Dict[str, Any]) -> Dict[str, Any]:
         return {"error": f"Error occurred during function search: {str(e)}"}
 
 
+def _collect_functions(analyzer: TreeSitterAnalyzer, path: str, include_private: bool) -> Dict[str, Any]:
+    """파일을 파싱해 함수 목록 결과 생성 (오류는 {"error": ...})"""
+    # 파일 읽기
+    with span("read_file"):
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+    # 언어 결정
+    language = analyzer._get_language_from_extension(path)
+    if not language or language not in analyzer.parsers:
+        return {"error": f"Unsupported file format: {path}"}
+
+    # 파서로 구문 분석
+    parser = analyzer.parsers[language]
+    with span("tree_sitter.parse", language=language, bytes=len(content)):
+        tree = parser.parse(bytes(content, "utf8"))
+
+    # 함수 검색 쿼리
+    query_text = analyzer._get_function_query(language)
+    if not query_text:
+        return {"error": f"Function listing for {language} language is not yet supported"}
+
+    with span("tree_sitter.query", language=language):
+        query = analyzer.get_query(language)
+        captures = query.captures(tree.root_node)
+
+    functions = []
+    processed_nodes = set()
+
+    # tree-sitter 0.24.0의 딕셔너리 형식 처리
+    if language == 'html':
+        # HTML 전용 처리
+        element_nodes = captures.get('element', [])
+        name_nodes = captures.get('name', [])
+        script_nodes = captures.get('script', [])
+        doctype_nodes = captures.get('doctype', [])
+        
+        # HTML 요소들 처리
+        for element_node in element_nodes:
+            if id(element_node) not in processed_nodes:
+                processed_nodes.add(id(element_node))
+                
+                # 요소 이름 찾기
+                element_name = "element"
+                for name_node in name_nodes:
+                    if (element_node.start_point <= name_node.start_point <= element_node.end_point):
+                        element_name = analyzer._get_node_text(name_node, content)
+                        break
+                
+                start_line = element_node.start_point[0] + 1
+                end_line = element_node.end_point[0] + 1
+                
+                functions.append({
+                    "name": element_name,
+                    "type": "html_element",
+                    "start_line": start_line,
+                    "end_line": end_line,
+                    "line_count": end_line - start_line + 1
+                })
+        
+        # 스크립트 요소들 처리
+        for i, script_node in enumerate(script_nodes):
+            if id(script_node) not in processed_nodes:
+                processed_nodes.add(id(script_node))
+                
+                start_line = script_node.start_point[0] + 1
+                end_line = script_node.end_point[0] + 1
+                
+                functions.append({
+                    "name": f"script_{i+1}",
+                    "type": "script_element",
+                    "start_line": start_line,
+                    "end_line": end_line,
+                    "line_count": end_line - start_line + 1
+                })
+        
+        # DOCTYPE 요소들 처리
+        for i, doctype_node in enumerate(doctype_nodes):
+            if id(doctype_node) not in processed_nodes:
+                processed_nodes.add(id(doctype_node))
+                
+                start_line = doctype_node.start_point[0] + 1
+                end_line = doctype_node.end_point[0] + 1
+                
+                functions.append({
+                    "name": f"doctype_{i+1}",
+                    "type": "doctype",
+                    "start_line": start_line,
+                    "end_line": end_line,
+                    "line_count": end_line - start_line + 1
+                })
+    elif language == 'json':
+        # JSON 전용 처리
+        property_nodes = captures.get('property', [])
+        name_nodes = captures.get('name', [])
+        array_nodes = captures.get('array', [])
+        object_nodes = captures.get('object', [])
+        
+        # JSON 프로퍼티들 처리
+        for property_node in property_nodes:
+            if id(property_node) not in processed_nodes:
+                processed_nodes.add(id(property_node))
+                
+                # 프로퍼티 키 이름 찾기
+                property_name = "property"
+                for name_node in name_nodes:
+                    if (property_node.start_point <= name_node.start_point <= property_node.end_point):
+                        property_name = analyzer._get_node_text(name_node, content)
+                        # JSON 키에서 따옴표 제거
+                        if property_name.startswith('"') and property_name.endswith('"'):
+                            property_name = property_name[1:-1]
+                        break
+                
+                start_line = property_node.start_point[0] + 1
+                end_line = property_node.end_point[0] + 1
+                
+                functions.append({
+                    "name": property_name,
+                    "type": "json_property",
+                    "start_line": start_line,
+                    "end_line": end_line,
+                    "line_count": end_line - start_line + 1
+                })
+        
+        # JSON 배열들 처리
+        for i, array_node in enumerate(array_nodes):
+            if id(array_node) not in processed_nodes:
+                processed_nodes.add(id(array_node))
+                
+                start_line = array_node.start_point[0] + 1
+                end_line = array_node.end_point[0] + 1
+                
+                functions.append({
+                    "name": f"array_{i+1}",
+                    "type": "json_array",
+                    "start_line": start_line,
+                    "end_line": end_line,
+                    "line_count": end_line - start_line + 1
+                })
+        
+        # JSON 객체들 처리
+        for i, object_node in enumerate(object_nodes):
+            if id(object_node) not in processed_nodes:
+                processed_nodes.add(id(object_node))
+                
+                start_line = object_node.start_point[0] + 1
+                end_line = object_node.end_point[0] + 1
+                
+                functions.append({
+                    "name": f"object_{i+1}",
+                    "type": "json_object",
+                    "start_line": start_line,
+                    "end_line": end_line,
+                    "line_count": end_line - start_line + 1
+                })
+    else:
+        # JavaScript/TypeScript 등 기존 처리
+        function_nodes = captures.get('function', [])
+        name_nodes = captures.get('name', [])
+
+        for func_node in function_nodes:
+            if id(func_node) not in processed_nodes:
+                processed_nodes.add(id(func_node))
+
+                # 함수 이름 찾기
+                function_name = "anonymous"
+                for name_node in name_nodes:
+                    # 이름 노드가 함수 노드 내부에 있는지 확인
+                    if (func_node.start_point <= name_node.start_point <= func_node.end_point):
+                        function_name = analyzer._get_node_text(name_node, content)
+                        break
+
+                # private 함수 필터링 (언더스코어로 시작)
+                if not include_private and function_name.startswith('_'):
+                    continue
+
+                start_line = func_node.start_point[0] + 1
+                end_line = func_node.end_point[0] + 1
+
+                # 함수 타입 결정
+                node_type = func_node.type
+                function_type = "function"
+                if "arrow" in node_type:
+                    function_type = "arrow_function"
+                elif "method" in node_type:
+                    function_type = "method"
+                elif "async" in node_type:
+                    function_type = "async_function"
+                elif "variable_declarator" in node_type:
+                    function_type = "const_function"
+
+                functions.append({
+                    "name": function_name,
+                    "type": function_type,
+                    "start_line": start_line,
+                    "end_line": end_line,
+                    "line_count": end_line - start_line + 1
+                })
+
+    # 라인 번호로 정렬
+    functions.sort(key=lambda x: x['start_line'])
+
+    return {
+        "functions": functions,
+        "total_count": len(functions),
+        "language": language,
+        "file_path": path,
+        "include_private": include_private
+    }
+
+
 async def handle_list_functions(arguments: Dict[str, Any]) -> Dict[str, Any]:
     """파일의 모든 함수 목록 조회"""
     analyzer, error = get_analyzer()
@@ -453,210 +694,39 @@ async def handle_list_functions(arguments: Dict[str, Any]) -> Dict[str, Any]:
         if not os.path.exists(path):
             return {"error": f"File not found: {path}"}
 
-        # 파일 읽기
-        with open(path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # 언어 결정
-        language = analyzer._get_language_from_extension(path)
-        if not language or language not in analyzer.parsers:
-            return {"error": f"Unsupported file format: {path}"}
-
-        # 파서로 구문 분석
-        parser = analyzer.parsers[language]
-        tree = parser.parse(bytes(content, "utf8"))
-
-        # 함수 검색 쿼리
-        query_text = analyzer._get_function_query(language)
-        if not query_text:
-            return {"error": f"Function listing for {language} language is not yet supported"}
-
-        query = analyzer.languages[language].query(query_text)
-        captures = query.captures(tree.root_node)
-
-        functions = []
-        processed_nodes = set()
-
-        # tree-sitter 0.24.0의 딕셔너리 형식 처리
-        if language == 'html':
-            # HTML 전용 처리
-            element_nodes = captures.get('element', [])
-            name_nodes = captures.get('name', [])
-            script_nodes = captures.get('script', [])
-            doctype_nodes = captures.get('doctype', [])
-            
-            # HTML 요소들 처리
-            for element_node in element_nodes:
-                if id(element_node) not in processed_nodes:
-                    processed_nodes.add(id(element_node))
-                    
-                    # 요소 이름 찾기
-                    element_name = "element"
-                    for name_node in name_nodes:
-                        if (element_node.start_point <= name_node.start_point <= element_node.end_point):
-                            element_name = analyzer._get_node_text(name_node, content)
-                            break
-                    
-                    start_line = element_node.start_point[0] + 1
-                    end_line = element_node.end_point[0] + 1
-                    
-                    functions.append({
-                        "name": element_name,
-                        "type": "html_element",
-                        "start_line": start_line,
-                        "end_line": end_line,
-                        "line_count": end_line - start_line + 1
-                    })
-            
-            # 스크립트 요소들 처리
-            for i, script_node in enumerate(script_nodes):
-                if id(script_node) not in processed_nodes:
-                    processed_nodes.add(id(script_node))
-                    
-                    start_line = script_node.start_point[0] + 1
-                    end_line = script_node.end_point[0] + 1
-                    
-                    functions.append({
-                        "name": f"script_{i+1}",
-                        "type": "script_element",
-                        "start_line": start_line,
-                        "end_line": end_line,
-                        "line_count": end_line - start_line + 1
-                    })
-            
-            # DOCTYPE 요소들 처리
-            for i, doctype_node in enumerate(doctype_nodes):
-                if id(doctype_node) not in processed_nodes:
-                    processed_nodes.add(id(doctype_node))
-                    
-                    start_line = doctype_node.start_point[0] + 1
-                    end_line = doctype_node.end_point[0] + 1
-                    
-                    functions.append({
-                        "name": f"doctype_{i+1}",
-                        "type": "doctype",
-                        "start_line": start_line,
-                        "end_line": end_line,
-                        "line_count": end_line - start_line + 1
-                    })
-        elif language == 'json':
-            # JSON 전용 처리
-            property_nodes = captures.get('property', [])
-            name_nodes = captures.get('name', [])
-            array_nodes = captures.get('array', [])
-            object_nodes = captures.get('object', [])
-            
-            # JSON 프로퍼티들 처리
-            for property_node in property_nodes:
-                if id(property_node) not in processed_nodes:
-                    processed_nodes.add(id(property_node))
-                    
-                    # 프로퍼티 키 이름 찾기
-                    property_name = "property"
-                    for name_node in name_nodes:
-                        if (property_node.start_point <= name_node.start_point <= property_node.end_point):
-                            property_name = analyzer._get_node_text(name_node, content)
-                            # JSON 키에서 따옴표 제거
-                            if property_name.startswith('"') and property_name.endswith('"'):
-                                property_name = property_name[1:-1]
-                            break
-                    
-                    start_line = property_node.start_point[0] + 1
-                    end_line = property_node.end_point[0] + 1
-                    
-                    functions.append({
-                        "name": property_name,
-                        "type": "json_property",
-                        "start_line": start_line,
-                        "end_line": end_line,
-                        "line_count": end_line - start_line + 1
-                    })
-            
-            # JSON 배열들 처리
-            for i, array_node in enumerate(array_nodes):
-                if id(array_node) not in processed_nodes:
-                    processed_nodes.add(id(array_node))
-                    
-                    start_line = array_node.start_point[0] + 1
-                    end_line = array_node.end_point[0] + 1
-                    
-                    functions.append({
-                        "name": f"array_{i+1}",
-                        "type": "json_array",
-                        "start_line": start_line,
-                        "end_line": end_line,
-                        "line_count": end_line - start_line + 1
-                    })
-            
-            # JSON 객체들 처리
-            for i, object_node in enumerate(object_nodes):
-                if id(object_node) not in processed_nodes:
-                    processed_nodes.add(id(object_node))
-                    
-                    start_line = object_node.start_point[0] + 1
-                    end_line = object_node.end_point[0] + 1
-                    
-                    functions.append({
-                        "name": f"object_{i+1}",
-                        "type": "json_object",
-                        "start_line": start_line,
-                        "end_line": end_line,
-                        "line_count": end_line - start_line + 1
-                    })
-        else:
-            # JavaScript/TypeScript 등 기존 처리
-            function_nodes = captures.get('function', [])
-            name_nodes = captures.get('name', [])
-
-            for func_node in function_nodes:
-                if id(func_node) not in processed_nodes:
-                    processed_nodes.add(id(func_node))
-
-                    # 함수 이름 찾기
-                    function_name = "anonymous"
-                    for name_node in name_nodes:
-                        # 이름 노드가 함수 노드 내부에 있는지 확인
-                        if (func_node.start_point <= name_node.start_point <= func_node.end_point):
-                            function_name = analyzer._get_node_text(name_node, content)
-                            break
-
-                    # private 함수 필터링 (언더스코어로 시작)
-                    if not include_private and function_name.startswith('_'):
-                        continue
-
-                    start_line = func_node.start_point[0] + 1
-                    end_line = func_node.end_point[0] + 1
-
-                    # 함수 타입 결정
-                    node_type = func_node.type
-                    function_type = "function"
-                    if "arrow" in node_type:
-                        function_type = "arrow_function"
-                    elif "method" in node_type:
-                        function_type = "method"
-                    elif "async" in node_type:
-                        function_type = "async_function"
-                    elif "variable_declarator" in node_type:
-                        function_type = "const_function"
-
-                    functions.append({
-                        "name": function_name,
-                        "type": function_type,
-                        "start_line": start_line,
-                        "end_line": end_line,
-                        "line_count": end_line - start_line + 1
-                    })
-
-        # 라인 번호로 정렬
-        functions.sort(key=lambda x: x['start_line'])
-
-        return {
-            "functions": functions,
-            "total_count": len(functions),
-            "language": language,
-            "file_path": path,
-            "include_private": include_private
-        }
+        # 페이지네이션 - 커서는 결과 오프셋과 파일 수정 시각 (파일이 바뀌면 커서 무효)
+        paginated = is_paginated(arguments)
+        if paginated:
+            limit = get_page_limit(arguments, default=config.PAGINATION_DEFAULT_LIMIT)
+            mtime_ns = os.stat(path).st_mtime_ns
+            position = decode_cursor("list_functions", arguments) or {"offset": 0, "mtime_ns": mtime_ns}
+            if position.get("mtime_ns") != mtime_ns:
+                return {"error": "File changed since the cursor was issued; list again without a cursor"}
+            offset = position.get("offset", 0)
+
+        # 분석 결과는 파일이 바뀌지 않는 한 캐시 (페이지를 넘기거나 다른 워커가 다시 요청해도 재파싱하지 않음)
+        cache_key = "private" if include_private else "public"
+        result = shared_cache.get("list_functions", path, extra_key=cache_key)
+        if result is None:
+            validator = file_validator(path)
+            result = _collect_functions(analyzer, path, include_private)
+            if "error" in result:
+                return result
+            shared_cache.set("list_functions", path, result, extra_key=cache_key, validator=validator)
+
+        result = dict(result)
+        functions = result["functions"]
+
+        if paginated:
+            end = offset + limit
+            result["functions"] = functions[offset:end]
+            result["offset"] = offset
+            result["next_cursor"] = (
+                encode_cursor("list_functions", arguments, {"offset": end, "mtime_ns": mtime_ns})
+                if end < len(functions) else None
+            )
+
+        return result
 
     except Exception as e:
         return {"error": f"Error occurred during function listing: {str(e)}"}
@@ -3,76 +3,288 @@
 경로 정규화, 파일 인코딩 감지 등
 """
 
+import codecs
 import os
 import pathlib
-import sys
-
-# Windows 호환성
-try:
-    import chardet
-
-    print("[DEBUG] chardet imported successfully", file=sys.stderr)
-except ImportError:
-    chardet = None
-    print("[DEBUG] chardet not available", file=sys.stderr)
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from server_logging import get_logger
+from shared_cache import shared_cache
+from tracing import span
+
+logger = get_logger("utils")
+
+# chardet은 첫 인코딩 감지 시점에 로드 (서버 시작 시간 단축)
+_chardet = None
+_chardet_loaded = False
+
+
+def _get_chardet():
+    """chardet 모듈 반환 (설치되지 않았으면 None)"""
+    global _chardet, _chardet_loaded
+    if not _chardet_loaded:
+        try:
+            import chardet
+            _chardet = chardet
+            logger.debug("chardet imported successfully")
+        except ImportError:
+            logger.debug("chardet not available")
+        _chardet_loaded = True
+    return _chardet
 
 # 설정 import
 try:
-    from config import ALLOWED_DIRECTORIES
+    from config import ALLOWED_DIRECTORIES, PATH_CACHE_ENTRIES
 
-    print(f"[DEBUG] Config loaded: {ALLOWED_DIRECTORIES}", file=sys.stderr)
+    logger.debug(f"Config loaded: {ALLOWED_DIRECTORIES}")
 except ImportError:
     ALLOWED_DIRECTORIES = [
         "C:\\",
     ]
-    print(f"[DEBUG] Using default config", file=sys.stderr)
+    PATH_CACHE_ENTRIES = 4096
+    logger.debug("Using default config")
 
 
-def normalize_path(requested_path: str) -> pathlib.Path:
-    """경로 정규화 및 권한 확인"""
-    try:
-        requested = pathlib.Path(os.path.expanduser(requested_path)).resolve()
+_SEPARATORS = os.sep + (os.altsep or "")
+_SEPARATOR_CLASS = "[" + re.escape(_SEPARATORS) + "]"
+_SEPARATOR_PATTERN = re.compile(_SEPARATOR_CLASS)
+
+
+class _AllowedDirectoryMatcher:
+    """
+    허용 디렉토리 접두사 검사 - ALLOWED_DIRECTORIES를 정규식 하나로 미리 컴파일
+
+    경로 구성 요소 경계를 지키므로 /work/project가 허용되어도 /work/project-old는 허용되지 않는다.
+    대소문자는 기존처럼 구분하지 않는다.
+    """
+
+    def __init__(self, allowed_directories: Tuple[str, ...]):
+        self.allowed_directories = allowed_directories
+        # 긴 접두사부터 시도하고, 끝 구분자는 떼어 "/"나 "C:\\" 같은 루트도 같은 규칙으로 처리
+        prefixes = sorted({d.rstrip(_SEPARATORS) for d in allowed_directories}, key=len, reverse=True)
+        self._pattern = re.compile(
+            "(" + "|".join(re.escape(prefix) for prefix in prefixes) + ")(?:" + _SEPARATOR_CLASS + "|$)",
+            re.IGNORECASE,
+        ) if prefixes else None
 
-        if os.name == 'nt' and len(str(requested)) > 260:
-            raise ValueError(f"Path too long for Windows: {len(str(requested))} characters")
+    def match(self, path: str) -> Optional[str]:
+        """path가 속한 허용 디렉토리 부분 (path의 표기 그대로, 허용되지 않으면 None)"""
+        if self._pattern is None:
+            return None
+        found = self._pattern.match(path)
+        return found.group(1) if found else None
 
-        for allowed in ALLOWED_DIRECTORIES:
-            if str(requested).lower().startswith(allowed.lower()):
-                return requested
 
-        raise PermissionError(f"Access denied: {requested} not in allowed directories")
+class _ResolvedPathCache:
+    """
+    심볼릭 링크가 없던 경로의 정규화 결과 LRU
+
+    항목마다 허용 디렉토리의 부모부터 마지막 구성 요소의 부모까지 각 디렉토리의 mtime을 기억하고,
+    꺼낼 때 다시 비교한다. 구성 요소를 심볼릭 링크로 바꾸거나 지우거나 이름을 바꾸면 그 부모 디렉토리의
+    mtime이 바뀌므로 항목이 무효화된다. 해석 과정에 심볼릭 링크가 있었던 경로는 기억하지 않는다.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[pathlib.Path, Tuple[str, ...], Tuple[Optional[int], ...]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _watched_directories(path: str, allowed_prefix: str) -> Tuple[str, ...]:
+        """허용 디렉토리의 부모부터 path의 부모까지"""
+        if not os.path.splitdrive(allowed_prefix)[1]:
+            # 허용 디렉토리가 "/"나 "C:\\" 같은 루트인 경우 (매처는 끝 구분자를 뗀 ""/"C:"를 반환)
+            allowed_prefix += os.sep
+        directories = [os.path.dirname(allowed_prefix) or allowed_prefix]
+        current = allowed_prefix
+        for part in _SEPARATOR_PATTERN.split(path[len(allowed_prefix):])[:-1]:
+            if part:
+                current = os.path.join(current, part)
+                directories.append(current)
+        return tuple(directories)
+
+    @staticmethod
+    def _mtimes(directories: Tuple[str, ...]) -> Tuple[Optional[int], ...]:
+        mtimes = []
+        for directory in directories:
+            try:
+                mtimes.append(os.stat(directory).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def get(self, key: str) -> Optional[pathlib.Path]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        resolved, directories, mtimes = entry
+        if self._mtimes(directories) != mtimes:
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return resolved
+
+    def set(self, key: str, resolved: pathlib.Path, allowed_prefix: str) -> None:
+        directories = self._watched_directories(str(resolved), allowed_prefix)
+        entry = (resolved, directories, self._mtimes(directories))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_matcher = _AllowedDirectoryMatcher(tuple(ALLOWED_DIRECTORIES))
+_resolved_paths = _ResolvedPathCache(PATH_CACHE_ENTRIES)
+
+
+def _get_matcher() -> _AllowedDirectoryMatcher:
+    """현재 ALLOWED_DIRECTORIES의 매처 (목록이 바뀌면 다시 컴파일하고 경로 캐시를 비움)"""
+    global _matcher
+    allowed_directories = tuple(ALLOWED_DIRECTORIES)
+    if allowed_directories != _matcher.allowed_directories:
+        _matcher = _AllowedDirectoryMatcher(allowed_directories)
+        _resolved_paths.clear()
+    return _matcher
+
+
+def normalize_path(requested_path: str) -> pathlib.Path:
+    """경로 정규화 및 권한 확인 (심볼릭 링크가 없는 절대 경로는 바뀌지 않았는지만 확인하고 재사용)"""
+    try:
+        with span("normalize_path"):
+            matcher = _get_matcher()
+            expanded = os.path.expanduser(requested_path)
+            cacheable = PATH_CACHE_ENTRIES > 0 and os.path.isabs(expanded)
+            if cacheable:
+                cached = _resolved_paths.get(expanded)
+                if cached is not None:
+                    return cached
+
+            requested = pathlib.Path(expanded).resolve()
+            requested_str = str(requested)
+
+            if os.name == 'nt' and len(requested_str) > 260:
+                raise ValueError(f"Path too long for Windows: {len(requested_str)} characters")
+
+            allowed_prefix = matcher.match(requested_str)
+            if allowed_prefix is None:
+                raise PermissionError(f"Access denied: {requested} not in allowed directories")
+
+            # resolve 결과가 입력과 같으면 해석 과정에 심볼릭 링크가 없었던 것
+            if cacheable and requested_str == os.path.normpath(expanded):
+                _resolved_paths.set(expanded, requested, allowed_prefix)
+            return requested
     except Exception as e:
-        print(f"[DEBUG] Path error: {e}", file=sys.stderr)
+        logger.debug("Path error: %s", e)
         raise
 
 
+# 수정한 지 이 시간(나노초)이 안 된 파일은 인코딩 감지 결과를 캐시하지 않음
+# mtime 해상도가 거친 파일 시스템(FAT 2초, 커널 타임스탬프 틱 등)에서는 같은 크기로 다시 써도 mtime이 같을 수 있음
+_RACY_MTIME_NS = 2_000_000_000
+
+
 def detect_file_encoding(file_path: pathlib.Path) -> str:
-    """파일 인코딩 감지"""
-    if not chardet:
+    """
+    파일 인코딩 감지 (파일이 바뀌지 않았으면 캐시된 결과 사용)
+
+    캐시는 경로가 아니라 (st_dev, st_ino)로 찾고 (st_mtime_ns, st_size)로 검증하므로
+    이름만 바뀐 파일도 다시 감지하지 않는다. 방금 수정한 파일은 같은 타임스탬프 안에서 같은 크기로
+    다시 쓰이면 검증 값이 그대로이므로 _RACY_MTIME_NS가 지날 때까지 결과를 캐시하지 않는다.
+    """
+    with span("detect_encoding") as encoding_span:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            # 파일이 없으면 호출한 쪽의 open()이 알맞은 오류를 낸다
+            return "utf-8"
+        # inode 번호가 없는 파일 시스템(st_ino == 0)에서는 경로로 찾음
+        file_id = f"{stat.st_dev}:{stat.st_ino}" if stat.st_ino else os.fspath(file_path)
+        validator = (stat.st_mtime_ns, stat.st_size)
+        encoding = shared_cache.get("encoding", file_id, validator=validator)
+        if encoding is None:
+            encoding = _detect_file_encoding(file_path)
+            if time.time_ns() - stat.st_mtime_ns >= _RACY_MTIME_NS:
+                shared_cache.set("encoding", file_id, encoding, validator=validator)
+        encoding_span.set_attribute("encoding", encoding)
+        return encoding
+
+
+# 인코딩 감지에 읽는 파일 앞부분 크기 (바이트)
+_ENCODING_SAMPLE_BYTES = 8192
+
+
+def _detect_utf8(raw_data: bytes, complete: bool) -> Optional[str]:
+    """
+    ASCII/엄격한 UTF-8 검사 - 통과하면 "utf-8" (BOM이 있으면 "utf-8-sig"), 아니면 None
+
+    complete가 False면 (파일 중간에서 잘린 조각) 끝에서 잘린 멀티바이트 문자는 오류로 보지 않는다.
+    NUL 바이트가 있으면 UTF-16/바이너리일 수 있으므로 chardet에 맡긴다.
+    """
+    if b"\x00" in raw_data:
+        return None
+    if raw_data.isascii():
         return "utf-8"
+    encoding = "utf-8"
+    if raw_data.startswith(codecs.BOM_UTF8):
+        raw_data = raw_data[len(codecs.BOM_UTF8):]
+        encoding = "utf-8-sig"
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(raw_data, final=complete)
+    except UnicodeDecodeError:
+        return None
+    return encoding
+
 
+def _detect_file_encoding(file_path: pathlib.Path) -> str:
+    """파일 앞부분으로 인코딩 추정 (ASCII/UTF-8로 읽히면 chardet 없이 결정)"""
     try:
         with file_path.open("rb") as f:
-            raw_data = f.read(8192)
-            if not raw_data:
-                return "utf-8"
+            raw_data = f.read(_ENCODING_SAMPLE_BYTES)
+    except Exception:
+        return "utf-8"
+    if not raw_data:
+        return "utf-8"
+
+    encoding = _detect_utf8(raw_data, complete=len(raw_data) < _ENCODING_SAMPLE_BYTES)
+    if encoding:
+        return encoding
 
+    chardet = _get_chardet()
+    if not chardet:
+        return "utf-8"
+
+    try:
+        # 캐시에 없고 UTF-8도 아닐 때만 기록됨 (detect_encoding 아래의 chardet span 유무로 확인)
+        with span("chardet.detect", bytes=len(raw_data)):
             detected = chardet.detect(raw_data)
-            encoding = detected.get('encoding', 'utf-8')
-            confidence = detected.get('confidence', 0)
-
-            if confidence < 0.7 or not encoding:
-                common_encodings = ['utf-8', 'cp949', 'euc-kr', 'cp1252', 'latin1']
-                for enc in common_encodings:
-                    try:
-                        with file_path.open("r", encoding=enc) as test_f:
-                            test_f.read(1024)
-                        return enc
-                    except (UnicodeDecodeError, LookupError):
-                        continue
-                return "utf-8"
-
-            return encoding
+        encoding = detected.get('encoding', 'utf-8')
+        confidence = detected.get('confidence', 0)
+
+        if confidence < 0.7 or not encoding:
+            common_encodings = ['utf-8', 'cp949', 'euc-kr', 'cp1252', 'latin1']
+            for enc in common_encodings:
+                try:
+                    with file_path.open("r", encoding=enc) as test_f:
+                        test_f.read(1024)
+                    return enc
+                except (UnicodeDecodeError, LookupError):
+                    continue
+            return "utf-8"
+
+        return encoding
     except Exception:
         return "utf-8"
 
@@ -80,39 +292,139 @@ def detect_file_encoding(file_path: pathlib.Path) -> str:
 # ==================== 새로운 공통 유틸리티 함수들 ====================
 
 import json
-from typing import List, Dict, Any, Type, Optional
+import threading
+from typing import List, Dict, Any, Type, Optional, Callable
 from pydantic import BaseModel, Field, create_model
 
 
-def load_tools_json() -> List[Dict[str, Any]]:
-    """
-    tools.json 파일에서 도구 정의를 로드하여 딕셔너리 리스트로 반환
-    mcp_server.py의 get_tool_definitions() 로직을 재사용하여 일관성 확보
-    """
-    try:
-        # 현재 스크립트와 같은 디렉토리의 상위 디렉토리에 있는 tools.json 파일 경로
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        parent_dir = os.path.dirname(current_dir)
-        tools_json_path = os.path.join(parent_dir, 'tools.json')
+# tools.json 경로 (tools/ 의 상위 디렉토리)
+TOOLS_JSON_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tools.json')
+
 
-        # JSON 파일 읽기
+def _read_tools_json(tools_json_path: str) -> List[Dict[str, Any]]:
+    """tools.json 파일을 읽어 도구 정의 리스트 반환 (실패 시 빈 리스트)"""
+    try:
         with open(tools_json_path, 'r', encoding='utf-8') as f:
             tools_data = json.load(f)
 
-        print(f"[DEBUG] Loaded {len(tools_data)} tools from tools.json", file=sys.stderr)
+        logger.debug(f"Loaded {len(tools_data)} tools from tools.json")
         return tools_data
 
     except FileNotFoundError:
-        print(f"[ERROR] tools.json file not found at {tools_json_path}", file=sys.stderr)
+        logger.error(f"tools.json file not found at {tools_json_path}")
         return []
     except json.JSONDecodeError as e:
-        print(f"[ERROR] Invalid JSON in tools.json: {e}", file=sys.stderr)
+        logger.error(f"Invalid JSON in tools.json: {e}")
         return []
     except Exception as e:
-        print(f"[ERROR] Error loading tools from JSON: {e}", file=sys.stderr)
+        logger.error(f"Error loading tools from JSON: {e}")
         return []
 
 
+# 모든 도구가 공통으로 받는 인자 (디스패처가 처리하고 핸들러에는 전달하지 않음)
+COMMON_TOOL_PROPERTIES = {
+    "timeout_seconds": {
+        "type": "number",
+        "description": "Per-call timeout in seconds (overrides the tool's default timeout, 0 disables it)"
+    }
+}
+
+
+def _add_common_properties(tools_data: List[Dict[str, Any]]) -> None:
+    """각 도구의 inputSchema에 공통 인자 추가 (tools.json에 이미 정의된 인자는 유지)"""
+    for tool in tools_data:
+        properties = tool.setdefault('inputSchema', {}).setdefault('properties', {})
+        for name, schema in COMMON_TOOL_PROPERTIES.items():
+            properties.setdefault(name, dict(schema))
+
+
+class ToolDefinitionRegistry:
+    """
+    tools.json 파싱 결과와 파생 객체(MCP Tool 목록, Pydantic 요청 모델)를 보관하는 캐시
+
+    파일의 mtime이 바뀐 경우에만 다시 읽으므로 /health, list_tools 같은
+    반복 호출은 stat 한 번의 비용만 든다.
+    """
+
+    def __init__(self, tools_json_path: str):
+        self.tools_json_path = tools_json_path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._mtime_ns: Optional[int] = None
+        self._tools: List[Dict[str, Any]] = []
+        self._tool_names: List[str] = []
+        self._derived: Dict[str, Any] = {}
+        self._models: Dict[str, Type[BaseModel]] = {}
+
+    def _refresh(self) -> None:
+        """파일 mtime이 바뀌었으면 다시 로드하고 파생 캐시 비우기"""
+        try:
+            mtime_ns = os.stat(self.tools_json_path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+
+        if self._loaded and mtime_ns == self._mtime_ns:
+            return
+
+        with self._lock:
+            if self._loaded and mtime_ns == self._mtime_ns:
+                return
+            tools_data = _read_tools_json(self.tools_json_path)
+            _add_common_properties(tools_data)
+            self._tools = tools_data
+            self._tool_names = [tool['name'] for tool in tools_data]
+            self._derived = {}
+            self._models = {}
+            self._mtime_ns = mtime_ns
+            self._loaded = True
+
+    def get_tools(self) -> List[Dict[str, Any]]:
+        """도구 정의 리스트 반환 (호출자는 수정하지 않아야 함)"""
+        self._refresh()
+        return self._tools
+
+    def get_tool_names(self) -> List[str]:
+        """도구 이름 리스트 반환"""
+        self._refresh()
+        return self._tool_names
+
+    def get_derived(self, key: str, factory: Callable[[List[Dict[str, Any]]], Any]) -> Any:
+        """
+        도구 정의로부터 만든 파생 객체를 캐시하여 반환 (예: MCP types.Tool 목록)
+
+        Args:
+            key: 캐시 키
+            factory: 도구 정의 리스트를 받아 파생 객체를 만드는 함수
+        """
+        self._refresh()
+        derived = self._derived.get(key)
+        if derived is None:
+            derived = factory(self._tools)
+            self._derived[key] = derived
+        return derived
+
+    def get_request_model(self, tool_name: str, input_schema: Dict[str, Any]) -> Type[BaseModel]:
+        """도구의 Pydantic 요청 모델 반환 (한 번만 생성)"""
+        self._refresh()
+        model = self._models.get(tool_name)
+        if model is None:
+            model = create_pydantic_model(tool_name, input_schema)
+            self._models[tool_name] = model
+        return model
+
+
+# 전역 도구 정의 레지스트리
+tool_definitions = ToolDefinitionRegistry(TOOLS_JSON_PATH)
+
+
+def load_tools_json() -> List[Dict[str, Any]]:
+    """
+    tools.json 파일에서 도구 정의를 로드하여 딕셔너리 리스트로 반환
+    파일이 바뀌지 않았다면 캐시된 결과를 그대로 반환
+    """
+    return tool_definitions.get_tools()
+
+
 def create_pydantic_model(tool_name: str, input_schema: Dict[str, Any]) -> Type[BaseModel]:
     """
     tools.json의 inputSchema를 기반으로 Pydantic 모델을 동적 생성
@@ -156,7 +468,7 @@ def create_pydantic_model(tool_name: str, input_schema: Dict[str, Any]) -> Type[
         return create_model(model_name, **fields)
 
     except Exception as e:
-        print(f"[ERROR] Error creating Pydantic model for {tool_name}: {e}", file=sys.stderr)
+        logger.error(f"Error creating Pydantic model for {tool_name}: {e}")
         # 기본 모델 반환
         return create_model(f"{tool_name}Request", **{})
 
@@ -1,77 +1,79 @@
 """
 모든 도구들을 통합하는 레지스트리 - Git 도구 개선 포함
+도구 모듈은 해당 도구가 처음 호출될 때 import 된다 (GitPython, tree-sitter 등 지연 로드)
 """
 
-from tools.git_tools import *
-from tools.text_processor import *
-from tools.file_metadata import *
-from tools.advanced_text_processor import *
-from tools.directory_manager import *
-from tools.file_io import *
-from tools.file_search import *
-from tools.tree_sitter_analyzer import *
-
-# 도구 핸들러 매핑 - 기존 + 새로운 Git 도구들
-TOOL_HANDLERS = {
+import importlib
+import threading
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+import config
+from server_logging import get_logger
+
+logger = get_logger("registry")
+
+# 도구 핸들러 위치 - 도구 이름: (모듈, 핸들러 함수 이름)
+TOOL_HANDLER_SPECS: Dict[str, Tuple[str, str]] = {
     # 기본 파일 I/O
-    "read_file": handle_read_file,
-    "write_file": handle_write_file,
-    "copy_file": handle_copy_file,
-    "move_file": handle_move_file,
-    "delete_file": handle_delete_file,
-    "backup_file": handle_backup_file,
-    "backup_files": handle_backup_files,
+    "read_file": ("tools.file_io", "handle_read_file"),
+    "write_file": ("tools.file_io", "handle_write_file"),
+    "copy_file": ("tools.file_io", "handle_copy_file"),
+    "move_file": ("tools.file_io", "handle_move_file"),
+    "delete_file": ("tools.file_io", "handle_delete_file"),
+    "backup_file": ("tools.file_io", "handle_backup_file"),
+    "backup_files": ("tools.file_io", "handle_backup_files"),
 
     # 디렉토리 관리
-    "list_directory": handle_list_directory,
-    "create_directory": handle_create_directory,
-    "create_directories": handle_create_directories,
-    "list_allowed_directories": handle_list_allowed_directories,
-    "count_files": handle_count_files,
-    "get_directory_size": handle_get_directory_size,
-    "get_recent_files": handle_get_recent_files,
-    "analyze_project": handle_analyze_project,
+    "list_directory": ("tools.directory_manager", "handle_list_directory"),
+    "create_directory": ("tools.directory_manager", "handle_create_directory"),
+    "create_directories": ("tools.directory_manager", "handle_create_directories"),
+    "list_allowed_directories": ("tools.directory_manager", "handle_list_allowed_directories"),
+    "count_files": ("tools.directory_manager", "handle_count_files"),
+    "get_directory_size": ("tools.directory_manager", "handle_get_directory_size"),
+    "get_recent_files": ("tools.directory_manager", "handle_get_recent_files"),
+    "analyze_project": ("tools.directory_manager", "handle_analyze_project"),
 
     # 🆕 Git 도구들 (GitPython 기반)
-    "git_status": handle_git_status,
-    "git_add": handle_git_add,
-    "git_commit": handle_git_commit,
-    "git_push": handle_git_push,
-    "git_pull": handle_git_pull,
-    "git_clone": handle_git_clone,
-    "git_branch": handle_git_branch,
-    "git_log": handle_git_log,
-    "git_init": handle_git_init,
+    "git_status": ("tools.git_tools", "handle_git_status"),
+    "git_add": ("tools.git_tools", "handle_git_add"),
+    "git_commit": ("tools.git_tools", "handle_git_commit"),
+    "git_push": ("tools.git_tools", "handle_git_push"),
+    "git_pull": ("tools.git_tools", "handle_git_pull"),
+    "git_clone": ("tools.git_tools", "handle_git_clone"),
+    "git_branch": ("tools.git_tools", "handle_git_branch"),
+    "git_log": ("tools.git_tools", "handle_git_log"),
+    "git_init": ("tools.git_tools", "handle_git_init"),
 
     # 기본 텍스트 처리
-    "append_to_file": handle_append_to_file,
-    "get_file_section": handle_get_file_section,
-    "count_occurrences": handle_count_occurrences,
+    "append_to_file": ("tools.text_processor", "handle_append_to_file"),
+    "get_file_section": ("tools.text_processor", "handle_get_file_section"),
+    "count_occurrences": ("tools.text_processor", "handle_count_occurrences"),
 
     # 파일 메타데이터
-    "file_exists": handle_file_exists,
-    "files_exist": handle_files_exist,
-    "file_info": handle_file_info,
+    "file_exists": ("tools.file_metadata", "handle_file_exists"),
+    "files_exist": ("tools.file_metadata", "handle_files_exist"),
+    "file_info": ("tools.file_metadata", "handle_file_info"),
 
     # 🆕 고급 편집 도구들
-    "replace_line_range": handle_replace_line_range,
-    "delete_lines": handle_delete_lines,
-    "regex_replace": handle_regex_replace,
-    "insert_at_position": handle_insert_at_position,
-    "patch_apply": handle_patch_apply,
-    "smart_indent": handle_smart_indent,
+    "replace_line_range": ("tools.advanced_text_processor", "handle_replace_line_range"),
+    "delete_lines": ("tools.advanced_text_processor", "handle_delete_lines"),
+    "regex_replace": ("tools.advanced_text_processor", "handle_regex_replace"),
+    "insert_at_position": ("tools.advanced_text_processor", "handle_insert_at_position"),
+    "patch_apply": ("tools.advanced_text_processor", "handle_patch_apply"),
+    "smart_indent": ("tools.advanced_text_processor", "handle_smart_indent"),
 
     # 🔍 파일 검색 도구들
-    "search_in_file": handle_search_in_file,
-    "search_in_directory": handle_search_in_directory,
-    "regex_search": handle_regex_search,
+    "search_in_file": ("tools.file_search", "handle_search_in_file"),
+    "search_in_directory": ("tools.file_search", "handle_search_in_directory"),
+    "regex_search": ("tools.file_search", "handle_regex_search"),
 
 
     # 🆕 Tree-sitter 기반 함수 분석 도구들
-    "find_function": handle_find_function,
-    "list_functions": handle_list_functions,
-    "extract_function": handle_extract_function,
-    "get_function_info": handle_get_function_info,
+    "find_function": ("tools.tree_sitter_analyzer", "handle_find_function"),
+    "list_functions": ("tools.tree_sitter_analyzer", "handle_list_functions"),
+    "extract_function": ("tools.tree_sitter_analyzer", "handle_extract_function"),
+    "get_function_info": ("tools.tree_sitter_analyzer", "handle_get_function_info"),
 }
 
 # 도구 카테고리별 분류
@@ -97,7 +99,6 @@ TOOL_CATEGORIES = {
     ],
     "metadata": [
         "file_exists", "files_exist", "file_info"
-        "file_exists", "file_info"
     ],
     "search": [
         "search_in_file", "search_in_directory", "regex_search"
@@ -108,6 +109,95 @@ TOOL_CATEGORIES = {
 }
 
 
+# 파일 시스템/저장소를 바꾸지 않는 읽기 전용 도구
+# (동시에 들어온 같은 호출은 디스패처에서 한 번만 실행, MCP 도구 정의에 readOnlyHint로도 노출)
+READ_ONLY_TOOLS = frozenset({
+    # 파일/디렉토리 조회
+    "read_file", "list_directory", "list_allowed_directories", "count_files",
+    "get_directory_size", "get_recent_files", "analyze_project",
+    # Git 조회 (git_branch는 create/checkout/delete가 있으므로 제외)
+    "git_status", "git_log",
+    # 텍스트/메타데이터 조회
+    "get_file_section", "count_occurrences", "file_exists", "files_exist", "file_info",
+    # 검색
+    "search_in_file", "search_in_directory", "regex_search",
+    # 함수 분석
+    "find_function", "list_functions", "extract_function", "get_function_info",
+})
+
+
+def is_read_only_tool(tool_name: str) -> bool:
+    """읽기 전용 도구인지 확인 (목록에 없는 도구는 변경 가능한 것으로 취급)"""
+    return tool_name in READ_ONLY_TOOLS
+
+
+def get_tool_category(tool_name: str) -> str:
+    """도구가 속한 카테고리 반환 (미분류 도구는 "tools")"""
+    for category, tools in TOOL_CATEGORIES.items():
+        if tool_name in tools:
+            return category
+    return "tools"
+
+
+class LazyToolHandlers(Mapping):
+    """
+    도구 이름 → 핸들러 매핑 (읽기 전용)
+
+    핸들러가 들어 있는 모듈은 첫 조회 시점에 import 하고 이후에는 캐시된 함수를 반환한다.
+    enabled_categories가 주어지면 해당 카테고리의 도구만 노출한다.
+    """
+
+    def __init__(self, specs: Dict[str, Tuple[str, str]], enabled_categories=None):
+        if enabled_categories is None:
+            self._specs = dict(specs)
+        else:
+            enabled = set(enabled_categories)
+            self._specs = {
+                name: spec for name, spec in specs.items()
+                if get_tool_category(name) in enabled
+            }
+        self._resolved: Dict[str, Callable] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, tool_name: str) -> Callable:
+        handler = self._resolved.get(tool_name)
+        if handler is not None:
+            return handler
+
+        module_name, func_name = self._specs[tool_name]
+        with self._lock:
+            handler = self._resolved.get(tool_name)
+            if handler is None:
+                logger.debug("Loading %s for tool %s", module_name, tool_name)
+                module = importlib.import_module(module_name)
+                handler = getattr(module, func_name)
+                self._resolved[tool_name] = handler
+        return handler
+
+    def __contains__(self, tool_name: object) -> bool:
+        return tool_name in self._specs
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._specs)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def get_module_name(self, tool_name: str) -> Optional[str]:
+        """도구 핸들러가 들어 있는 모듈 이름 반환 (import 하지 않음)"""
+        spec = self._specs.get(tool_name)
+        return spec[0] if spec else None
+
+    def preload(self) -> None:
+        """노출된 모든 도구의 모듈을 미리 import"""
+        for tool_name in self._specs:
+            self[tool_name]
+
+
+# 도구 핸들러 매핑 - config.ENABLED_TOOL_CATEGORIES가 None이면 모든 카테고리 사용
+TOOL_HANDLERS = LazyToolHandlers(TOOL_HANDLER_SPECS, config.ENABLED_TOOL_CATEGORIES)
+
+
 def get_tools_by_category(category: str):
     """카테고리별 도구 목록 반환"""
     return TOOL_CATEGORIES.get(category, [])
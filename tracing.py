@@ -0,0 +1,339 @@
+"""
+도구 실행 경로 추적 (tracing)
+호출마다 trace ID를 만들고 경로 정규화, 인코딩 감지, 파일 읽기, 정규식 매칭, 결과 변환 같은 단계를
+중첩 span으로 기록한다. ID 형식(16바이트 trace ID, 8바이트 span ID)과 내보내기 형식(OTLP JSON)은
+OpenTelemetry를 따르므로 내보낸 파일을 OpenTelemetry Collector의 otlpjsonfile receiver 등으로 그대로 읽을 수 있다.
+
+config.TRACING_ENABLED가 False이거나 진행 중인 trace가 없으면 span()은 아무것도 기록하지 않는
+공용 객체를 반환하므로 경로 정규화처럼 자주 불리는 함수에 넣어도 비용이 거의 없다.
+"""
+
+import atexit
+import contextvars
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import config
+from server_logging import get_logger
+
+logger = get_logger("tracing")
+
+# OTLP span kind / status code
+_SPAN_KIND_INTERNAL = 1
+_SPAN_KIND_SERVER = 2
+_STATUS_CODE_ERROR = 2
+
+# 현재 span (asyncio 태스크는 생성 시점의 값을 물려받고, 워커 스레드는 set_current_span()으로 연결)
+_current_span: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("nexus_current_span", default=None)
+
+
+class _Trace:
+    """trace 하나에 속한 완료된 span들 (여러 스레드에서 추가됨)"""
+
+    __slots__ = ("trace_id", "spans", "lock", "exported", "dropped")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List[Dict[str, Any]] = []
+        self.lock = threading.Lock()
+        self.exported = False
+        self.dropped = 0
+
+    def add(self, spans: List[Dict[str, Any]]) -> None:
+        with self.lock:
+            if self.exported:
+                # 루트가 끝난 뒤 완료된 span(타임아웃 후 늦게 멈춘 워커 등)은 버림
+                return
+            room = config.TRACING_MAX_SPANS - len(self.spans)
+            if len(spans) > room:
+                # 파일 수천 개를 검색하는 호출 등 - 앞쪽 span만 남기고 버린 개수를 루트에 기록
+                self.dropped += len(spans) - max(room, 0)
+                spans = spans[:max(room, 0)]
+            self.spans.extend(spans)
+
+
+class Span:
+    """
+    시간 구간 하나 (with 블록으로 사용)
+
+    블록 안에서 만든 span은 이 span의 자식이 되고, 루트 span이 끝나면 trace 전체를 내보낸다.
+    """
+
+    __slots__ = ("name", "trace", "span_id", "parent_id", "start_ns", "attributes", "error", "_token")
+
+    def __init__(self, name: str, trace: _Trace, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = 0
+        self.error: Optional[str] = None
+        self._token = None
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        """블록 안에서 처리한 오류를 span 상태로 기록 (예외가 블록 밖으로 나가면 자동 기록)"""
+        self.error = message
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        end_ns = time.time_ns()
+        if exc_type is not None and exc_type is not GeneratorExit:
+            self.error = f"{exc_type.__name__}: {exc}"
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # 다른 컨텍스트에서 끝난 경우 (비동기 생성기 정리 등)
+            _current_span.set(None)
+        if self.parent_id is None:
+            _export_trace(self.trace, self, end_ns)
+        else:
+            self.trace.add([self._to_otlp(end_ns)])
+        return False
+
+    def _to_otlp(self, end_ns: int) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": _SPAN_KIND_SERVER if self.parent_id is None else _SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": _STATUS_CODE_ERROR, "message": self.error} if self.error else {},
+        }
+        if self.parent_id is not None:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    """추적하지 않을 때 span() 대신 반환하는 공용 객체"""
+
+    __slots__ = ()
+    trace_id = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    """OTLP JSON AnyValue 형식 속성"""
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def start_trace(name: str, **attributes: Any):
+    """
+    호출 하나의 루트 span 시작 (with 블록, 끝나면 trace를 내보냄)
+
+    이미 진행 중인 trace가 있으면 (배치 안의 개별 호출 등) 그 trace의 자식 span을 만든다.
+    추적이 꺼져 있으면 trace_id가 None인 빈 span을 반환한다.
+    """
+    if not config.TRACING_ENABLED:
+        return _NOOP_SPAN
+    parent = _current_span.get()
+    if parent is not None:
+        return Span(name, parent.trace, parent.span_id, attributes)
+    return Span(name, _Trace(secrets.token_hex(16)), None, attributes)
+
+
+def span(name: str, **attributes: Any):
+    """진행 중인 trace에 자식 span 추가 (with 블록, trace가 없으면 아무것도 기록하지 않음)"""
+    parent = _current_span.get()
+    if parent is None:
+        return _NOOP_SPAN
+    return Span(name, parent.trace, parent.span_id, attributes)
+
+
+def get_current_span() -> Optional[Span]:
+    """현재 span 반환 (추적 중이 아니면 None) - 워커 스레드에 넘길 때 사용"""
+    return _current_span.get()
+
+
+def set_current_span(current: Optional[Span]) -> None:
+    """워커 스레드에 호출한 쪽의 span 연결 (None이면 해제)"""
+    _current_span.set(current)
+
+
+def get_trace_id() -> Optional[str]:
+    """현재 호출의 trace ID (추적 중이 아니면 None)"""
+    current = _current_span.get()
+    return current.trace_id if current is not None else None
+
+
+# ==================== 프로세스 간 전달 ====================
+
+def export_context() -> Optional[Tuple[str, str]]:
+    """다른 프로세스로 넘길 (trace ID, 부모 span ID) - 추적 중이 아니면 None"""
+    current = _current_span.get()
+    if current is None:
+        return None
+    return current.trace_id, current.span_id
+
+
+def run_with_remote_parent(context: Optional[Tuple[str, str]], func, *args) -> Tuple[Any, List[Dict[str, Any]]]:
+    """
+    다른 프로세스가 넘긴 trace 문맥 아래에서 func 실행 (프로세스 풀 워커 쪽)
+
+    Returns:
+        (func 결과, 이 프로세스에서 완료된 span 목록) - span은 부모 프로세스가 import_spans()로 합친다
+    """
+    if context is None:
+        return func(*args), []
+    trace_id, parent_id = context
+    remote_parent = Span("remote", _Trace(trace_id), None, {})
+    remote_parent.span_id = parent_id
+    token = _current_span.set(remote_parent)
+    try:
+        return func(*args), remote_parent.trace.spans
+    finally:
+        _current_span.reset(token)
+
+
+def import_spans(spans: List[Dict[str, Any]]) -> None:
+    """다른 프로세스에서 완료된 span을 현재 trace에 추가"""
+    current = _current_span.get()
+    if current is not None and spans:
+        current.trace.add(spans)
+
+
+# ==================== 내보내기 ====================
+
+class _TraceWriter:
+    """
+    완료된 trace를 대기열로 받아 파일에 쓰는 백그라운드 스레드
+
+    루트 span은 이벤트 루프에서 끝나는 경우가 많으므로 JSON 직렬화와 파일 쓰기는 이 스레드가 맡는다.
+    대기열(config.TRACING_QUEUE_SIZE)이 가득 차면 새 trace는 버리고 개수만 센다.
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue[Optional[Tuple[str, Dict[str, Any]]]]" = queue.Queue(config.TRACING_QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self._path: Optional[str] = None
+        self.dropped = 0
+
+    def submit(self, path: str, record: Dict[str, Any]) -> None:
+        """trace 레코드를 쓰기 대기열에 추가 (막히지 않음)"""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="nexus-trace-writer", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.close)
+        try:
+            self._queue.put_nowait((path, record))
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(f"Trace export queue is full, dropped {self.dropped} traces")
+
+    def flush(self) -> None:
+        """대기열에 있는 trace를 모두 쓸 때까지 대기"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """남은 trace를 쓰고 스레드 종료 (프로세스 종료 시)"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    break
+                self._write(*item)
+                if self._queue.empty():
+                    self._file.flush()
+            except OSError as e:
+                logger.warning(f"Failed to export trace: {e}")
+            finally:
+                self._queue.task_done()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, path: str, record: Dict[str, Any]) -> None:
+        if path != self._path:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._file = open(path, "a", encoding="utf-8")
+            self._path = path
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+
+_writer = _TraceWriter()
+
+
+def flush_traces() -> None:
+    """내보내기 대기 중인 trace를 파일에 모두 쓸 때까지 대기 (테스트, 종료 전 확인용)"""
+    _writer.flush()
+
+
+def _export_trace(trace: _Trace, root: Span, end_ns: int) -> None:
+    """루트 span이 끝난 trace를 OTLP JSON 한 줄로 config.TRACING_FILE에 추가하도록 쓰기 스레드에 넘김"""
+    with trace.lock:
+        trace.exported = True
+        if trace.dropped:
+            root.set_attribute("tracing.dropped_spans", trace.dropped)
+        spans = trace.spans + [root._to_otlp(end_ns)]
+    path = config.TRACING_FILE
+    if not path:
+        return
+
+    record = {
+        "resourceSpans": [{
+            "resource": {"attributes": [
+                _otlp_attribute("service.name", config.SERVER_NAME),
+                _otlp_attribute("service.version", config.SERVER_VERSION),
+                _otlp_attribute("process.pid", os.getpid()),
+            ]},
+            "scopeSpans": [{"scope": {"name": config.SERVER_NAME}, "spans": spans}],
+        }]
+    }
+    _writer.submit(path, record)
@@ -0,0 +1,268 @@
+"""
+시작 후 백그라운드 예열
+서버가 요청을 받을 준비가 된 뒤 데몬 스레드에서 첫 호출이 지불하던 비용을 미리 치른다.
+
+1. 도구 모듈 import (TOOL_HANDLERS 지연 로드)
+2. tree-sitter 파서 생성과 함수 검색 쿼리 컴파일
+3. 프로세스 풀 워커 시작 (FastAPI 모드만 - stdio는 클라이언트 세션마다 서버를 띄우므로 첫 호출 때 시작)
+4. 허용 디렉토리 순회 - 파일 메타데이터를 OS 캐시에 올리고 Git 저장소와 최근 수정 파일을 수집
+5. Git 저장소 열기 (HEAD 커밋, index 읽기) - 연 저장소는 Git 도구가 재사용하도록 저장소 캐시에 넣음
+6. 최근 수정한 텍스트 파일의 인코딩 감지 (shared_cache에 저장)
+
+각 단계는 실패해도 다음 단계로 넘어가며, 순회와 인코딩 감지는 config.WARMUP_MAX_SECONDS 안에서만 한다.
+예열이 끝나기 전에 들어온 호출은 평소처럼 필요한 것을 직접 만든다 (파서 생성은 잠금으로 한 번만).
+"""
+
+import heapq
+import os
+import pathlib
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import config
+from server_logging import get_logger
+
+logger = get_logger("warmup")
+
+
+class _ScanResult:
+    """허용 디렉토리 순회 결과"""
+
+    __slots__ = ("files", "directories", "repositories", "recent_files", "truncated")
+
+    def __init__(self):
+        self.files = 0
+        self.directories = 0
+        self.repositories: List[str] = []
+        # (mtime_ns, 경로) 최소 힙 - 가장 최근에 수정한 config.WARMUP_ENCODING_FILES개만 유지
+        self.recent_files: List[Tuple[int, str]] = []
+        self.truncated = False
+
+
+class Warmup:
+    """예열 스레드 하나 (start()는 한 번만 동작)"""
+
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.state = "idle"
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.started_at: Optional[float] = None
+        self.seconds = 0.0
+        self.start_process_pool = True
+
+    def start(self, start_process_pool: bool = True) -> bool:
+        """예열 스레드 시작 (꺼져 있거나 이미 시작했으면 False)"""
+        if not config.WARMUP_ENABLED:
+            return False
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self.state = "pending"
+            self.start_process_pool = start_process_pool
+            self._thread = threading.Thread(target=self._run, name="nexus-warmup", daemon=True)
+            self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        """진행 중인 예열을 다음 확인 지점에서 멈춤 (서버 종료 시)"""
+        self._stop.set()
+
+    def _run(self) -> None:
+        # 서버가 첫 요청(MCP initialize 등)에 응답하는 동안 GIL을 다투지 않도록 잠시 대기
+        if self._stop.wait(config.WARMUP_DELAY):
+            self.state = "stopped"
+            return
+        self.state = "running"
+        self.started_at = time.time()
+        start = time.perf_counter()
+        deadline = start + config.WARMUP_MAX_SECONDS
+
+        self._step("tool_modules", self._import_tool_modules)
+        self._step("tree_sitter", self._build_parsers)
+        self._step("process_pool", self._start_process_pool)
+        scan = _ScanResult()
+        self._step("scan", self._scan_directories, scan, deadline)
+        self._step("git", self._open_repositories, scan)
+        self._step("encoding", self._detect_encodings, scan, deadline)
+
+        self.seconds = time.perf_counter() - start
+        self.state = "stopped" if self._stop.is_set() else "done"
+        logger.info(f"Warm-up {self.state} in {self.seconds:.2f}s: "
+                    + ", ".join(f"{name} {step['seconds']:.2f}s" for name, step in self.steps.items()))
+
+    def _step(self, name: str, func, *args) -> None:
+        if self._stop.is_set():
+            return
+        start = time.perf_counter()
+        try:
+            details = func(*args) or {}
+        except Exception as e:
+            logger.debug(f"Warm-up step {name} failed", exc_info=True)
+            details = {"error": f"{type(e).__name__}: {e}"}
+        details["seconds"] = round(time.perf_counter() - start, 3)
+        self.steps[name] = details
+
+    # ==================== 단계 ====================
+
+    @staticmethod
+    def _import_tool_modules() -> Dict[str, Any]:
+        from tools_registry import TOOL_HANDLERS
+
+        modules = set()
+        for tool_name in TOOL_HANDLERS:
+            TOOL_HANDLERS[tool_name]
+            modules.add(TOOL_HANDLERS.get_module_name(tool_name))
+        return {"modules": len(modules)}
+
+    @staticmethod
+    def _build_parsers() -> Dict[str, Any]:
+        from tools.tree_sitter_analyzer import get_analyzer
+
+        analyzer, error = get_analyzer()
+        if analyzer is None:
+            return {"error": error}
+        failed = []
+        for language in analyzer.languages:
+            try:
+                analyzer.get_query(language)
+            except Exception as e:
+                failed.append(language)
+                logger.debug(f"Warm-up: {language} query compile failed: {e}")
+        return {"parsers": len(analyzer.parsers), "queries": len(analyzer.queries), "query_errors": len(failed)}
+
+    def _start_process_pool(self) -> Dict[str, Any]:
+        from process_pool import get_process_pool
+
+        pool = get_process_pool()
+        if pool is None:
+            return {"workers": 0}
+        if not self.start_process_pool:
+            return {"workers": pool.max_workers, "started": False}
+        pool.start()
+        return {"workers": pool.max_workers, "started": True}
+
+    def _scan_directories(self, scan: _ScanResult, deadline: float) -> Dict[str, Any]:
+        """허용 디렉토리를 순회하며 파일 메타데이터를 읽음 (os.scandir - 디렉토리당 syscall 한 번 + 파일별 stat)"""
+        stack = list(reversed(_get_scan_roots()))
+        seen_repositories: Set[str] = set()
+        while stack:
+            if self._stop.is_set() or time.perf_counter() > deadline or scan.files >= config.WARMUP_MAX_FILES:
+                scan.truncated = True
+                break
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    subdirectories = []
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.name == ".git":
+                                    if directory not in seen_repositories:
+                                        seen_repositories.add(directory)
+                                        scan.repositories.append(directory)
+                                elif entry.name not in config.WARMUP_SKIP_DIRS:
+                                    subdirectories.append(entry.path)
+                                continue
+                            if not entry.is_file(follow_symlinks=False):
+                                continue
+                            stat = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        scan.files += 1
+                        if (os.path.splitext(entry.name)[1].lower() in config.WARMUP_TEXT_EXTENSIONS
+                                and 0 < stat.st_size <= config.WARMUP_ENCODING_MAX_BYTES):
+                            item = (stat.st_mtime_ns, entry.path)
+                            if len(scan.recent_files) < config.WARMUP_ENCODING_FILES:
+                                heapq.heappush(scan.recent_files, item)
+                            elif item > scan.recent_files[0]:
+                                heapq.heapreplace(scan.recent_files, item)
+            except OSError:
+                continue
+            scan.directories += 1
+            stack.extend(reversed(subdirectories))
+        return {"directories": scan.directories, "files": scan.files, "truncated": scan.truncated}
+
+    def _open_repositories(self, scan: _ScanResult) -> Dict[str, Any]:
+        """순회 중 찾은 저장소와 허용 디렉토리를 포함하는 저장소를 열어 HEAD/index를 읽고 Git 도구의 저장소 캐시에 넣음"""
+        from tools.git_tools import is_git_available, preload_repository
+
+        if not is_git_available():
+            return {"error": "GitPython is not installed"}
+        if config.GIT_REPO_CACHE_SIZE <= 0:
+            return {"repositories": 0}
+
+        candidates = list(scan.repositories)
+        for root in _get_scan_roots():
+            if root not in candidates:
+                candidates.append(root)
+        opened: Set[str] = set()
+        limit = min(config.WARMUP_MAX_REPOS, config.GIT_REPO_CACHE_SIZE)
+        for path in candidates:
+            if self._stop.is_set() or len(opened) >= limit:
+                break
+            try:
+                working_tree_dir = preload_repository(path)
+            except Exception as e:
+                logger.debug(f"Warm-up: failed to read repository {path}: {e}")
+                continue
+            if working_tree_dir is not None:
+                opened.add(working_tree_dir)
+        return {"repositories": len(opened)}
+
+    def _detect_encodings(self, scan: _ScanResult, deadline: float) -> Dict[str, Any]:
+        """최근 수정한 파일부터 인코딩을 감지해 캐시에 저장"""
+        from tools.utils import detect_file_encoding
+
+        detected = 0
+        for _, path in sorted(scan.recent_files, reverse=True):
+            if self._stop.is_set() or time.perf_counter() > deadline:
+                break
+            try:
+                detect_file_encoding(pathlib.Path(path))
+            except OSError:
+                continue
+            detected += 1
+        return {"files": detected}
+
+    def get_status(self) -> Dict[str, Any]:
+        """예열 상태 (server_stats)"""
+        return {
+            "enabled": config.WARMUP_ENABLED,
+            "state": self.state,
+            "started_at": self.started_at,
+            "seconds": round(self.seconds, 3),
+            "steps": dict(self.steps),
+        }
+
+
+def _get_scan_roots() -> List[str]:
+    """존재하는 허용 디렉토리의 실제 경로 (다른 허용 디렉토리 안에 있는 것은 제외)"""
+    roots: List[str] = []
+    for directory in sorted({os.path.realpath(d) for d in config.ALLOWED_DIRECTORIES if os.path.isdir(d)}):
+        if not any(directory == root or directory.startswith(root.rstrip(os.sep) + os.sep) for root in roots):
+            roots.append(directory)
+    return roots
+
+
+warmup = Warmup()
+
+
+def start_warmup(start_process_pool: bool = True) -> bool:
+    """
+    서버 준비 후 백그라운드 예열 시작 (config.WARMUP_ENABLED가 False면 아무것도 하지 않음)
+
+    start_process_pool이 False면 프로세스 풀은 미리 띄우지 않고 첫 호출 때 시작한다 (stdio 모드).
+    """
+    return warmup.start(start_process_pool)
+
+
+def stop_warmup() -> None:
+    """진행 중인 예열 중단"""
+    warmup.stop()
+
+
+def get_warmup_status() -> Dict[str, Any]:
+    return warmup.get_status()